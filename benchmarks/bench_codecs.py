@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+"""Benchmarks save, reload and file size for every storage format
+
+Usage: python3 -m benchmarks.bench_codecs [objects]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from benchmarks.bench_timestamps import write_dataset
+from models.engine.codecs import CODECS
+from models.engine.file_storage import FileStorage
+
+
+def main(count):
+    """Runs the benchmark on count objects"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'source.json')
+        write_dataset(source, count)
+        storage = FileStorage(source)
+        storage.reload()
+        for name in CODECS:
+            path = os.path.join(tmp, name)
+            target = FileStorage(path, file_format=name)
+            for obj in storage.all().values():
+                target.new(obj)
+            start = time.perf_counter()
+            target.save()
+            saved = time.perf_counter() - start
+            reader = FileStorage(path, lazy=True)
+            start = time.perf_counter()
+            reader.reload()
+            decoded = time.perf_counter() - start
+            reader = FileStorage(path)
+            start = time.perf_counter()
+            reader.reload()
+            loaded = time.perf_counter() - start
+            print(json.dumps({'benchmark': 'codec', 'format': name,
+                              'objects': count,
+                              'bytes': os.path.getsize(path),
+                              'save_s': round(saved, 3),
+                              'decode_s': round(decoded, 3),
+                              'reload_s': round(loaded, 3)}))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+"""Measures memory per loaded object for plain and compact models
+
+Usage: python3 -m benchmarks.bench_memory [objects]
+"""
+import json
+import sys
+import tracemalloc
+import uuid
+from models.compact import compact_class
+from models.place import Place
+from models.review import Review
+from models.user import User
+
+
+def records(cls, count):
+    """Yields count storage records of model class cls"""
+    stamp = '2023-07-12T10:59:42.319408'
+    extra = {
+        'User': {'email': 'a@hbnb.io', 'first_name': 'Ama'},
+        'Place': {'city_id': 'c1', 'user_id': 'u1', 'name': 'Villa',
+                  'price_by_night': 80, 'latitude': 5.6, 'longitude': -0.2},
+        'Review': {'place_id': 'p1', 'user_id': 'u1', 'text': 'Great'}
+    }[cls.__name__]
+    for _ in range(count):
+        record = {'id': str(uuid.uuid4()), 'created_at': stamp,
+                  'updated_at': stamp, '__class__': cls.__name__}
+        record.update(extra)
+        yield record
+
+
+def bytes_per_object(cls, count):
+    """Returns the traced bytes held per instance of cls built from records
+
+    Two figures are returned: right after loading, and after a save has
+    serialized every instance, which makes plain instances allocate
+    their __dict__.
+    """
+    data = list(records(cls, count))
+    tracemalloc.start()
+    objs = [cls(**record) for record in data]
+    loaded = tracemalloc.get_traced_memory()[0]
+    for obj in objs:
+        obj.to_dict()
+    saved = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objs
+    return loaded / count, saved / count
+
+
+def main(count):
+    """Runs the benchmark on count objects per class"""
+    for cls in (User, Place, Review):
+        plain = bytes_per_object(cls, count)
+        compact = bytes_per_object(compact_class(cls), count)
+        print(json.dumps({'benchmark': 'memory_per_object',
+                          'class': cls.__name__, 'objects': count,
+                          'plain_loaded_bytes': round(plain[0]),
+                          'plain_saved_bytes': round(plain[1]),
+                          'compact_loaded_bytes': round(compact[0]),
+                          'compact_saved_bytes': round(compact[1])}))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+"""Microbenchmarks for storage.new, to_dict and __str__ of a model
+
+Usage: python3 -m benchmarks.bench_models [calls]
+"""
+import json
+import sys
+import timeit
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+
+def place():
+    """Returns a place with every declared attribute set"""
+    obj = Place()
+    obj.city_id = 'c1'
+    obj.user_id = 'u1'
+    obj.name = 'Villa'
+    obj.price_by_night = 80
+    obj.latitude = 5.6
+    obj.longitude = -0.2
+    obj.amenity_ids = ['a1', 'a2']
+    return obj
+
+
+def main(calls):
+    """Times calls calls of each operation, best of five runs"""
+    obj = place()
+    storage = FileStorage('bench_models.json')
+    cases = {
+        'new': lambda: storage.new(obj),
+        'to_dict': obj.to_dict,
+        'str': obj.__str__
+    }
+    for name, func in cases.items():
+        best = min(timeit.repeat(func, number=calls, repeat=5))
+        print(json.dumps({'benchmark': 'model_' + name, 'calls': calls,
+                          'ns_per_call': round(best / calls * 1e9)}))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
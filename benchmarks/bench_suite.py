@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+"""Times the storage and console hot paths on synthetic datasets
+
+Usage: python3 -m benchmarks.bench_suite [scale ...] > results.jsonl
+
+Scales are 10k, 100k and 1m, 10k by default; see benchmarks.datasets.
+Every measurement is the best of REPEAT runs and is printed as a JSON
+line, after one describing the run, so two runs can be compared with
+benchmarks.compare.
+"""
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from unittest.mock import patch
+import console
+import models
+from benchmarks.datasets import write_dataset
+from models.engine.file_storage import FileStorage
+
+SAMPLE = 1000
+REPEAT = 5
+
+
+def timed(func, repeat=REPEAT):
+    """Returns the fewest seconds func took over repeat calls"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def emit(scale, objects, operation, seconds, calls=1, **extra):
+    """Prints the result of an operation as a JSON line"""
+    line = {'benchmark': 'suite', 'scale': scale, 'objects': objects,
+            'operation': operation, 'calls': calls,
+            'seconds': round(seconds, 6),
+            'us_per_call': round(seconds / calls * 1e6, 1)}
+    line.update(extra)
+    print(json.dumps(line), flush=True)
+
+
+def run_commands(cmd, lines):
+    """Runs console commands with their output discarded"""
+    with open(os.devnull, 'w') as devnull, \
+            patch('sys.stdout', devnull):
+        for line in lines:
+            cmd.onecmd(cmd.precmd(line))
+
+
+def bench_storage(scale, path, objects):
+    """Times reload, new and save, and the peak memory of a reload"""
+    emit(scale, objects, 'reload', timed(lambda: FileStorage(path).reload()))
+    storage = FileStorage(path)
+    storage.reload()
+    tracer = FileStorage(path)
+    tracemalloc.start()
+    tracer.reload()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del tracer
+    emit(scale, objects, 'reload_peak_memory', 0, peak_bytes=peak)
+    rng = random.Random(1)
+    places = list(storage.all('Place').values())
+    sample = rng.sample(places, min(SAMPLE, len(places)))
+
+    def touch():
+        """Stores every sampled place again"""
+        for obj in sample:
+            storage.new(obj)
+
+    def save_touched():
+        """Saves after storing every sampled place again"""
+        touch()
+        storage.save()
+
+    emit(scale, objects, 'new', timed(touch), calls=len(sample))
+    emit(scale, objects, 'save', timed(save_touched))
+    emit(scale, objects, 'save_unchanged', timed(storage.save))
+    return storage, [obj.id for obj in sample]
+
+
+def bench_console(scale, storage, objects, ids):
+    """Times console commands against storage"""
+    cmd = console.HBNBCommand()
+    commands = {
+        'show': ['show Place {}'.format(obj_id) for obj_id in ids],
+        'update': ['update Place {} name Renamed'.format(obj_id)
+                   for obj_id in ids[:5]],
+        'search_index': ['search Place city_id = city7'] * 3,
+        'search_columns': ['search Place price_by_night > 290'] * 3,
+        'search_scan': ['search Place name = Renamed'] * 3,
+        'all': ['all Place'],
+        'all_page': ['all Place limit 100 after {}'.format(obj_id)
+                     for obj_id in ids[:100]],
+        'count': ['count Place'] * SAMPLE
+    }
+    with patch.object(models, 'storage', storage), \
+            patch.object(console, 'storage', storage):
+        for name, lines in commands.items():
+            emit(scale, objects, 'console_' + name,
+                 timed(lambda: run_commands(cmd, lines)), calls=len(lines))
+
+
+def main(scales):
+    """Runs the suite at each scale"""
+    print(json.dumps({'benchmark': 'suite_run',
+                      'started': datetime.now().isoformat(),
+                      'python': platform.python_version(),
+                      'platform': platform.platform(),
+                      'cpus': os.cpu_count()}), flush=True)
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'file.json')
+            objects = write_dataset(path, scale)
+            storage, ids = bench_storage(scale, path, objects)
+            bench_console(scale, storage, objects, ids)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or ['10k'])
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""Benchmarks reload with strptime against the fast timestamp parser
+
+Usage: python3 -m benchmarks.bench_timestamps [objects]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+import models.base_model
+from models.engine.file_storage import FileStorage
+
+
+def write_dataset(path, count):
+    """Writes count User records to path in the file.json format"""
+    start = datetime(2023, 7, 12, 10, 59, 42, 319408)
+    with open(path, 'w') as f:
+        f.write('{')
+        for i in range(count):
+            stamp = (start + timedelta(seconds=i)).isoformat()
+            obj_id = str(uuid.uuid4())
+            record = {'id': obj_id, 'created_at': stamp,
+                      'updated_at': stamp, '__class__': 'User',
+                      'email': 'user{}@hbnb.io'.format(i)}
+            if i:
+                f.write(', ')
+            f.write(json.dumps('User.' + obj_id))
+            f.write(': ')
+            f.write(json.dumps(record))
+        f.write('}')
+
+
+def strptime_parse(value):
+    """The parser BaseModel used before parse_time"""
+    return datetime.strptime(value, models.base_model.time_format)
+
+
+def time_reload(path):
+    """Returns the seconds taken to reload path into a new FileStorage"""
+    storage = FileStorage(path)
+    start = time.perf_counter()
+    storage.reload()
+    return time.perf_counter() - start
+
+
+def main(count):
+    """Runs the benchmark on count objects"""
+    fast = models.base_model.parse_time
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'file.json')
+        write_dataset(path, count)
+        models.base_model.parse_time = strptime_parse
+        try:
+            before = time_reload(path)
+        finally:
+            models.base_model.parse_time = fast
+        after = time_reload(path)
+    print(json.dumps({'benchmark': 'reload_timestamps', 'objects': count,
+                      'strptime_s': round(before, 3),
+                      'parse_time_s': round(after, 3),
+                      'speedup': round(before / after, 2)}))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
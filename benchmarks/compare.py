@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""Compares two runs of benchmarks.bench_suite
+
+Usage: python3 -m benchmarks.compare <before.jsonl> <after.jsonl> [%]
+
+Prints a JSON line per operation measured in both runs with its change
+in time per call; changes slower than the threshold (10% by default)
+are flagged as regressions and make the exit status 1.
+"""
+import json
+import sys
+
+
+def load(path):
+    """Returns the suite results of a file keyed by scale and operation"""
+    results = {}
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line.startswith('{'):
+                continue
+            result = json.loads(line)
+            if result.get('benchmark') == 'suite':
+                results[(result['scale'], result['operation'])] = result
+    return results
+
+
+def compare(before, after, threshold=10.0):
+    """Returns a comparison dict per operation found in both runs"""
+    rows = []
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        row = {'scale': key[0], 'operation': key[1]}
+        if 'peak_bytes' in old and 'peak_bytes' in new:
+            old_value, new_value = old['peak_bytes'], new['peak_bytes']
+            row.update(before_bytes=old_value, after_bytes=new_value)
+        else:
+            old_value, new_value = old['us_per_call'], new['us_per_call']
+            row.update(before_us=old_value, after_us=new_value)
+        change = (new_value - old_value) / old_value * 100 if old_value \
+            else 0.0
+        row['change_pct'] = round(change, 1)
+        row['regression'] = change > threshold
+        rows.append(row)
+    return rows
+
+
+def main(argv):
+    """Prints the comparison, returns 1 if anything regressed"""
+    if len(argv) not in (2, 3):
+        print(__doc__.split('\n\n')[1], file=sys.stderr)
+        return 2
+    threshold = float(argv[2]) if len(argv) == 3 else 10.0
+    rows = compare(load(argv[0]), load(argv[1]), threshold)
+    for row in rows:
+        print(json.dumps(row))
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""Generates synthetic Users, Places and Reviews for the benchmarks
+
+Usage: python3 -m benchmarks.datasets <scale> <path>
+
+Datasets are seeded, so a scale always produces the same records, and
+written one record at a time, so even 1m never sits in memory as JSON.
+"""
+import json
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+SCALES = {'10k': 10000, '100k': 100000, '1m': 1000000}
+SHARES = (('User', 0.2), ('Place', 0.3), ('Review', 0.5))
+CITIES = 50
+START = datetime(2023, 7, 12, 10, 59, 42, 319408)
+
+
+def _ids(rng, count):
+    """Returns count UUID strings drawn from rng"""
+    return [str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            for _ in range(count)]
+
+
+def _stamp(rng):
+    """Returns a timestamp string within a year of START"""
+    return (START + timedelta(seconds=rng.randrange(31536000))).isoformat()
+
+
+def _record(rng, name, obj_id):
+    """Returns the base record of a name object"""
+    stamp = _stamp(rng)
+    return {'id': obj_id, 'created_at': stamp, 'updated_at': stamp,
+            '__class__': name}
+
+
+def users(rng, ids):
+    """Yields a User record for each id"""
+    for i, obj_id in enumerate(ids):
+        record = _record(rng, 'User', obj_id)
+        record.update(email='user{}@hbnb.io'.format(i), password='pwd',
+                      first_name='First{}'.format(i % 1000),
+                      last_name='Last{}'.format(i % 997))
+        yield record
+
+
+def places(rng, ids, user_ids):
+    """Yields a Place record for each id, owned by one of user_ids"""
+    for i, obj_id in enumerate(ids):
+        record = _record(rng, 'Place', obj_id)
+        record.update(city_id='city{}'.format(rng.randrange(CITIES)),
+                      user_id=rng.choice(user_ids),
+                      name='Place {}'.format(i),
+                      description='A place to stay',
+                      number_rooms=rng.randint(1, 6),
+                      number_bathrooms=rng.randint(1, 3),
+                      max_guest=rng.randint(1, 10),
+                      price_by_night=rng.randint(20, 300),
+                      latitude=round(rng.uniform(-60.0, 60.0), 6),
+                      longitude=round(rng.uniform(-180.0, 180.0), 6),
+                      amenity_ids=[])
+        yield record
+
+
+def reviews(rng, ids, place_ids, user_ids):
+    """Yields a Review record for each id, of one of place_ids"""
+    for obj_id in ids:
+        record = _record(rng, 'Review', obj_id)
+        record.update(place_id=rng.choice(place_ids),
+                      user_id=rng.choice(user_ids), text='Great stay')
+        yield record
+
+
+def records(scale, seed=0):
+    """Yields the records of a dataset of scale objects in total
+
+    scale is a key of SCALES or a number of objects, split between
+    Users, Places and Reviews by SHARES.
+    """
+    total = SCALES[scale] if scale in SCALES else int(scale)
+    rng = random.Random(seed)
+    counts = {name: max(1, int(total * share)) for name, share in SHARES}
+    user_ids = _ids(rng, counts['User'])
+    place_ids = _ids(rng, counts['Place'])
+    yield from users(rng, user_ids)
+    yield from places(rng, place_ids, user_ids)
+    yield from reviews(rng, _ids(rng, counts['Review']), place_ids,
+                       user_ids)
+
+
+def write_dataset(path, scale, seed=0):
+    """Writes a dataset to path in the file.json format
+
+    Returns the number of objects written.
+    """
+    count = 0
+    with open(path, 'w') as f:
+        f.write('{')
+        for record in records(scale, seed):
+            if count:
+                f.write(', ')
+            f.write(json.dumps(record['__class__'] + '.' + record['id']))
+            f.write(': ')
+            f.write(json.dumps(record))
+            count += 1
+        f.write('}')
+    return count
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit(__doc__.split('\n\n')[1])
+    print(json.dumps({'dataset': sys.argv[2], 'scale': sys.argv[1],
+                      'objects': write_dataset(sys.argv[2], sys.argv[1])}))
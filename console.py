@@ -1,9 +1,23 @@
 #!/usr/bin/python3
-"""Console Module"""
+"""Console Module
+
+Run without arguments for the interactive console, or as
+console.py --batch [file] [--commit-every N] to run the commands of a
+file, or of stdin, as a stream.
+"""
+import argparse
 import cmd
+import contextlib
+import cProfile
+import io
+import pstats
+import re
 import sys
+import time
+from itertools import islice
 from models import base_model
 from models import storage
+from models.engine import metrics, query
 from models.user import User
 from models.place import Place
 from models.state import State
@@ -12,6 +26,13 @@ from models.amenity import Amenity
 from models.review import Review
 
 
+def unquote(arg):
+    """Returns arg without the quotes around it, if it is quoted"""
+    if len(arg) > 1 and arg[0] == arg[-1] and arg[0] in '"\'':
+        return arg[1:-1]
+    return arg
+
+
 class HBNBCommand(cmd.Cmd):
     """Contains the functionality for the HBNB console"""
 
@@ -26,7 +47,9 @@ class HBNBCommand(cmd.Cmd):
         'Amenity': Amenity,
         'Review': Review
     }
-    dot_cmds = ['all', 'count', 'show', 'destroy', 'update']
+    dot_cmds = ['all', 'count', 'show', 'destroy', 'update', 'search',
+                'explain', 'near', 'within']
+    dot_arg = re.compile(r'''(?:"[^"]*"|'[^']*'|\([^)]*\)|[^,"'(])+''')
     types = {
         'number_rooms': int,
         'number_bathrooms': int,
@@ -35,6 +58,9 @@ class HBNBCommand(cmd.Cmd):
         'latitude': float,
         'longitude': float
     }
+    flush_size = 1 << 16
+    print_chunk = 100
+    profile_lines = 20
 
     def preloop(self):
         """Prints if isatty is false"""
@@ -43,6 +69,19 @@ class HBNBCommand(cmd.Cmd):
 
     def precmd(self, line):
         """Reformat command line for advanced command syntax"""
+        match = re.fullmatch(r'(\w+)\.(\w+)\((.*)\)', line.strip())
+        if match and match.group(1) in self.classes and \
+                match.group(2) in self.dot_cmds:
+            args = [arg.strip() for arg in self.dot_arg.findall(
+                match.group(3)) if arg.strip()]
+            if match.group(2) in ('search', 'explain'):
+                # only the first argument is unquoted, the query parser
+                # reads quoted values itself
+                args[:1] = [unquote(arg) for arg in args[:1]]
+            else:
+                args = [arg.strip('"\'') for arg in args]
+            return ' '.join([match.group(2), match.group(1)] + args)
+
         parts = line.strip().split(' ')
 
         if len(parts) >= 2 and '.' in parts[1]:
@@ -59,8 +98,40 @@ class HBNBCommand(cmd.Cmd):
             print('(hbnb) ', end='')
         return stop
 
+    def run_batch(self, lines, commit_every=None, output=None):
+        """Runs the commands of lines without prompts, returns their count
+
+        Blank lines and lines starting with # are skipped.  Saves are
+        deferred to a single storage commit at the end, or one every
+        commit_every saves, and the output is written to output (stdout
+        by default) in blocks of about flush_size characters.
+        """
+        output = output or sys.stdout
+        buffer = io.StringIO()
+        ops = 0
+        try:
+            with contextlib.redirect_stdout(buffer), \
+                    storage.batch(max_saves=commit_every):
+                for line in lines:
+                    line = line.strip()
+                    if not line or line.startswith('#'):
+                        continue
+                    ops += 1
+                    stop = self.onecmd(self.precmd(line))
+                    if buffer.tell() >= self.flush_size:
+                        output.write(buffer.getvalue())
+                        buffer.seek(0)
+                        buffer.truncate()
+                    if stop:
+                        break
+        finally:
+            output.write(buffer.getvalue())
+            output.flush()
+        return ops
+
     def do_quit(self, arg):
         """Exit the HBNB console"""
+        storage.close()
         return True
 
     def help_quit(self):
@@ -70,6 +141,7 @@ class HBNBCommand(cmd.Cmd):
     def do_EOF(self, arg):
         """Handle EOF to exit program"""
         print()
+        storage.close()
         return True
 
     def help_EOF(self):
@@ -117,10 +189,9 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
 
-        obj_id = args[1]
-        key = class_name + '.' + obj_id
-        if key in storage.all():
-            print(storage.all()[key])
+        obj = storage.get(class_name, args[1])
+        if obj is not None:
+            print(obj)
         else:
             print("** no instance found **")
 
@@ -145,10 +216,13 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
 
-        obj_id = args[1]
-        key = class_name + '.' + obj_id
-        if key in storage.all():
-            del storage.all()[key]
+        if len(args) > 2 and args[2] != 'cascade':
+            print("** unknown option {} **".format(args[2]))
+            return
+
+        obj = storage.get(class_name, args[1])
+        if obj is not None:
+            obj.delete(cascade=len(args) > 2)
             storage.save()
         else:
             print("** no instance found **")
@@ -156,26 +230,30 @@ class HBNBCommand(cmd.Cmd):
     def help_destroy(self):
         """Help information for the destroy command"""
         print("Destroy an individual instance of a class")
-        print("Usage: destroy <className> <objectId>")
+        print("With cascade, the objects referring to it are destroyed too")
+        print("Usage: destroy <className> <objectId> [cascade]")
 
     def do_all(self, arg):
         """Show all objects or objects of a specific class"""
-        objects = []
-        if not arg:
-            objects = list(storage.all().values())
-        elif arg in self.classes:
-            class_name = arg
-            objects = self.classes[class_name].all()
-        else:
-            print("** class doesn't exist **")
+        args = arg.split()
+        if not args:
+            self.print_objects(storage.iterate())
+            return
+
+        if args[0] not in self.classes:
+            if args[0] in ('limit', 'after'):
+                print("** class name missing **")
+            else:
+                print("** class doesn't exist **")
             return
 
-        print(objects)
+        self.show_objects(args)
 
     def help_all(self):
         """Help information for the all command"""
-        print("Show all objects or objects of a specific class")
-        print("Usage: all [<className>]")
+        print("Show all objects or objects of a specific class, "
+              "a page at a time with limit, in id order")
+        print("Usage: all [<className> [limit <n>] [after <objectId>]]")
 
     def do_count(self, arg):
         """Count the number of instances of a class"""
@@ -207,9 +285,8 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
 
-        obj_id = args[1]
-        key = class_name + '.' + obj_id
-        if key not in storage.all():
+        obj = storage.get(class_name, args[1])
+        if obj is None:
             print("** no instance found **")
             return
 
@@ -224,8 +301,11 @@ class HBNBCommand(cmd.Cmd):
         attr_name = args[2]
         attr_value = args[3]
 
-        obj = storage.all()[key]
-        setattr(obj, attr_name, attr_value)
+        try:
+            setattr(obj, attr_name, attr_value)
+        except AttributeError:
+            print("** attribute is read-only **")
+            return
         obj.save()
 
     def help_update(self):
@@ -257,16 +337,18 @@ class HBNBCommand(cmd.Cmd):
                       "<key=value> ...")
                 return
             attr, value = pair.split('=')
-            if attr not in class_attrs:
+            if attr not in class_attrs or isinstance(
+                    getattr(self.classes[class_name], attr), property):
                 print(f"** {class_name} doesn't have attribute '{attr}' **")
                 return
             kwargs[attr] = value
 
         objs = self.classes[class_name].all()
-        for obj in objs:
-            for attr, value in kwargs.items():
-                setattr(obj, attr, value)
-            obj.save()
+        with storage.batch():
+            for obj in objs:
+                for attr, value in kwargs.items():
+                    setattr(obj, attr, value)
+                obj.save()
 
     def help_batch_update(self):
         """Help information for the batch_update command"""
@@ -286,10 +368,10 @@ class HBNBCommand(cmd.Cmd):
             return
 
         objs = self.classes[class_name].all()
-        for obj in objs:
-            key = class_name + '.' + obj.id
-            del storage.all()[key]
-            obj.save()
+        with storage.batch():
+            for obj in objs:
+                obj.delete()
+            storage.save()
 
     def help_batch_delete(self):
         """Help information for the batch_delete command"""
@@ -331,20 +413,121 @@ class HBNBCommand(cmd.Cmd):
             print("** class doesn't exist **")
             return
 
-        objs = self.classes[class_name].all()
-        print(objs)
+        self.show_objects(args)
 
     def help_batch_show(self):
         """Help information for the batch_show command"""
-        print("Show multiple objects of a class")
-        print("Usage: batch_show <className>")
+        print("Show multiple objects of a class, a page at a time with "
+              "limit, in id order")
+        print("Usage: batch_show <className> [limit <n>] "
+              "[after <objectId>]")
+
+    def show_objects(self, args):
+        """Prints the objects of the class args[0], paged by its options
+
+        With limit or after the objects come from storage.page(), in id
+        order; otherwise they are streamed from storage.iterate().
+        """
+        options = {}
+        rest = args[1:]
+        while rest:
+            if len(rest) < 2 or rest[0] not in ('limit', 'after') or \
+                    rest[0] in options:
+                print("** invalid arguments **")
+                return
+            options[rest[0]] = rest[1]
+            rest = rest[2:]
+        if not options:
+            self.print_objects(storage.iterate(args[0]))
+            return
+        limit = options.get('limit')
+        if limit is not None:
+            if not limit.isdigit():
+                print("** invalid limit **")
+                return
+            limit = int(limit)
+        self.print_objects(storage.page(args[0], limit,
+                                        options.get('after')))
+
+    def print_objects(self, objects):
+        """Prints the string forms of objects as a list, as they come
+
+        The list is written and flushed print_chunk objects at a time,
+        so the first ones appear before the rest are even built.
+        """
+        out = sys.stdout
+        objects = iter(objects)
+        sep = ''
+        out.write('[')
+        while True:
+            chunk = [repr(str(obj))
+                     for obj in islice(objects, self.print_chunk)]
+            if not chunk:
+                break
+            out.write(sep + ', '.join(chunk))
+            out.flush()
+            sep = ', '
+        out.write(']\n')
 
     def do_search(self, arg):
         """Search for objects based on attribute values"""
-        args = arg.split()
+        plan = self.plan_query(arg, 'search')
+        if plan is not None:
+            self.print_objects(plan.run())
+
+    def help_search(self):
+        """Help information for the search command"""
+        print("Search for objects based on attribute values")
+        print("Usage: search <className> <condition> "
+              "[order by <attribute> [asc|desc]] [limit <n>]")
+        print("Conditions compare attributes with =, !=, <, <=, >, >= or "
+              "in (<value>, ...)")
+        print("and combine with and, or and parentheses, e.g.")
+        print("search Place price_by_night >= 100 and (max_guest > 4 "
+              "or number_rooms > 2) order by price_by_night limit 10")
+
+    def do_explain(self, arg):
+        """Show how a search would be run"""
+        plan = self.plan_query(arg, 'explain')
+        if plan is not None:
+            for line in plan.explain():
+                print(line)
+
+    def help_explain(self):
+        """Help information for the explain command"""
+        print("Show how a search would be run: the index, columns or scan")
+        print("it fetches candidates with, then its filter, order and limit")
+        print("Usage: explain <className> <condition> "
+              "[order by <attribute> [asc|desc]] [limit <n>]")
+
+    def plan_query(self, arg, command):
+        """Returns the plan of a search query, None after printing errors"""
+        args = arg.split(None, 1)
         if len(args) < 2:
             print("** missing arguments **")
-            print("Usage: search <className> <attribute> <value>")
+            print("Usage: {} <className> <condition> "
+                  "[order by <attribute> [asc|desc]] [limit <n>]"
+                  .format(command))
+            return None
+
+        class_name = args[0]
+        if class_name not in self.classes:
+            print("** class doesn't exist **")
+            return None
+
+        try:
+            parsed = query.parse(args[1], self.types)
+        except ValueError as error:
+            print("** {} **".format(error))
+            return None
+        return query.plan(storage, class_name, parsed)
+
+    def do_near(self, arg):
+        """Show the objects nearest to a location"""
+        args = arg.split()
+        if len(args) < 3:
+            print("** missing arguments **")
+            print("Usage: near <className> <latitude> <longitude> [<k>]")
             return
 
         class_name = args[0]
@@ -352,20 +535,177 @@ class HBNBCommand(cmd.Cmd):
             print("** class doesn't exist **")
             return
 
-        attr_name = args[1]
-        attr_value = ' '.join(args[2:])
+        try:
+            lat, lon = float(args[1]), float(args[2])
+            k = int(args[3]) if len(args) > 3 else 5
+        except ValueError:
+            print("** invalid number **")
+            return
 
-        objs = [v for k, v in storage.all().items()
-                if k.split('.')[0] == class_name and
-                hasattr(v, attr_name) and
-                getattr(v, attr_name) == attr_value]
+        objs = storage.nearest(class_name, lat, lon, k)
+        print([str(obj) for obj in objs])
 
-        print(objs)
+    def help_near(self):
+        """Help information for the near command"""
+        print("Show the k objects nearest to a location (default 5)")
+        print("Usage: near <className> <latitude> <longitude> [<k>]")
 
-    def help_search(self):
-        """Help information for the search command"""
-        print("Search for objects based on attribute values")
-        print("Usage: search <className> <attribute> <value>")
+    def do_within(self, arg):
+        """Show the objects within a distance of a location"""
+        args = arg.split()
+        if len(args) < 4:
+            print("** missing arguments **")
+            print("Usage: within <className> <latitude> <longitude> <km>")
+            return
+
+        class_name = args[0]
+        if class_name not in self.classes:
+            print("** class doesn't exist **")
+            return
+
+        try:
+            lat, lon, radius = float(args[1]), float(args[2]), float(args[3])
+        except ValueError:
+            print("** invalid number **")
+            return
+
+        objs = storage.within(class_name, lat, lon, radius)
+        print([str(obj) for obj in objs])
+
+    def help_within(self):
+        """Help information for the within command"""
+        print("Show the objects within a distance in km of a location")
+        print("Usage: within <className> <latitude> <longitude> <km>")
+
+    def do_convert(self, arg):
+        """Rewrite the storage file in another format"""
+        if not arg:
+            print("** format missing **")
+            print("Usage: convert <format>")
+            return
+
+        try:
+            storage.convert(arg.strip())
+        except ValueError as error:
+            print("** {} **".format(error))
+
+    def help_convert(self):
+        """Help information for the convert command"""
+        print("Rewrite the storage file in another format")
+        print("Usage: convert "
+              "<json|compact-json|marshal|pickle|records|indexed>")
+
+    def do_import(self, arg):
+        """Import the objects of a class from an NDJSON or CSV file"""
+        args = self.bulk_args(arg, 'import')
+        if args is None:
+            return
+
+        try:
+            count = storage.import_file(*args, types=self.types)
+        except OSError as error:
+            print("** {} **".format(error.strerror or error))
+            return
+        except ValueError as error:
+            print("** {}, nothing imported **".format(error))
+            return
+        print(count)
+
+    def help_import(self):
+        """Help information for the import command"""
+        print("Import the objects of a class from an NDJSON or CSV file, "
+              "saving once")
+        print("Usage: import <className> <file> [ndjson|csv]")
+
+    def do_export(self, arg):
+        """Export the objects of a class to an NDJSON or CSV file"""
+        args = self.bulk_args(arg, 'export')
+        if args is None:
+            return
+
+        try:
+            count = storage.export_file(*args)
+        except OSError as error:
+            print("** {} **".format(error.strerror or error))
+            return
+        except ValueError as error:
+            print("** {} **".format(error))
+            return
+        print(count)
+
+    def help_export(self):
+        """Help information for the export command"""
+        print("Export the objects of a class to an NDJSON or CSV file")
+        print("Usage: export <className> <file> [ndjson|csv]")
+
+    def bulk_args(self, arg, command):
+        """Returns the class name, file and format of an import or export
+
+        Prints the error and returns None if they are invalid.
+        """
+        args = arg.split()
+        if len(args) == 0:
+            print("** class name missing **")
+            return None
+
+        if args[0] not in self.classes:
+            print("** class doesn't exist **")
+            return None
+
+        if len(args) < 2:
+            print("** file name missing **")
+            print("Usage: {} <className> <file> [ndjson|csv]".format(
+                command))
+            return None
+
+        return args[0], args[1], args[2] if len(args) > 2 else None
+
+    def do_stats(self, arg):
+        """Show or control the storage metrics"""
+        if arg in ('on', 'off'):
+            metrics.enable(arg == 'on')
+            return
+        if arg == 'reset':
+            metrics.reset()
+            return
+        if arg:
+            print("** invalid argument **")
+            print("Usage: stats [on|off|reset]")
+            return
+
+        stats = metrics.snapshot()
+        if not stats['enabled']:
+            print("** metrics are off, turn them on with: stats on **")
+        for name, value in stats['counters'].items():
+            print("{}: {}".format(name, value))
+        for name, summary in stats['histograms'].items():
+            print("{}: {}".format(name, ' '.join(
+                '{}={}'.format(key, value) for key, value in summary.items())))
+
+    def help_stats(self):
+        """Help information for the stats command"""
+        print("Show the counters and latency histograms of storage work, "
+              "in microseconds")
+        print("Usage: stats [on|off|reset]")
+
+    def do_profile(self, arg):
+        """Run a command under cProfile and show where the time went"""
+        if not arg:
+            print("** command missing **")
+            print("Usage: profile <command>")
+            return
+
+        profiler = cProfile.Profile()
+        stop = profiler.runcall(self.onecmd, self.precmd(arg))
+        stats = pstats.Stats(profiler, stream=sys.stdout)
+        stats.sort_stats('cumulative').print_stats(self.profile_lines)
+        return stop
+
+    def help_profile(self):
+        """Help information for the profile command"""
+        print("Run a command under cProfile and show the functions it "
+              "spent the most time in")
+        print("Usage: profile <command>")
 
     def do_help(self, arg):
         """Override the default help command to display custom help messages"""
@@ -392,8 +732,34 @@ class HBNBCommand(cmd.Cmd):
 
     def do_EOF(self, arg):
         """Handle EOF to exit program"""
+        storage.close()
         return True
 
 
+def main(argv=None):
+    """Runs the interactive console or a batch of commands"""
+    parser = argparse.ArgumentParser(description='HBNB console')
+    parser.add_argument('--batch', nargs='?', const='-', metavar='FILE',
+                        help='run the commands of FILE, or of stdin, '
+                        'without prompts')
+    parser.add_argument('--commit-every', type=int, metavar='N',
+                        help='with --batch, commit storage every N saves '
+                        'instead of once at the end')
+    args = parser.parse_args(argv)
+    if args.batch is None:
+        HBNBCommand().cmdloop()
+        return
+    start = time.perf_counter()
+    if args.batch == '-':
+        ops = HBNBCommand().run_batch(sys.stdin, args.commit_every)
+    else:
+        with open(args.batch) as f:
+            ops = HBNBCommand().run_batch(f, args.commit_every)
+    storage.close()
+    elapsed = time.perf_counter() - start
+    print('{} ops in {:.3f}s ({:.0f} ops/sec)'.format(
+        ops, elapsed, ops / elapsed if elapsed else 0), file=sys.stderr)
+
+
 if __name__ == "__main__":
-    HBNBCommand().cmdloop()
+    main()
@@ -1,7 +1,47 @@
 #!/usr/bin/python3
-"""This module instantiates an object of class FileStorage"""
+"""This module instantiates the storage engine picked by HBNB_TYPE_STORAGE"""
+import atexit
+import sys
+from os import getenv
+from models.engine import metrics
 from models.engine.file_storage import FileStorage
 
 
-storage = FileStorage()
+def _report_progress(loaded, bytes_read):
+    """Reports reload progress on stderr"""
+    print('loaded {} objects ({} bytes)'.format(loaded, bytes_read),
+          file=sys.stderr)
+
+
+def _shards(value):
+    """Converts HBNB_FILE_SHARDS into the shards option of FileStorage"""
+    if not value:
+        return None
+    return int(value) if value.isdigit() else value
+
+
+if getenv('HBNB_METRICS') == '1':
+    metrics.enable()
+if getenv('HBNB_TYPE_STORAGE') == 'sqlite':
+    from models.engine.sqlite_storage import SQLiteStorage
+    storage = SQLiteStorage(getenv('HBNB_SQLITE_PATH', 'hbnb.db'))
+else:
+    storage = FileStorage(
+        journal=getenv('HBNB_FILE_JOURNAL') == '1',
+        lazy=getenv('HBNB_LAZY_LOAD') == '1',
+        compact_models=getenv('HBNB_COMPACT_MODELS') == '1',
+        durability=getenv('HBNB_FILE_DURABILITY', 'none'),
+        background=getenv('HBNB_BACKGROUND_WRITES') == '1',
+        file_format=getenv('HBNB_FILE_FORMAT', 'json'),
+        shards=_shards(getenv('HBNB_FILE_SHARDS')),
+        reload_workers=1,
+        cache_records=getenv('HBNB_CACHE_RECORDS') == '1')
+    if getenv('HBNB_RELOAD_PROGRESS') == '1':
+        storage.progress = _report_progress
+# worker processes would have to import this package, which is still
+# being imported, so shards are decoded in-process until it is done
 storage.reload()
+if isinstance(storage, FileStorage):
+    storage.reload_workers = int(getenv('HBNB_RELOAD_WORKERS', '0')) or None
+if getattr(storage, 'background', False):
+    atexit.register(storage.close)
@@ -1,7 +1,9 @@
 #!/usr/bin/python3
 """ State Module for HBNB project """
 from models.base_model import BaseModel
+from models.relations import Relation
 
 
 class Amenity(BaseModel):
     name = ""
+    places = Relation('Place', 'amenity_ids', on_delete='detach')
@@ -1,13 +1,61 @@
 #!/usr/bin/python3
 """This module defines a base class for all models in our hbnb clone"""
+import time
 import uuid
 from datetime import datetime
+from models.engine import metrics
+
+time_format = '%Y-%m-%dT%H:%M:%S.%f'
+
+
+def parse_time(value):
+    """Converts a stored timestamp string into a datetime
+
+    datetime.fromisoformat reads the stored format in C, far faster than
+    strptime; strptime remains the fallback for anything it rejects.
+    """
+    if isinstance(value, datetime):
+        return value
+    start = metrics.enabled and time.perf_counter()
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        if start:
+            metrics.count('model.strptime')
+        try:
+            parsed = datetime.strptime(value, time_format)
+        except ValueError:
+            parsed = datetime.strptime(value, '%Y-%m-%dT%H:%M:%S')
+    if start:
+        metrics.observe('model.parse_time', time.perf_counter() - start)
+    return parsed
+
+
+def format_time(value):
+    """Converts a datetime into its stored timestamp string
+
+    isoformat() without arguments is markedly faster and already writes
+    the microseconds of naive datetimes, unless they are zero.
+    """
+    if value.microsecond and value.tzinfo is None:
+        return value.isoformat()
+    return value.isoformat(timespec='microseconds')
 
 
 class BaseModel:
-    """A base class for all hbnb models"""
+    """A base class for all hbnb models
+
+    _version counts the changes made to the instance, so storage can
+    tell when a cached serialized form is stale, and _changed holds the
+    names of the attributes set since the last save(), None if none.
+    Both live in slots to stay out of __dict__ and to_dict().
+    """
+    __slots__ = ('_version', '_changed', '__dict__', '__weakref__')
+
     def __init__(self, *args, **kwargs):
         """Instatntiates a new model"""
+        object.__setattr__(self, '_version', 0)
+        object.__setattr__(self, '_changed', None)
         if not kwargs:
             from models import storage
             self.id = str(uuid.uuid4())
@@ -16,33 +64,81 @@ class BaseModel:
             storage.new(self)
         else:
             if 'created_at' in kwargs:
-                kwargs['created_at'] = datetime.strptime(
-                    kwargs['created_at'], '%Y-%m-%dT%H:%M:%S.%f')
+                kwargs['created_at'] = parse_time(kwargs['created_at'])
 
         if 'updated_at' in kwargs:
-            kwargs['updated_at'] = datetime.strptime(kwargs['updated_at'],
-                                                     '%Y-%m-%dT%H:%M:%S.%f')
+            kwargs['updated_at'] = parse_time(kwargs['updated_at'])
+        assign = setattr
+        if type(self).__setattr__ is BaseModel.__setattr__:
+            # loading a stored record is not a change to it
+            assign = object.__setattr__
         for key, value in kwargs.items():
             if key != '__class__':
-                setattr(self, key, value)
+                assign(self, key, value)
+        if kwargs:
+            object.__setattr__(self, '_changed', None)
+
+    def __setattr__(self, name, value):
+        """Sets an attribute and records the change"""
+        object.__setattr__(self, name, value)
+        self._touch(name)
+
+    def __delattr__(self, name):
+        """Deletes an attribute and records the change"""
+        object.__delattr__(self, name)
+        self._touch(name)
+
+    def _touch(self, name):
+        """Records a change to the attribute name"""
+        object.__setattr__(self, '_version', self._version + 1)
+        if self._changed is None:
+            object.__setattr__(self, '_changed', {name})
+        else:
+            self._changed.add(name)
+
+    def changes(self):
+        """Returns the names of the attributes set since the last save()"""
+        return set(self._changed or ())
 
     def __str__(self):
         """Returns a string representation of the instance"""
-        cls = (str(type(self)).split('.')[-1]).split('\'')[0]
-        return '[{}] ({}) {}'.format(cls, self.id, self.__dict__)
+        return '[{}] ({}) {}'.format(type(self).__name__, self.id,
+                                     self.__dict__)
 
     def save(self):
         """Updates updated_at with current time when instance is changed"""
         from models import storage
         self.updated_at = datetime.now()
+        storage.new(self)
         storage.save()
+        object.__setattr__(self, '_changed', None)
+
+    def delete(self, cascade=False):
+        """Deletes the instance from storage, applying its relations
+
+        The objects referring to it are only deleted with cascade=True.
+        """
+        from models import relations
+        relations.delete(self, cascade)
+
+    @classmethod
+    def all(cls):
+        """Returns a list of the stored instances of the class"""
+        from models import storage
+        return list(storage.all(cls).values())
+
+    @classmethod
+    def count(cls):
+        """Returns the number of stored instances of the class"""
+        from models import storage
+        return storage.count(cls)
 
     def to_dict(self):
         """Convert instance into dict format"""
-        dictionary = {}
-        dictionary.update(self.__dict__)
-        dictionary.update({'__class__':
-                          (str(type(self)).split('.')[-1]).split('\'')[0]})
-        dictionary['created_at'] = self.created_at.isoformat()
-        dictionary['updated_at'] = self.updated_at.isoformat()
+        if metrics.enabled:
+            metrics.count('model.to_dict')
+        dictionary = self.__dict__.copy()
+        dictionary['__class__'] = type(self).__name__
+        dictionary['created_at'] = format_time(self.created_at)
+        dictionary['updated_at'] = format_time(self.updated_at)
         return dictionary
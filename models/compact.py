@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+"""This module builds compact, slotted variants of the model classes"""
+from models.base_model import BaseModel, format_time
+from models.engine import metrics
+
+_variants = {}
+
+
+class CompactModel:
+    """Base storing declared attributes in slots, with no __dict__
+
+    Attributes the model class does not declare go to a separate
+    overflow dict that is only allocated once one is set.  __class__
+    answers the model class, so isinstance checks see one.
+    """
+    __slots__ = ()
+    _model = None
+    _fields = frozenset()
+    _defaults = {}
+
+    @property
+    def __class__(self):
+        """Returns the model class the instance is a variant of"""
+        return type(self)._model
+
+    def __setattr__(self, name, value):
+        """Stores declared attributes in slots, others in the overflow"""
+        if name in type(self)._fields:
+            object.__setattr__(self, name, value)
+        else:
+            try:
+                extra = object.__getattribute__(self, '_extra')
+            except AttributeError:
+                extra = {}
+                object.__setattr__(self, '_extra', extra)
+            extra[name] = value
+        self._touch(name)
+
+    def __getattr__(self, name):
+        """Returns overflow attributes and unset declared defaults"""
+        if name == '_extra':
+            raise AttributeError(name)
+        try:
+            return self._extra[name]
+        except (AttributeError, KeyError):
+            pass
+        try:
+            value = type(self)._defaults[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        if isinstance(value, list):
+            # a private copy, so appends do not leak across instances;
+            # reading the default is not a change to the instance
+            value = list(value)
+            object.__setattr__(self, name, value)
+        return value
+
+    def __delattr__(self, name):
+        """Deletes a declared or overflow attribute"""
+        if name in type(self)._fields:
+            object.__delattr__(self, name)
+        else:
+            try:
+                del self._extra[name]
+            except (AttributeError, KeyError):
+                raise AttributeError(name) from None
+        self._touch(name)
+
+    def _attributes(self):
+        """Returns the attributes set on the instance, slots first"""
+        attrs = {}
+        fields = type(self)._fields
+        for name in type(self).__slots__:
+            if name not in fields:
+                continue
+            try:
+                attrs[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        try:
+            attrs.update(object.__getattribute__(self, '_extra'))
+        except AttributeError:
+            pass
+        return attrs
+
+    def __str__(self):
+        """Returns a string representation of the instance"""
+        return '[{}] ({}) {}'.format(type(self).__name__, self.id,
+                                     self._attributes())
+
+    def to_dict(self):
+        """Convert instance into dict format"""
+        if metrics.enabled:
+            metrics.count('model.to_dict')
+        dictionary = self._attributes()
+        dictionary['__class__'] = type(self).__name__
+        dictionary['created_at'] = format_time(self.created_at)
+        dictionary['updated_at'] = format_time(self.updated_at)
+        return dictionary
+
+
+def compact_class(cls):
+    """Returns the slotted variant of model class cls
+
+    The variant cannot subclass cls, which would give it a __dict__, so
+    it takes a copy of the attributes of cls and its bases instead.  It
+    keeps the name and module of cls, so storage keys and __str__ are
+    unchanged, but weak references to its instances are not supported.
+    """
+    try:
+        return _variants[cls]
+    except KeyError:
+        pass
+    defaults = {}
+    for klass in reversed(cls.__mro__):
+        if not issubclass(klass, BaseModel):
+            continue
+        for name, value in vars(klass).items():
+            if name.startswith('_') or callable(value) or \
+                    isinstance(value, (classmethod, staticmethod, property)):
+                continue
+            defaults[name] = value
+    slots = ('id', 'created_at', 'updated_at') + tuple(defaults)
+    namespace = {}
+    for klass in reversed(cls.__mro__[:-1]):
+        namespace.update(vars(klass))
+    # the slot descriptors of BaseModel only apply to its own layout
+    for name in (BaseModel.__slots__ + tuple(vars(CompactModel)) +
+                 tuple(defaults)):
+        namespace.pop(name, None)
+    namespace.update({
+        '__slots__': ('_version', '_changed') + slots + ('_extra',),
+        '__module__': cls.__module__,
+        '__doc__': cls.__doc__,
+        '__qualname__': cls.__qualname__,
+        '_model': cls,
+        '_fields': frozenset(slots),
+        '_defaults': defaults
+    })
+    variant = type(cls.__name__, (CompactModel,), namespace)
+    _variants[cls] = variant
+    return variant
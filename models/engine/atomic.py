@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+"""This module writes storage files atomically with tunable durability"""
+import os
+import time
+
+DURABILITY_LEVELS = ('none', 'file', 'dir')
+
+
+def check_durability(durability):
+    """Raises ValueError unless durability is a known level"""
+    if durability not in DURABILITY_LEVELS:
+        raise ValueError('durability must be one of {}, not {!r}'.format(
+            ', '.join(DURABILITY_LEVELS), durability))
+
+
+def fsync_dir(path):
+    """Flushes the directory entry of path to disk"""
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, write, durability='none', mode='w'):
+    """Replaces path with what write(f) writes, all or nothing
+
+    The data goes to '<path>.tmp', which is renamed over path once
+    complete, so a crash leaves either the old or the new file; if
+    write raises, the temporary file is removed.
+    durability picks what is forced to disk before returning:
+    'none' nothing, 'file' the new file, 'dir' the file and the rename.
+    Returns the seconds spent in each step and the bytes written.
+    """
+    check_durability(durability)
+    tmp_path = path + '.tmp'
+    start = time.perf_counter()
+    try:
+        with open(tmp_path, mode) as f:
+            write(f)
+            f.flush()
+            written = time.perf_counter()
+            if durability != 'none':
+                os.fsync(f.fileno())
+            size = f.tell()
+        synced = time.perf_counter()
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    if durability == 'dir':
+        fsync_dir(path)
+    done = time.perf_counter()
+    return {'write_s': written - start, 'fsync_s': synced - written,
+            'rename_s': done - synced, 'bytes': size}
@@ -0,0 +1,192 @@
+#!/usr/bin/python3
+"""This module streams model records to and from NDJSON and CSV files
+
+Files are read and written one record at a time, so neither an import
+nor an export holds a whole file in memory.
+"""
+import csv
+import json
+import uuid
+from datetime import datetime
+from itertools import islice
+from models.base_model import parse_time
+from models.engine.atomic import atomic_write
+
+FORMATS = ('ndjson', 'csv')
+BASE_FIELDS = ('id', 'created_at', 'updated_at')
+EXTENSIONS = {'.ndjson': 'ndjson', '.jsonl': 'ndjson', '.json': 'ndjson',
+              '.csv': 'csv'}
+
+
+def file_format_of(path, file_format=None):
+    """Returns file_format, or the format named by the extension of path"""
+    if file_format is None:
+        for extension, name in EXTENSIONS.items():
+            if path.lower().endswith(extension):
+                return name
+        file_format = 'ndjson'
+    if file_format not in FORMATS:
+        raise ValueError('file format must be one of {}, not {!r}'.format(
+            ', '.join(FORMATS), file_format))
+    return file_format
+
+
+def read_records(f, file_format):
+    """Yields the records of an open text file, one dict per line
+
+    Empty CSV cells are left out of their record.
+    """
+    if file_format == 'csv':
+        for row in csv.DictReader(f):
+            yield {key: value for key, value in row.items()
+                   if key and value not in ('', None)}
+        return
+    for number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise ValueError('line {}: invalid JSON'.format(number))
+        if not isinstance(record, dict):
+            raise ValueError('line {}: not an object'.format(number))
+        yield record
+
+
+def write_records(records, f, file_format, fields=None):
+    """Writes each record of an iterable to an open text file
+
+    CSV files get a column per name in fields; list and dict values
+    are written as JSON.  Returns the number of records written.
+    """
+    count = 0
+    if file_format == 'csv':
+        writer = csv.DictWriter(f, fields, extrasaction='ignore',
+                                lineterminator='\n')
+        writer.writeheader()
+        for record in records:
+            writer.writerow({
+                key: json.dumps(value)
+                if isinstance(value, (list, dict)) else value
+                for key, value in record.items()})
+            count += 1
+        return count
+    encoder = json.JSONEncoder(separators=(',', ':'))
+    for record in records:
+        f.write(encoder.encode(record))
+        f.write('\n')
+        count += 1
+    return count
+
+
+def chunks(iterable, size):
+    """Yields lists of up to size items of iterable"""
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def preparer(model, types=None):
+    """Returns a function checking and casting records into model kwargs
+
+    A missing id or timestamp is generated, a given id must be a UUID,
+    values are cast with types (attribute name to type), and strings
+    are decoded as JSON where model declares a list.  The function
+    raises ValueError naming the first invalid value.
+    """
+    name = model.__name__
+    casts = {}
+    readonly = set()
+    for klass in model.__mro__:
+        for attr, value in vars(klass).items():
+            if isinstance(value, property):
+                readonly.add(attr)
+            elif isinstance(value, list):
+                casts.setdefault(attr, _list)
+    casts.update(types or {})
+
+    def prepare(record):
+        """Returns the kwargs of model described by record"""
+        record = dict(record)
+        if record.pop('__class__', name) != name:
+            raise ValueError('record is not a {}'.format(name))
+        obj_id = record.get('id')
+        if obj_id is None:
+            record['id'] = str(uuid.uuid4())
+        elif not isinstance(obj_id, str) or not _is_uuid(obj_id):
+            raise ValueError('invalid id {!r}'.format(obj_id))
+        for attr in ('created_at', 'updated_at'):
+            value = record.get(attr)
+            if value is None:
+                record[attr] = datetime.now()
+                continue
+            try:
+                record[attr] = parse_time(value)
+            except (TypeError, ValueError):
+                raise ValueError('invalid value {!r} for {}'.format(
+                    value, attr))
+        if not readonly.isdisjoint(record):
+            raise ValueError('{} is read-only'.format(
+                min(readonly.intersection(record))))
+        for attr in casts.keys() & record.keys():
+            value = record[attr]
+            try:
+                record[attr] = casts[attr](value)
+            except (TypeError, ValueError):
+                raise ValueError('invalid value {!r} for {}'.format(
+                    value, attr))
+        record['__class__'] = name
+        return record
+    return prepare
+
+
+def _list(value):
+    """Returns value, decoded from JSON if it is a string, as a list"""
+    if isinstance(value, str):
+        value = json.loads(value)
+    if not isinstance(value, list):
+        raise ValueError('not a list')
+    return value
+
+
+def _is_uuid(value):
+    """Returns True if value is the string form of a UUID"""
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+def import_file(storage, cls, path, file_format=None, types=None,
+                chunk_size=1000):
+    """Imports the records of an NDJSON or CSV file into storage
+
+    Returns the number of objects stored; see import_records of the
+    storage engines.
+    """
+    file_format = file_format_of(path, file_format)
+    with open(path, newline='') as f:
+        return storage.import_records(cls, read_records(f, file_format),
+                                      types, chunk_size)
+
+
+def export_file(storage, cls, path, file_format=None):
+    """Writes the objects of class cls to an NDJSON or CSV file
+
+    CSV exports read the records twice, first to collect the columns.
+    Returns the number of objects written.
+    """
+    file_format = file_format_of(path, file_format)
+    fields = None
+    if file_format == 'csv':
+        fields = dict.fromkeys(BASE_FIELDS)
+        for record in storage.export_records(cls):
+            fields.update(dict.fromkeys(record))
+        fields.pop('__class__', None)
+    count = []
+    atomic_write(path, lambda f: count.append(write_records(
+        storage.export_records(cls), f, file_format, list(fields or ()))))
+    return count[0]
@@ -0,0 +1,233 @@
+#!/usr/bin/python3
+"""This module defines the file formats FileStorage can persist in
+
+Every codec writes and reads a stream of (key, record) pairs, where a
+record is the to_dict() output of an object, on a binary file.  Codecs
+storing records as JSON have an encode_record() method, and their dump()
+also accepts records it already encoded, given as a str.
+Formats other than JSON start with an 8 byte magic header, which is how
+detect() tells them apart when a file is reloaded.  Like any pickle or
+marshal data, files in those formats must only be loaded if trusted.
+"""
+import io
+import json
+import marshal
+import pickle
+import struct
+from models.engine import record_file
+from models.engine.json_stream import iter_items
+
+MAGIC_SIZE = 8
+
+
+class JSONCodec:
+    """The original file.json format: one JSON object keyed by key"""
+    name = 'json'
+    magic = None
+    separators = (', ', ': ')
+
+    def __init__(self):
+        """Instantiates the codec and its shared JSON encoder"""
+        self.encoder = json.JSONEncoder(separators=self.separators)
+
+    def encode_record(self, record):
+        """Returns the JSON text of a record, as is if already encoded"""
+        if isinstance(record, str):
+            return record
+        return self.encoder.encode(record)
+
+    def dump(self, records, f):
+        """Writes the (key, record) pairs to the binary file f"""
+        text = io.TextIOWrapper(f, encoding='utf-8', newline='')
+        text.write('{')
+        first = True
+        for key, record in records:
+            if not first:
+                text.write(self.separators[0])
+            first = False
+            text.write(json.dumps(key))
+            text.write(self.separators[1])
+            text.write(self.encode_record(record))
+        text.write('}')
+        text.flush()
+        text.detach()
+
+    def load(self, f):
+        """Yields the (key, record) pairs stored in the binary file f"""
+        return iter_items(f)
+
+
+class CompactJSONCodec(JSONCodec):
+    """JSON without the optional whitespace, read by the same decoder"""
+    name = 'compact-json'
+    separators = (',', ':')
+
+
+class _ChunkedCodec:
+    """Base for formats storing a magic header then length-prefixed chunks
+
+    Each chunk is a list of up to chunk_size (key, record) tuples
+    preceded by its byte length as '<I'.
+    """
+    chunk_size = 1000
+    length = struct.Struct('<I')
+
+    def dump(self, records, f):
+        """Writes the (key, record) pairs to the binary file f"""
+        f.write(self.magic)
+        chunk = []
+        for item in records:
+            chunk.append(tuple(item))
+            if len(chunk) == self.chunk_size:
+                self.__write(chunk, f)
+                chunk = []
+        if chunk:
+            self.__write(chunk, f)
+
+    def load(self, f):
+        """Yields the (key, record) pairs stored in the binary file f"""
+        if f.read(MAGIC_SIZE) != self.magic:
+            raise ValueError('not a {} file'.format(self.name))
+        size = self.length.size
+        while True:
+            head = f.read(size)
+            if not head:
+                return
+            if len(head) < size:
+                raise ValueError('truncated chunk header')
+            data = f.read(self.length.unpack(head)[0])
+            yield from self.decode(data)
+
+    def __write(self, chunk, f):
+        """Writes one chunk"""
+        data = self.encode(chunk)
+        f.write(self.length.pack(len(data)))
+        f.write(data)
+
+
+class MarshalCodec(_ChunkedCodec):
+    """Chunks of (key, record) tuples in marshal format"""
+    name = 'marshal'
+    magic = b'HBNBMRS1'
+
+    def encode(self, chunk):
+        """Returns the bytes of one chunk"""
+        return marshal.dumps(chunk)
+
+    def decode(self, data):
+        """Returns the chunk held in data"""
+        try:
+            return marshal.loads(data)
+        except EOFError:
+            raise ValueError('truncated chunk') from None
+
+
+class PickleCodec(_ChunkedCodec):
+    """Chunks of (key, record) tuples pickled with protocol 5"""
+    name = 'pickle'
+    magic = b'HBNBPKL5'
+
+    def encode(self, chunk):
+        """Returns the bytes of one chunk"""
+        return pickle.dumps(chunk, protocol=5)
+
+    def decode(self, data):
+        """Returns the chunk held in data"""
+        try:
+            return pickle.loads(data)
+        except (EOFError, pickle.UnpicklingError):
+            raise ValueError('truncated chunk') from None
+
+
+class RecordCodec:
+    """Length-prefixed records: key and compact JSON body per record
+
+    Each record is a '<II' header holding the byte lengths of the key
+    and of the body, followed by both encoded in UTF-8.
+    """
+    name = 'records'
+    magic = b'HBNBREC1'
+    header = struct.Struct('<II')
+    encoder = json.JSONEncoder(separators=(',', ':'))
+
+    def encode_record(self, record):
+        """Returns the JSON text of a record, as is if already encoded"""
+        if isinstance(record, str):
+            return record
+        return self.encoder.encode(record)
+
+    def dump(self, records, f):
+        """Writes the (key, record) pairs to the binary file f"""
+        f.write(self.magic)
+        pack = self.header.pack
+        for key, record in records:
+            key = key.encode('utf-8')
+            body = self.encode_record(record).encode('utf-8')
+            f.write(pack(len(key), len(body)))
+            f.write(key)
+            f.write(body)
+
+    def load(self, f):
+        """Yields the (key, record) pairs stored in the binary file f"""
+        if f.read(MAGIC_SIZE) != self.magic:
+            raise ValueError('not a records file')
+        size = self.header.size
+        unpack = self.header.unpack
+        while True:
+            head = f.read(size)
+            if not head:
+                return
+            if len(head) < size:
+                raise ValueError('truncated record header')
+            key_len, body_len = unpack(head)
+            data = f.read(key_len + body_len)
+            if len(data) < key_len + body_len:
+                raise ValueError('truncated record')
+            yield (data[:key_len].decode('utf-8'),
+                   json.loads(data[key_len:]))
+
+
+class IndexedCodec:
+    """Records behind an id to offset index, see models.engine.record_file
+
+    Unlike the other formats, files in this one can be read one record
+    at a time and updated by appending records.
+    """
+    name = 'indexed'
+    magic = record_file.MAGIC
+
+    def encode_record(self, record):
+        """Returns the JSON text of a record, as is if already encoded"""
+        return record_file.encode_record(record)
+
+    def dump(self, records, f):
+        """Writes the (key, record) pairs to the binary file f"""
+        record_file.dump(records, f)
+
+    def load(self, f):
+        """Yields the (key, record) pairs stored in the binary file f"""
+        return record_file.load(f)
+
+
+CODECS = {codec.name: codec for codec in (
+    JSONCodec(), CompactJSONCodec(), MarshalCodec(), PickleCodec(),
+    RecordCodec(), IndexedCodec())}
+
+
+def get_codec(name):
+    """Returns the codec called name, raising ValueError if unknown"""
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError('unknown storage format {!r}, expected one of {}'
+                         .format(name, ', '.join(CODECS))) from None
+
+
+def detect(f):
+    """Returns the codec that wrote the binary file f and rewinds it"""
+    head = f.read(MAGIC_SIZE)
+    f.seek(0)
+    for codec in CODECS.values():
+        if codec.magic is not None and head == codec.magic:
+            return codec
+    return CODECS['json']
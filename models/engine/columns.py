@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+"""This module defines a columnar store of numeric model attributes"""
+from array import array
+from math import nan
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _number(value):
+    """Returns value as a float, NaN if it is not a number"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return nan
+
+
+class ColumnStore:
+    """Typed float columns of some attributes of one model class
+
+    Each stored key owns a row; freed rows are reused.  Values that are
+    not numbers are stored as NaN, which no range matches.  Columns are
+    NumPy arrays when NumPy is installed and use_numpy is not False,
+    stdlib array('d') otherwise.
+    """
+
+    def __init__(self, attrs, use_numpy=None):
+        """Instantiates empty columns for attrs"""
+        self.attrs = tuple(attrs)
+        self.use_numpy = numpy is not None and use_numpy is not False
+        self.__rows = {}
+        self.__keys = []
+        self.__free = []
+        if self.use_numpy:
+            self.__columns = {attr: numpy.full(16, nan) for attr in attrs}
+        else:
+            self.__columns = {attr: array('d') for attr in attrs}
+
+    def __len__(self):
+        """Returns the number of stored keys"""
+        return len(self.__rows)
+
+    def add(self, key, obj):
+        """Stores the attributes of obj in the row of key"""
+        row = self.__rows.get(key)
+        if row is None:
+            row = self.__free.pop() if self.__free else self.__grow()
+            self.__rows[key] = row
+            self.__keys[row] = key
+        for attr, column in self.__columns.items():
+            column[row] = _number(getattr(obj, attr, None))
+
+    def remove(self, key):
+        """Frees the row of key"""
+        row = self.__rows.pop(key, None)
+        if row is None:
+            return
+        self.__keys[row] = None
+        for column in self.__columns.values():
+            column[row] = nan
+        self.__free.append(row)
+
+    def clear(self):
+        """Drops every row"""
+        self.__init__(self.attrs, self.use_numpy)
+
+    def select(self, **ranges):
+        """Returns the keys whose attributes fall in the given ranges
+
+        Each range is a (low, high) pair, bounds included; either bound
+        may be None to leave that side open.
+        """
+        if self.use_numpy:
+            rows = self.__select_numpy(ranges)
+        else:
+            rows = self.__select_array(ranges)
+        keys = self.__keys
+        return [keys[row] for row in rows if keys[row] is not None]
+
+    def __grow(self):
+        """Appends a row and returns its number"""
+        row = len(self.__keys)
+        self.__keys.append(None)
+        if self.use_numpy:
+            for attr, column in self.__columns.items():
+                if row >= len(column):
+                    grown = numpy.full(len(column) * 2, nan)
+                    grown[:len(column)] = column
+                    self.__columns[attr] = grown
+        else:
+            for column in self.__columns.values():
+                column.append(nan)
+        return row
+
+    def __select_numpy(self, ranges):
+        """Evaluates ranges over the NumPy columns"""
+        size = len(self.__keys)
+        mask = numpy.ones(size, dtype=bool)
+        for attr, (low, high) in ranges.items():
+            column = self.__columns[attr][:size]
+            if low is not None:
+                mask &= column >= low
+            if high is not None:
+                mask &= column <= high
+            if low is None and high is None:
+                mask &= ~numpy.isnan(column)
+        return numpy.flatnonzero(mask).tolist()
+
+    def __select_array(self, ranges):
+        """Evaluates ranges over the stdlib array columns"""
+        rows = range(len(self.__keys))
+        for attr, (low, high) in ranges.items():
+            column = self.__columns[attr]
+            low = -float('inf') if low is None else low
+            high = float('inf') if high is None else high
+            rows = [row for row in rows if low <= column[row] <= high]
+        return rows
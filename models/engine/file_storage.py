@@ -1,50 +1,1057 @@
 #!/usr/bin/python3
 """This module defines a class to manage file storage for hbnb clone"""
-import json
+import copy
+import glob
+import os
+from bisect import bisect_right
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from types import MappingProxyType
+from models.engine import bulk, metrics
+from models.engine.atomic import atomic_write, check_durability
+from models.engine.codecs import IndexedCodec, detect, get_codec
+from models.engine.columns import ColumnStore
+from models.engine.index import AttributeIndex
+from models.engine.journal import Journal
+from models.engine.record_file import LazyRecords, RecordFile
+from models.engine.spatial import GridIndex
 
 
 class FileStorage:
-    """This class manages storage of hbnb models in JSON format"""
+    """This class manages storage of hbnb models in JSON format
+
+    With journal=True each save() appends only the objects changed since
+    the previous save to '<file_path>.journal'; compact() folds the
+    journal back into the snapshot at file_path.
+
+    The attributes declared in indexes are kept in secondary indexes
+    that find() uses for equality lookups.  Objects are also partitioned
+    by class so all(cls) and count(cls) never walk other classes.
+    The numeric attributes declared in columns are mirrored in typed
+    arrays that filter() evaluates range queries over in bulk, and the
+    locations declared in spatial are bucketed in a grid for within()
+    and nearest().
+
+    With lazy=True reload() keeps the decoded records and only builds a
+    model instance the first time get(), all() or find() reach it;
+    count() and save() work on the records directly.
+
+    Snapshots are written in file_format (see models.engine.codecs) to a
+    temporary file renamed over file_path; reload() detects the format.
+    durability sets what save() forces to disk first: 'none', 'file'
+    or 'dir' (the file and its directory entry); the timings of the
+    last write are kept in last_write.  Inside a batch() block save()
+    only marks the storage dirty and one write happens when it ends.
+    With background=True writes run on a writer thread instead of the
+    caller's; flush() waits for them and close() stops the thread.
+
+    In the 'indexed' format save() appends the changed objects to the
+    file and patches its id to offset index instead of rewriting it,
+    until the appended records outnumber the live ones.  With lazy=True
+    reload() then only reads that index, and each record is decoded
+    from the memory-mapped file the first time it is reached.
+
+    With shards='class' each model class is persisted to its own file,
+    '<file_path>.shard.<class name>', and with shards=n keys are hashed
+    into n files '<file_path>.shard.<0..n-1>'.  save() then only rewrites
+    the shards holding objects passed to new() or delete() since the
+    previous write, and reload() decodes the shards in parallel on up to
+    reload_workers processes.
+
+    With a JSON based file_format and cache_records=True, the encoded
+    form of each object is kept between snapshots and reused until the
+    object's _version or the content of its lists and dicts changes, so
+    a snapshot only encodes the objects changed since the previous one.
+    The cache holds that text and a deep copy of those lists and dicts
+    for every object, about half again the memory of the objects alone,
+    so it is off by default.
+
+    With compact_models=True loaded records are built as the slotted
+    variants from models.compact, which have no __dict__.
+
+    While models.engine.metrics is enabled, new(), delete(), save(),
+    reload(), commits and their serialization and writes are timed, and
+    bytes written and records encoded or reused are counted.
+    """
     __file_path = 'file.json'
-    __objects = {}
+    progress_every = 10000
+    indexes = {
+        'Place': ('city_id', 'user_id', 'amenity_ids'),
+        'City': ('state_id',),
+        'Review': ('place_id', 'user_id'),
+        'User': ('email',)
+    }
+    columns = {
+        'Place': ('price_by_night', 'max_guest', 'number_rooms',
+                  'number_bathrooms', 'latitude', 'longitude')
+    }
+    spatial = {
+        'Place': ('latitude', 'longitude')
+    }
+
+    def __init__(self, file_path=None, journal=False,
+                 compact_threshold=1000, progress=None, lazy=False,
+                 compact_models=False, durability='none',
+                 background=False, file_format='json', shards=None,
+                 reload_workers=None, cache_records=False):
+        """Instantiates a storage engine persisting to file_path"""
+        if file_path is not None:
+            self.__file_path = file_path
+        if shards is not None and shards != 'class' and \
+                (not isinstance(shards, int) or shards < 1):
+            raise ValueError("shards must be None, 'class' or a positive "
+                             "number, not {!r}".format(shards))
+        self.shards = shards
+        self.reload_workers = reload_workers
+        self.__dirty = set()
+        self.__rewrite = False
+        self.cache_records = cache_records
+        self.__encoded = {}
+        self.__objects = {}
+        self.__pending = {}
+        self.__linked = 0
+        self.__exposed = False
+        self.__classes = {}
+        self.__raw = {}
+        self.__sorted = {}
+        self.__models = None
+        self.__indexes = {
+            name: {attr: AttributeIndex(attr) for attr in attrs}
+            for name, attrs in self.indexes.items()
+        }
+        self.__columns = {
+            name: ColumnStore(attrs) for name, attrs in self.columns.items()
+        }
+        self.__grids = {
+            name: GridIndex(attrs) for name, attrs in self.spatial.items()
+        }
+        self.__batch_depth = 0
+        self.__batch_policy = (None, None)
+        self.__deferred = 0
+        self.__deferred_since = 0.0
+        self.background = background
+        self.codec = get_codec(file_format)
+        self.__lock = threading.RLock()
+        self.__write_lock = threading.Lock()
+        self.__wake = threading.Condition()
+        self.__writer = None
+        self.__closing = False
+        self.__requested = 0
+        self.__written = 0
+        self.__write_error = None
+        self.__journal = None
+        self.__records = None
+        if journal:
+            self.__journal = Journal(self.__file_path + '.journal')
+        self.compact_threshold = compact_threshold
+        self.progress = progress
+        self.lazy = lazy
+        self.compact_models = compact_models
+        check_durability(durability)
+        self.durability = durability
+        self.last_write = None
+
+    def all(self, cls=None):
+        """Returns a dictionary of models currently in storage
 
-    def all(self):
-        """Returns a dictionary of models currently in storage"""
-        return FileStorage.__objects
+        With cls (a class or class name) a read-only view of only the
+        objects of that class is returned.
+        """
+        if cls is None:
+            for name in list(self.__raw):
+                self.__load(name)
+            # the caller may now edit it: checked on the next __sync()
+            self.__exposed = True
+            return self.__objects
+        self.__sync()
+        name = cls if isinstance(cls, str) else cls.__name__
+        self.__load(name)
+        return MappingProxyType(self.__classes.get(name, {}))
+
+    def count(self, cls=None):
+        """Returns the number of objects in storage, optionally of cls"""
+        if cls is None:
+            return len(self.__objects) + sum(map(len, self.__raw.values()))
+        self.__sync()
+        name = cls if isinstance(cls, str) else cls.__name__
+        return (len(self.__classes.get(name, ())) +
+                len(self.__raw.get(name, ())))
+
+    def get(self, cls, id):
+        """Returns the object of class cls with the given id, or None"""
+        name = cls if isinstance(cls, str) else cls.__name__
+        key = name + '.' + id
+        if key in self.__raw.get(name, ()):
+            # under the lock, so a snapshot taken meanwhile finds the
+            # record either still raw or already linked
+            with self.__lock:
+                val = self.__raw.get(name, {}).get(key)
+                if val is not None:
+                    self.__link(key, self.__build(val))
+        return self.__objects.get(key)
+
+    def iterate(self, cls=None):
+        """Yields the objects of class cls, or of every class, one by one
+
+        Records not loaded yet are built as they are reached, so the
+        first objects come at once whatever the size of the class.
+        """
+        self.__sync()
+        if cls is None:
+            names = list(dict.fromkeys(list(self.__classes) +
+                                       list(self.__raw)))
+        else:
+            names = [cls if isinstance(cls, str) else cls.__name__]
+        for name in names:
+            yield from list(self.__classes.get(name, {}).values())
+            for key in list(self.__raw.get(name, ())):
+                obj = self.get(name, key[len(name) + 1:])
+                if obj is not None:
+                    yield obj
+
+    def page(self, cls, limit=None, after=None):
+        """Returns up to limit objects of class cls in id order
+
+        With after, the page starts at the first id greater than it, so
+        the last id of a page is the cursor of the next.  The sorted
+        keys of a class are kept until it changes, so a page costs a
+        binary search plus building the objects it returns.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        self.__sync()
+        keys = self.__sorted.get(name)
+        if keys is None:
+            keys = self.__sorted[name] = sorted(
+                list(self.__classes.get(name, ())) +
+                list(self.__raw.get(name, ())))
+        start = 0 if after is None else bisect_right(keys, name + '.' + after)
+        stop = None if limit is None else start + limit
+        found = []
+        for key in keys[start:stop]:
+            obj = self.get(name, key[len(name) + 1:])
+            if obj is not None:
+                found.append(obj)
+        return found
 
     def new(self, obj):
         """Adds new object to storage dictionary"""
-        self.all().update({obj.to_dict()['__class__'] + '.' + obj.id: obj})
+        start = metrics.enabled and time.perf_counter()
+        key = type(obj).__name__ + '.' + obj.id
+        with self.__lock:
+            # obj may have changed in place, e.g. a list appended to
+            self.__encoded.pop(key, None)
+            self.__link(key, obj)
+            self.__pending[key] = obj
+            if self.shards is not None:
+                self.__dirty.add(self.__shard(key))
+        if start:
+            metrics.observe('storage.new', time.perf_counter() - start)
+
+    def delete(self, obj=None):
+        """Removes obj from storage dictionary if it is present"""
+        if obj is None:
+            return
+        start = metrics.enabled and time.perf_counter()
+        key = type(obj).__name__ + '.' + obj.id
+        with self.__lock:
+            if self.__unlink(key):
+                self.__pending[key] = None
+                if self.shards is not None:
+                    self.__dirty.add(self.__shard(key))
+        if start:
+            metrics.observe('storage.delete', time.perf_counter() - start)
+
+    def import_records(self, cls, records, types=None, chunk_size=1000):
+        """Stores an object of class cls for each record of an iterable
+
+        Records are checked and cast by bulk.preparer, built chunk_size
+        at a time and linked without the per object work of new(), and
+        the lot is committed by a single save().  The import is all or
+        nothing: an invalid record, or one whose id is already stored,
+        raises ValueError naming its position and unlinks the objects
+        stored before it.  Returns the number of objects stored.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        prepare = bulk.preparer(self.__model(name), types)
+        self.__sync()
+        stored = self.__raw.get(name, {})
+        added = set()
+        position = 0
+        try:
+            for chunk in bulk.chunks(records, chunk_size):
+                built = []
+                for record in chunk:
+                    position += 1
+                    try:
+                        val = prepare(record)
+                    except ValueError as error:
+                        raise ValueError('record {}: {}'.format(
+                            position, error))
+                    key = name + '.' + val['id']
+                    if key in self.__objects or key in stored or \
+                            key in added:
+                        raise ValueError('record {}: id {} already '
+                                         'exists'.format(position, val['id']))
+                    added.add(key)
+                    built.append(self.__build(val))
+                with self.__lock:
+                    for obj in built:
+                        key = name + '.' + obj.id
+                        self.__link(key, obj)
+                        self.__pending[key] = obj
+                        if self.shards is not None:
+                            self.__dirty.add(self.__shard(key))
+        except BaseException:
+            with self.__lock:
+                for key in added:
+                    self.__pending.pop(key, None)
+                    self.__unlink(key)
+            raise
+        if added:
+            self.save()
+        return len(added)
+
+    def export_records(self, cls):
+        """Yields the record of each object of class cls
+
+        Records not loaded yet are passed through without building an
+        object from them.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        self.__sync()
+        for obj in list(self.__classes.get(name, {}).values()):
+            yield obj.to_dict()
+        records = self.__raw.get(name)
+        for key in list(records or ()):
+            val = records.get(key)
+            if val is not None:
+                yield dict(val)
+
+    def import_file(self, cls, path, file_format=None, types=None,
+                    chunk_size=1000):
+        """Imports the objects of class cls from an NDJSON or CSV file
+
+        file_format is 'ndjson' or 'csv', by default picked from the
+        extension of path.  Returns the number of objects stored.
+        """
+        return bulk.import_file(self, cls, path, file_format, types,
+                                chunk_size)
+
+    def export_file(self, cls, path, file_format=None):
+        """Writes the objects of class cls to an NDJSON or CSV file"""
+        return bulk.export_file(self, cls, path, file_format)
+
+    def find(self, cls, attr, value):
+        """Returns the objects of class cls whose attr equals value
+
+        A list attribute matches when it holds value, so foreign keys
+        kept in lists, like Place.amenity_ids, can be looked up too.
+        Indexed attributes are looked up as of the last new() or save()
+        of each object: an object changed since is only returned if it
+        still matches, and is not found under its new value until then.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        self.__sync()
+        self.__load_matching(name, lambda get: _matches(get(attr), value))
+        index = self.__indexes.get(name, {}).get(attr)
+        if index is not None:
+            keys = index.lookup(value)
+        else:
+            keys = list(self.__classes.get(name, ()))
+        found = []
+        for key in keys:
+            obj = self.__objects.get(key)
+            # attributes may have been set without a save() re-indexing them
+            if obj is not None and _matches(getattr(obj, attr, None), value):
+                found.append(obj)
+        return found
+
+    def filter(self, cls, bbox=None, **ranges):
+        """Returns the objects of class cls within the given ranges
+
+        Each keyword maps an attribute to a (low, high) pair, bounds
+        included and None for an open side; bbox=(south, west, north,
+        east) bounds latitude and longitude.  Attributes held in columns
+        are evaluated there in bulk before any object is looked at.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        if bbox is not None:
+            south, west, north, east = bbox
+            ranges['latitude'] = (south, north)
+            ranges['longitude'] = (west, east)
+        self.__sync()
+        self.__load_matching(name, lambda get: all(
+            _in_range(get(attr), bounds) for attr, bounds in ranges.items()))
+        store = self.__columns.get(name)
+        if store is not None:
+            keys = store.select(**{attr: bounds
+                                   for attr, bounds in ranges.items()
+                                   if attr in store.attrs})
+        else:
+            keys = list(self.__classes.get(name, ()))
+        found = []
+        for key in keys:
+            obj = self.__objects.get(key)
+            # rechecking the column attributes costs O(result) and catches
+            # attributes set without a save() updating the columns
+            if obj is not None and all(
+                    _in_range(getattr(obj, attr, None), bounds)
+                    for attr, bounds in ranges.items()):
+                found.append(obj)
+        return found
+
+    def scan(self, cls, predicate):
+        """Returns the objects of class cls that predicate accepts
+
+        predicate is called with a function returning the value of an
+        attribute.  Records not built yet are tested as they are, so
+        only the matching ones become instances.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        self.__sync()
+        self.__load_matching(name, predicate)
+        return [obj for obj in list(self.__classes.get(name, {}).values())
+                if predicate(lambda attr: getattr(obj, attr, None))]
+
+    def within(self, cls, lat, lon, radius_km):
+        """Returns the objects of cls within radius_km of a point
+
+        Objects are ordered nearest first.
+        """
+        grid = self.__grid(cls)
+        return [self.__objects[key]
+                for _, key in grid.within(lat, lon, radius_km)]
+
+    def nearest(self, cls, lat, lon, k):
+        """Returns the k objects of cls nearest to a point, nearest first"""
+        grid = self.__grid(cls)
+        return [self.__objects[key] for _, key in grid.nearest(lat, lon, k)]
+
+    def __grid(self, cls):
+        """Returns the grid over cls, built on the fly if not declared"""
+        name = cls if isinstance(cls, str) else cls.__name__
+        self.__sync()
+        self.__load(name)
+        grid = self.__grids.get(name)
+        if grid is None:
+            grid = GridIndex()
+            for key, obj in self.__classes.get(name, {}).items():
+                grid.add(key, obj)
+        return grid
+
+    def __link(self, key, obj):
+        """Stores obj under key and indexes its declared attributes"""
+        name = key.split('.')[0]
+        if key not in self.__objects:
+            self.__linked += 1
+            if self.__raw.get(name, {}).pop(key, None) is None:
+                self.__sorted.pop(name, None)
+        self.__objects[key] = obj
+        self.__classes.setdefault(name, {})[key] = obj
+        for attr, index in self.__indexes.get(name, {}).items():
+            index.add(key, getattr(obj, attr, None))
+        if name in self.__columns:
+            self.__columns[name].add(key, obj)
+        if name in self.__grids:
+            self.__grids[name].add(key, obj)
+
+    def __unlink(self, key):
+        """Removes key from storage and its indexes, True if it existed"""
+        name = key.split('.')[0]
+        self.__encoded.pop(key, None)
+        if self.__objects.pop(key, None) is None:
+            if self.__raw.get(name, {}).pop(key, None) is None:
+                return False
+            self.__sorted.pop(name, None)
+            return True
+        self.__linked -= 1
+        self.__sorted.pop(name, None)
+        self.__classes[name].pop(key, None)
+        for index in self.__indexes.get(name, {}).values():
+            index.remove(key)
+        if name in self.__columns:
+            self.__columns[name].remove(key)
+        if name in self.__grids:
+            self.__grids[name].remove(key)
+        return True
+
+    def __store(self, key, val):
+        """Stores a decoded record, as a model instance unless lazy"""
+        if not self.lazy:
+            self.__link(key, self.__build(val))
+            return
+        self.__unlink(key)
+        self.__raw.setdefault(key.split('.')[0], {})[key] = val
+        self.__sorted.pop(key.split('.')[0], None)
+
+    def __load(self, name):
+        """Builds the model instances of every stored record of name"""
+        if not self.__raw.get(name):
+            return
+        with self.__lock:
+            records = self.__raw.pop(name, None)
+            for key, val in (records or {}).items():
+                self.__link(key, self.__build(val))
+
+    def __load_matching(self, name, predicate):
+        """Builds the stored records of name that predicate accepts
+
+        predicate is called with a function returning an attribute of a
+        record, or the class default when the record lacks it, as an
+        instance would.
+        """
+        records = self.__raw.get(name)
+        if not records:
+            return
+        model = self.__model(name)
+        matches = []
+        for key, val in list(records.items()):
+            if predicate(lambda attr: val[attr] if attr in val
+                         else getattr(model, attr, None)):
+                matches.append(key)
+        with self.__lock:
+            for key in matches:
+                val = records.get(key)
+                if val is not None:
+                    self.__link(key, self.__build(val))
+
+    def __build(self, val):
+        """Returns the model instance described by a decoded record"""
+        model = self.__model(val['__class__'])
+        if self.compact_models:
+            from models.compact import compact_class
+            model = compact_class(model)
+        return model(**val)
+
+    def __model(self, name):
+        """Returns the model class called name"""
+        if self.__models is None:
+            from models.base_model import BaseModel
+            from models.user import User
+            from models.place import Place
+            from models.state import State
+            from models.city import City
+            from models.amenity import Amenity
+            from models.review import Review
+
+            self.__models = {
+                'BaseModel': BaseModel, 'User': User, 'Place': Place,
+                'State': State, 'City': City, 'Amenity': Amenity,
+                'Review': Review
+            }
+        return self.__models[name]
+
+    def __edited(self):
+        """Returns True if all() was modified directly since last checked
+
+        A change in size gives it away at once; once the dict itself was
+        handed out by all(), its objects are also compared with the
+        partitions, to catch a key swapped or replaced in place.
+        """
+        if self.__linked != len(self.__objects):
+            return True
+        if not self.__exposed:
+            return False
+        self.__exposed = False
+        classes = self.__classes
+        for key, obj in self.__objects.items():
+            part = classes.get(key.partition('.')[0])
+            if part is None or part.get(key) is not obj:
+                return True
+        return False
+
+    def __sync(self):
+        """Rebuilds partitions and indexes if all() was modified directly
+
+        The next commit then writes a full snapshot, as the objects put
+        in all() directly never reach __pending or __dirty.
+        """
+        if not self.__edited():
+            return
+        with self.__lock:
+            self.__classes.clear()
+            self.__sorted.clear()
+            for indexes in self.__indexes.values():
+                for index in indexes.values():
+                    index.clear()
+            for store in self.__columns.values():
+                store.clear()
+            for grid in self.__grids.values():
+                grid.clear()
+            objects = dict(self.__objects)
+            self.__objects.clear()
+            self.__linked = 0
+            for key, obj in objects.items():
+                self.__link(key, obj)
+            self.__rewrite = True
 
     def save(self):
-        """Saves storage dictionary to file"""
-        with open(FileStorage.__file_path, 'w') as f:
+        """Saves storage dictionary to file
+
+        Inside a batch() block the write is deferred to the end of the
+        block, or until its max_saves or max_delay policy is reached.
+        With background=True the write is handed to the writer thread
+        and save() returns at once.
+        """
+        if self.__batch_depth:
+            self.__deferred += 1
+            if self.__deferred == 1:
+                self.__deferred_since = time.monotonic()
+            max_saves, max_delay = self.__batch_policy
+            if (max_saves is None or self.__deferred < max_saves) and \
+                    (max_delay is None or
+                     time.monotonic() - self.__deferred_since < max_delay):
+                if metrics.enabled:
+                    metrics.count('storage.saves_deferred')
+                return
+        start = metrics.enabled and time.perf_counter()
+        self.__deferred = 0
+        if self.background:
+            self.__request_write()
+        else:
+            self.__commit()
+        if start:
+            metrics.observe('storage.save', time.perf_counter() - start)
+
+    def flush(self):
+        """Writes out deferred saves and waits for the writer thread"""
+        if self.__deferred:
+            self.__deferred = 0
+            if self.background:
+                self.__request_write()
+            else:
+                self.__commit()
+        if self.__writer is None:
+            return
+        with self.__wake:
+            while self.__written < self.__requested and \
+                    self.__writer.is_alive():
+                self.__wake.wait()
+        self.__raise_write_error()
+
+    def close(self):
+        """Flushes pending saves and stops the writer thread"""
+        self.flush()
+        writer = self.__writer
+        if writer is None:
+            return
+        with self.__wake:
+            self.__closing = True
+            self.__wake.notify_all()
+        writer.join()
+        self.__writer = None
+        self.__closing = False
+        self.__raise_write_error()
+
+    @contextmanager
+    def batch(self, max_saves=None, max_delay=None):
+        """Groups every save() in the block into a single write
+
+        max_saves and max_delay (seconds) optionally bound how many
+        saves, or how long, a write is held back within a long block.
+        Nested blocks join the outermost one.  Deferred saves are
+        written when the block ends, even if it raises.
+        """
+        if not self.__batch_depth:
+            self.__batch_policy = (max_saves, max_delay)
+        self.__batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.__batch_depth -= 1
+            if not self.__batch_depth and self.__deferred:
+                self.__deferred = 0
+                if self.background:
+                    self.__request_write()
+                else:
+                    self.__commit()
+
+    def __request_write(self):
+        """Asks the writer thread for a write, starting it if needed"""
+        with self.__wake:
+            self.__requested += 1
+            if self.__writer is None:
+                self.__writer = threading.Thread(
+                    target=self.__write_loop, name='FileStorage-writer',
+                    daemon=True)
+                self.__writer.start()
+            self.__wake.notify_all()
+
+    def __write_loop(self):
+        """Body of the writer thread: commits until close() stops it"""
+        while True:
+            with self.__wake:
+                while self.__written == self.__requested and \
+                        not self.__closing:
+                    self.__wake.wait()
+                if self.__written == self.__requested:
+                    return
+                # saves requested while this write runs get the next one
+                target = self.__requested
+            try:
+                self.__commit()
+            except Exception as error:
+                self.__write_error = error
+            with self.__wake:
+                self.__written = target
+                self.__wake.notify_all()
+
+    def __raise_write_error(self):
+        """Re-raises in the caller an error from the writer thread"""
+        error, self.__write_error = self.__write_error, None
+        if error is not None:
+            raise error
+
+    def __commit(self):
+        """Writes the changes since the last commit to file, timing it"""
+        start = metrics.enabled and time.perf_counter()
+        self.__write_changes()
+        if start:
+            metrics.observe('storage.commit', time.perf_counter() - start)
+
+    def __write_changes(self):
+        """Writes the changes since the last commit to file
+
+        The changes are serialized under the storage lock, so the write
+        sees a consistent state even from the writer thread; the file
+        I/O happens after the lock is released.
+        """
+        with self.__write_lock:
+            self.__sync()
+            if self.__rewrite:
+                self.__write_snapshot()
+                if self.__journal is not None:
+                    self.__journal.truncate()
+                return
+            if self.__journal is not None:
+                log = self.__journal
+            elif self.shards is None and self.__records is not None and \
+                    isinstance(self.codec, IndexedCodec):
+                log = self.__records
+            else:
+                self.__write_snapshot()
+                return
+            start = metrics.enabled and time.perf_counter()
+            with self.__lock:
+                pending = self.__pending
+                self.__pending = {}
+                changes = [(key, None if obj is None else obj.to_dict())
+                           for key, obj in pending.items()]
+            if start:
+                metrics.observe('storage.serialize',
+                                time.perf_counter() - start)
+            try:
+                self.__wrote(log.append(changes, self.durability))
+            except BaseException:
+                # queued again for the next commit, unless new() or
+                # delete() has queued a later change meanwhile
+                with self.__lock:
+                    for key, obj in pending.items():
+                        self.__pending.setdefault(key, obj)
+                raise
+            if log is self.__journal:
+                if log.records > max(self.compact_threshold,
+                                     len(self.__objects)):
+                    self.__write_snapshot()
+                    log.truncate()
+            elif log.tail > max(self.compact_threshold, len(log)):
+                self.__write_snapshot()
+
+    def convert(self, file_format):
+        """Rewrites the storage file in file_format and keeps using it"""
+        codec = get_codec(file_format)
+        with self.__write_lock:
+            self.codec = codec
+            self.__rewrite = True
+            self.__encoded.clear()
+        self.compact()
+
+    def compact(self):
+        """Folds the journal into a fresh snapshot and empties it"""
+        with self.__write_lock:
+            self.__write_snapshot()
+            if self.__journal is not None:
+                self.__journal.truncate()
+
+    def __record(self, key, source):
+        """Returns what to write for a model instance or a raw record
+
+        With a JSON based codec that is the encoded record, taken from
+        the cache while the instance, and its _version, are unchanged.
+        Lists and dicts can change in place without a new _version, so
+        a copy of them is kept with the cache entry and compared too.
+        """
+        raw = isinstance(source, dict)
+        encode = getattr(self.codec, 'encode_record', None)
+        if encode is None or not self.cache_records:
+            return source if raw else source.to_dict()
+        version = None if raw else source._version
+        cached = self.__encoded.get(key)
+        if cached is not None and cached[0] is source and \
+                cached[1] == version and \
+                all(getattr(source, name, None) == value
+                    for name, value in cached[3]):
+            if metrics.enabled:
+                metrics.count('storage.records_cached')
+            return cached[2]
+        if metrics.enabled:
+            metrics.count('storage.records_encoded')
+        record = source if raw else source.to_dict()
+        mutable = () if raw else \
+            tuple((name, copy.deepcopy(value))
+                  for name, value in record.items()
+                  if isinstance(value, (list, dict)))
+        text = encode(record)
+        self.__encoded[key] = (source, version, text, mutable)
+        return text
+
+    def __wrote(self, timings):
+        """Keeps the timings of a write in last_write and the metrics
+
+        timings is None when an append found nothing to write.
+        """
+        if timings is None:
+            return
+        self.last_write = timings
+        if metrics.enabled:
+            metrics.count('storage.writes')
+            metrics.count('storage.bytes_written', timings['bytes'])
+            metrics.observe('storage.write', timings['write_s'])
+            metrics.observe('storage.fsync', timings['fsync_s'])
+
+    def __shard(self, key):
+        """Returns the name of the shard key is persisted in"""
+        if self.shards == 'class':
+            return key.split('.')[0]
+        return str(zlib.crc32(key.encode('utf-8')) % self.shards)
+
+    def __shard_files(self):
+        """Returns the paths of the shard files present next to file_path"""
+        prefix = self.__file_path + '.shard.'
+        return sorted(path for path in glob.glob(glob.escape(prefix) + '*')
+                      if not path.endswith('.tmp'))
+
+    def __write_snapshot(self):
+        """Writes every object in storage to the snapshot file"""
+        if self.shards is not None:
+            self.__write_shards()
+            return
+        start = metrics.enabled and time.perf_counter()
+        with self.__lock:
             temp = {}
-            temp.update(FileStorage.__objects)
-            for key, val in temp.items():
-                temp[key] = val.to_dict()
-            json.dump(temp, f)
+            # records first: one built meanwhile by get() is then still
+            # found among the objects copied next
+            for records in list(self.__raw.values()):
+                for key in list(records):
+                    temp[key] = self.__record(key, records[key])
+            for key, val in list(self.__objects.items()):
+                temp[key] = self.__record(key, val)
+            self.__pending.clear()
+        if start:
+            metrics.observe('storage.serialize', time.perf_counter() - start)
+        self.__wrote(atomic_write(
+            self.__file_path, lambda f: self.codec.dump(temp.items(), f),
+            self.durability, 'wb'))
+        if isinstance(self.codec, IndexedCodec):
+            self.__records = RecordFile(self.__file_path)
+        else:
+            self.__records = None
+        if self.__rewrite:
+            # shard files left from a sharded layout now live in file_path
+            self.__rewrite = False
+            for path in self.__shard_files():
+                os.remove(path)
+
+    def __write_shards(self):
+        """Writes the dirty shards, or all of them after a layout change
+
+        Objects put in all() directly never reach __dirty, so any sign
+        of that also rewrites every shard.
+        """
+        start = metrics.enabled and time.perf_counter()
+        self.__sync()
+        with self.__lock:
+            rewrite = self.__rewrite
+            dirty = self.__dirty
+            self.__dirty = set()
+            self.__rewrite = False
+            parts = {name: {} for name in dirty}
+            # records first: one built meanwhile by get() is then still
+            # found among the objects copied next
+            for records in list(self.__raw.values()):
+                for key in list(records):
+                    shard = self.__shard(key)
+                    if rewrite or shard in parts:
+                        parts.setdefault(shard, {})[key] = \
+                            self.__record(key, records[key])
+            for key, val in list(self.__objects.items()):
+                shard = self.__shard(key)
+                if rewrite or shard in parts:
+                    parts.setdefault(shard, {})[key] = \
+                        self.__record(key, val)
+            self.__pending.clear()
+        if start:
+            metrics.observe('storage.serialize', time.perf_counter() - start)
+        totals = {'write_s': 0.0, 'fsync_s': 0.0, 'rename_s': 0.0,
+                  'bytes': 0}
+        prefix = self.__file_path + '.shard.'
+        done = set()
+        try:
+            for shard, temp in parts.items():
+                timings = atomic_write(
+                    prefix + shard,
+                    lambda f, temp=temp: self.codec.dump(temp.items(), f),
+                    self.durability, 'wb')
+                done.add(shard)
+                for name in totals:
+                    totals[name] += timings[name]
+        except BaseException:
+            # the shards left unwritten are retried by the next save
+            with self.__lock:
+                self.__dirty.update(parts.keys() - done)
+                self.__rewrite = self.__rewrite or rewrite
+            raise
+        self.__wrote(totals)
+        if rewrite:
+            written = {prefix + shard for shard in parts}
+            for path in self.__shard_files():
+                if path not in written:
+                    os.remove(path)
+            if os.path.exists(self.__file_path):
+                os.remove(self.__file_path)
+
+    def __map_records(self):
+        """Keeps every record of the indexed file undecoded, for lazy mode"""
+        views = {}
+        for key in self.__records.index:
+            name = key.split('.')[0]
+            self.__unlink(key)
+            view = views.get(name)
+            if view is None:
+                view = views[name] = LazyRecords(self.__records)
+                view.update(self.__raw.get(name, {}))
+            view.add(key)
+        self.__raw.update(views)
+        self.__sorted.clear()
+        return len(self.__records)
 
     def reload(self):
-        """Loads storage dictionary from file"""
-        from models.base_model import BaseModel
-        from models.user import User
-        from models.place import Place
-        from models.state import State
-        from models.city import City
-        from models.amenity import Amenity
-        from models.review import Review
-
-        classes = {
-                    'BaseModel': BaseModel, 'User': User, 'Place': Place,
-                    'State': State, 'City': City, 'Amenity': Amenity,
-                    'Review': Review
-                  }
+        """Loads storage dictionary from file
+
+        The file is decoded one object at a time, in whichever format it
+        was written, so only the model instances built so far are held in
+        memory.  If progress is set it is called as
+        progress(objects_loaded, bytes_read) every progress_every objects
+        and once more when loading completes, or after each shard when
+        sharded.  A lazily loaded 'indexed' file only has its index read.
+        """
+        start = metrics.enabled and time.perf_counter()
+        shard_files = self.__shard_files()
+        if self.shards is not None or shard_files:
+            self.__reload_shards(shard_files)
+        else:
+            self.__reload_file()
+        if self.__journal is not None:
+            for key, val in self.__journal.replay():
+                if val is None:
+                    self.__unlink(key)
+                else:
+                    self.__store(key, val)
+        if start:
+            metrics.observe('storage.reload', time.perf_counter() - start)
+            metrics.count('storage.objects_loaded', self.count())
+
+    def __reload_shards(self, shard_files):
+        """Loads the shard files, decoding them on a process pool
+
+        A file_path left by an unsharded layout is loaded first, and any
+        file that does not belong to the current layout has its objects
+        written back in it at the next save.
+        """
+        paths = list(shard_files)
+        if os.path.exists(self.__file_path):
+            paths.insert(0, self.__file_path)
+        if self.shards is None:
+            expected = {self.__file_path}
+        elif self.shards == 'class':
+            expected = {path for path in shard_files
+                        if not path.rsplit('.', 1)[1].isdigit()}
+        else:
+            prefix = self.__file_path + '.shard.'
+            expected = {prefix + str(n) for n in range(self.shards)}
+        if any(path not in expected for path in paths):
+            self.__rewrite = True
+        self.__records = None
+        loaded = 0
+        read = 0
+        for path, items in self.__read_files(paths):
+            for key, val in items:
+                self.__store(key, val)
+                loaded += 1
+            read += os.path.getsize(path)
+            if self.progress:
+                self.progress(loaded, read)
+
+    def __read_files(self, paths):
+        """Yields (path, [(key, record), ...]) for each storage file
+
+        reload_workers defaults to the number of CPUs; with a single one
+        the files are read in this process.
+        """
+        workers = self.reload_workers or os.cpu_count() or 1
+        if len(paths) < 2 or workers < 2:
+            for path in paths:
+                yield path, _read_file(path)
+            return
+        with ProcessPoolExecutor(workers) as pool:
+            yield from zip(paths, pool.map(_read_file, paths))
+
+    def __reload_file(self):
+        """Loads the single file at file_path"""
+        loaded = 0
         try:
-            temp = {}
-            with open(FileStorage.__file_path, 'r') as f:
-                temp = json.load(f)
-                for key, val in temp.items():
-                    self.all()[key] = classes[val['__class__']](**val)
+            with open(self.__file_path, 'rb') as f:
+                codec = detect(f)
+                self.__records = None
+                if isinstance(codec, IndexedCodec):
+                    self.__records = RecordFile(self.__file_path)
+                if self.lazy and self.__records is not None:
+                    loaded = self.__map_records()
+                else:
+                    for key, val in codec.load(f):
+                        self.__store(key, val)
+                        loaded += 1
+                        if self.progress and \
+                                loaded % self.progress_every == 0:
+                            self.progress(loaded, f.tell())
+                if self.progress:
+                    self.progress(loaded, max(f.tell(), self.__records.end
+                                              if self.__records else 0))
         except FileNotFoundError:
             pass
+
+
+def _read_file(path):
+    """Returns the (key, record) pairs of a storage file, in any format"""
+    with open(path, 'rb') as f:
+        return list(detect(f).load(f))
+
+
+def _in_range(value, bounds):
+    """Returns True if value is a number within the (low, high) bounds"""
+    low, high = bounds
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return False
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+def _matches(stored, value):
+    """Returns True if stored equals value or is a list holding it"""
+    if stored == value:
+        return True
+    return isinstance(stored, (list, tuple, set)) and value in stored
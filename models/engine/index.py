@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""This module defines a secondary index over one model attribute"""
+
+
+class AttributeIndex:
+    """Hash index mapping the values of one attribute to storage keys
+
+    List values (such as Place.amenity_ids) index the key under each
+    of their items.
+    """
+
+    def __init__(self, attr):
+        """Instantiates an empty index over attr"""
+        self.attr = attr
+        self.__keys = {}
+        self.__values = {}
+
+    def __len__(self):
+        """Returns the number of indexed keys"""
+        return len(self.__values)
+
+    def add(self, key, value):
+        """Indexes key under value, replacing any previous value"""
+        if isinstance(value, (list, tuple, set)):
+            value = tuple(value)
+            items = value
+        else:
+            items = (value,)
+        try:
+            old = self.__values[key]
+        except KeyError:
+            pass
+        else:
+            if old == value:
+                return
+            self.remove(key)
+        try:
+            for item in items:
+                hash(item)
+        except TypeError:
+            # unhashable values cannot be looked up by equality
+            return
+        for item in items:
+            self.__keys.setdefault(item, set()).add(key)
+        self.__values[key] = value
+
+    def remove(self, key):
+        """Drops key from the index"""
+        if key not in self.__values:
+            return
+        value = self.__values.pop(key)
+        items = value if isinstance(value, tuple) else (value,)
+        for item in items:
+            keys = self.__keys.get(item)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.__keys[item]
+
+    def clear(self):
+        """Drops every key from the index"""
+        self.__keys.clear()
+        self.__values.clear()
+
+    def lookup(self, value):
+        """Returns the set of keys indexed under value"""
+        try:
+            return set(self.__keys.get(value, ()))
+        except TypeError:
+            return set()
@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+"""This module defines an append-only change journal for FileStorage"""
+import json
+import os
+import time
+from models.engine.atomic import fsync_dir
+
+
+class Journal:
+    """Append-only log of storage changes replayed over a snapshot
+
+    Each line is one JSON record, either
+    {"op": "set", "key": <key>, "obj": <to_dict() output>} or
+    {"op": "del", "key": <key>}.
+    """
+
+    def __init__(self, path):
+        """Instantiates a journal stored at path"""
+        self.path = path
+        self.records = 0
+        self.end = None
+
+    def append(self, changes, durability='none'):
+        """Appends (key, dict) changes to the log, None dicts are deletes
+
+        durability is 'none', 'file' to fsync the log, or 'dir' to also
+        fsync its directory when the append created it.  Returns the
+        timings of the write like atomic_write, or None if there was
+        nothing to append.
+        """
+        lines = []
+        for key, val in changes:
+            if val is None:
+                record = {'op': 'del', 'key': key}
+            else:
+                record = {'op': 'set', 'key': key, 'obj': val}
+            lines.append(json.dumps(record))
+        if not lines:
+            return None
+        created = not os.path.exists(self.path)
+        start = time.perf_counter()
+        with open(self.path, 'a') as f:
+            if self.end is not None and f.tell() > self.end:
+                # drop what a failed append left, so lines stay whole
+                f.truncate(self.end)
+            offset = f.tell()
+            f.write('\n'.join(lines) + '\n')
+            f.flush()
+            written = time.perf_counter()
+            if durability != 'none':
+                os.fsync(f.fileno())
+            size = f.tell() - offset
+            self.end = f.tell()
+        if durability == 'dir' and created:
+            fsync_dir(self.path)
+        done = time.perf_counter()
+        self.records += len(lines)
+        return {'write_s': written - start, 'fsync_s': done - written,
+                'rename_s': 0.0, 'bytes': size}
+
+    def replay(self):
+        """Yields (key, dict) changes in log order, None dicts are deletes
+
+        A torn final line left by a crash mid-append is cut off the log,
+        like RecordFile does, so the next append starts on a fresh line.
+        """
+        count = 0
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            self.records = 0
+            self.end = 0
+            return
+        with f:
+            end = 0
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                if line.strip():
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    count += 1
+                    if record['op'] == 'del':
+                        yield record['key'], None
+                    else:
+                        yield record['key'], record['obj']
+                end += len(line)
+        if end < os.path.getsize(self.path):
+            os.truncate(self.path, end)
+        self.records = count
+        self.end = end
+
+    def truncate(self):
+        """Empties the log once its changes are folded into a snapshot"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self.records = 0
+        self.end = 0
@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+"""This module decodes a JSON object file one member at a time"""
+import codecs
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+def iter_items(f, chunk_size=1 << 16):
+    """Yields the (key, value) members of the JSON object stored in f
+
+    f is a file opened in binary mode holding UTF-8 text.  Only the
+    member being decoded and one read chunk are held in memory, instead
+    of the whole decoded file as with json.load.  Raises ValueError,
+    like json.load, if f does not hold a JSON object.
+    """
+    reader = _Reader(f, chunk_size)
+    if reader.next_char() != '{':
+        raise json.JSONDecodeError('Expecting object', reader.buf, reader.pos)
+    reader.pos += 1
+    if reader.next_char() == '}':
+        return
+    while True:
+        key = reader.decode()
+        if not isinstance(key, str):
+            raise json.JSONDecodeError('Expecting property name',
+                                       reader.buf, reader.pos)
+        if reader.next_char() != ':':
+            raise json.JSONDecodeError("Expecting ':' delimiter",
+                                       reader.buf, reader.pos)
+        reader.pos += 1
+        yield key, reader.decode()
+        char = reader.next_char()
+        reader.pos += 1
+        if char == '}':
+            return
+        if char != ',':
+            raise json.JSONDecodeError("Expecting ',' delimiter",
+                                       reader.buf, reader.pos - 1)
+
+
+class _Reader:
+    """Buffered view of a text file for incremental decoding"""
+
+    def __init__(self, f, chunk_size):
+        """Instantiates a reader over f"""
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.text = codecs.getincrementaldecoder('utf-8')()
+
+    def fill(self):
+        """Reads another chunk, dropping what was already consumed"""
+        data = self.f.read(self.chunk_size)
+        chunk = self.text.decode(data, final=not data)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def next_char(self):
+        """Skips whitespace and returns the next character, '' at EOF"""
+        while True:
+            while self.pos < len(self.buf) and \
+                    self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def decode(self):
+        """Decodes the next JSON value, reading more input as needed"""
+        self.next_char()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # a number may continue past the end of the buffer
+            if end == len(self.buf) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""This module collects counters and latency histograms of storage work
+
+Collection is off until enable() is called.  Instrumented code guards
+each measurement with the module's enabled flag, as in
+
+    start = metrics.enabled and time.perf_counter()
+    ...
+    if start:
+        metrics.observe('storage.new', time.perf_counter() - start)
+
+so while disabled it costs a single attribute check.
+"""
+import threading
+
+enabled = False
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+
+
+class Histogram:
+    """Latency histogram with power of two microsecond buckets
+
+    Bucket b holds the samples below 2 ** b microseconds, so
+    percentiles are exact to within a factor of two, in constant memory.
+    """
+    __slots__ = ('count', 'total', 'low', 'high', 'buckets')
+
+    def __init__(self):
+        """Instantiates an empty histogram"""
+        self.count = 0
+        self.total = 0.0
+        self.low = None
+        self.high = 0.0
+        self.buckets = [0] * 40
+
+    def add(self, seconds):
+        """Records a sample of seconds"""
+        self.count += 1
+        self.total += seconds
+        if self.low is None or seconds < self.low:
+            self.low = seconds
+        if seconds > self.high:
+            self.high = seconds
+        bucket = min(int(seconds * 1e6).bit_length(), 39)
+        self.buckets[bucket] += 1
+
+    def percentile(self, q):
+        """Returns the upper bound in microseconds of the q-th percentile"""
+        rank = q / 100 * self.count
+        seen = 0
+        for bucket, samples in enumerate(self.buckets):
+            seen += samples
+            if samples and seen >= rank:
+                return min(float(2 ** bucket), self.high * 1e6)
+        return self.high * 1e6
+
+    def summary(self):
+        """Returns the count, total and latency figures as a dict"""
+        if not self.count:
+            return {'count': 0}
+        return {'count': self.count, 'total_s': round(self.total, 6),
+                'mean_us': round(self.total / self.count * 1e6, 1),
+                'min_us': round(self.low * 1e6, 1),
+                'p50_us': round(self.percentile(50), 1),
+                'p90_us': round(self.percentile(90), 1),
+                'p99_us': round(self.percentile(99), 1),
+                'max_us': round(self.high * 1e6, 1)}
+
+
+def enable(on=True):
+    """Turns collection on, or off with on=False"""
+    global enabled
+    enabled = on
+
+
+def reset():
+    """Drops every counter and histogram"""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def count(name, n=1):
+    """Adds n to the counter name"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def observe(name, seconds):
+    """Records a latency sample of seconds in the histogram name"""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.add(seconds)
+
+
+def snapshot():
+    """Returns the counters and histogram summaries collected so far"""
+    with _lock:
+        counters = dict(sorted(_counters.items()))
+        histograms = {name: _histograms[name].summary()
+                      for name in sorted(_histograms)}
+    return {'enabled': enabled, 'counters': counters,
+            'histograms': histograms}
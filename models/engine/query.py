@@ -0,0 +1,439 @@
+#!/usr/bin/python3
+"""This module defines the query language of the console search command
+
+A query is an optional condition followed by optional clauses:
+
+    <condition> [order by <attribute> [asc|desc]] [limit <n>]
+
+A condition compares an attribute with a value using =, !=, <, <=, >
+or >=, or tests it with in (<value>, ...); 'attribute value' is short
+for 'attribute = value', and an attribute followed by plain words that
+do not form a query is compared with the words, as in 'name My House'.
+A list attribute equals a value it holds.  Conditions combine with and,
+or and parentheses, and keywords are case insensitive.  Values are words or
+quoted strings; those of attributes in the types table are cast with it,
+and so are the stored values they are compared with.
+
+plan() turns a query into a Plan, which fetches candidates through an
+attribute index or the numeric columns of the storage when the condition
+allows it, and through storage.scan() otherwise, before checking the
+whole condition on them.
+"""
+import re
+from datetime import datetime
+from models.base_model import format_time
+
+KEYWORDS = ('and', 'or', 'in', 'order', 'by', 'asc', 'desc', 'limit')
+_TOKEN = re.compile(r'''\s*(?:
+    (?P<punct>[(),]) |
+    (?P<op>==|!=|<=|>=|=|<|>) |
+    (?P<quoted>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*') |
+    (?P<word>[^\s(),=<>!"']+)
+)''', re.VERBOSE)
+
+
+def tokenize(text):
+    """Returns the (kind, text) tokens of a query"""
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if match is None:
+            raise ValueError('unexpected {!r}'.format(text[pos:].strip()))
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'quoted':
+            value = re.sub(r'\\(.)', r'\1', value[1:-1])
+        elif kind == 'op' and value == '==':
+            value = '='
+        elif kind == 'word' and value.lower() in KEYWORDS:
+            kind, value = 'keyword', value.lower()
+        tokens.append((kind, value))
+        pos = match.end()
+    return tokens
+
+
+def _normalize(value):
+    """Returns a stored value in the form queries compare it in"""
+    if isinstance(value, datetime):
+        return format_time(value)
+    return value
+
+
+def _equals(stored, value):
+    """Returns True if stored equals value or is a list holding it
+
+    The same rule as FileStorage.find, so lists of foreign keys such as
+    Place.amenity_ids match whichever access path a plan takes.
+    """
+    if stored == value:
+        return True
+    return isinstance(stored, (list, tuple, set)) and value in stored
+
+
+def _cast(attr, value, types):
+    """Returns value cast with the type of attr, raising ValueError"""
+    kind = types.get(attr)
+    if kind is None or value is None or isinstance(value, kind):
+        return value
+    return kind(value)
+
+
+class Compare:
+    """A comparison of an attribute with a value"""
+
+    def __init__(self, attr, op, value, types):
+        """Instantiates the comparison attr op value"""
+        self.attr = attr
+        self.op = op
+        self.value = value
+        self.types = types
+
+    def test(self, get):
+        """Returns True if the attributes read by get satisfy it"""
+        try:
+            value = _cast(self.attr, _normalize(get(self.attr)), self.types)
+        except (TypeError, ValueError):
+            return False
+        if self.op == '=':
+            return _equals(value, self.value)
+        if self.op == '!=':
+            return not _equals(value, self.value)
+        try:
+            if self.op == '<':
+                return value < self.value
+            if self.op == '<=':
+                return value <= self.value
+            if self.op == '>':
+                return value > self.value
+            return value >= self.value
+        except TypeError:
+            return False
+
+    def __str__(self):
+        """Returns the comparison as query text"""
+        return '{} {} {!r}'.format(self.attr, self.op, self.value)
+
+
+class In:
+    """A test of an attribute against a list of values"""
+
+    def __init__(self, attr, values, types):
+        """Instantiates the test attr in values"""
+        self.attr = attr
+        self.values = values
+        self.types = types
+
+    def test(self, get):
+        """Returns True if the attributes read by get satisfy it"""
+        try:
+            value = _cast(self.attr, _normalize(get(self.attr)), self.types)
+        except (TypeError, ValueError):
+            return False
+        return any(_equals(value, item) for item in self.values)
+
+    def __str__(self):
+        """Returns the test as query text"""
+        return '{} in ({})'.format(
+            self.attr, ', '.join(repr(value) for value in self.values))
+
+
+class And:
+    """Conditions that must all hold"""
+
+    def __init__(self, terms):
+        """Instantiates the conjunction of terms"""
+        self.terms = terms
+
+    def test(self, get):
+        """Returns True if the attributes read by get satisfy it"""
+        return all(term.test(get) for term in self.terms)
+
+    def __str__(self):
+        """Returns the conjunction as query text"""
+        return '(' + ' and '.join(str(term) for term in self.terms) + ')'
+
+
+class Or:
+    """Conditions of which one must hold"""
+
+    def __init__(self, terms):
+        """Instantiates the disjunction of terms"""
+        self.terms = terms
+
+    def test(self, get):
+        """Returns True if the attributes read by get satisfy it"""
+        return any(term.test(get) for term in self.terms)
+
+    def __str__(self):
+        """Returns the disjunction as query text"""
+        return '(' + ' or '.join(str(term) for term in self.terms) + ')'
+
+
+class Query:
+    """A parsed query: condition, ordering and limit"""
+
+    def __init__(self, where=None, order_by=None, descending=False,
+                 limit=None, types=None):
+        """Instantiates a query, where None matching everything"""
+        self.where = where
+        self.order_by = order_by
+        self.descending = descending
+        self.limit = limit
+        self.types = types or {}
+
+
+class _Parser:
+    """Recursive descent parser over the tokens of a query"""
+
+    def __init__(self, tokens, types):
+        """Instantiates a parser of the tokens of a query"""
+        self.tokens = tokens
+        self.pos = 0
+        self.types = types
+
+    def peek(self, kind=None, value=None):
+        """Returns the next token if it has kind and value, else None"""
+        if self.pos == len(self.tokens):
+            return None
+        token = self.tokens[self.pos]
+        if (kind is None or token[0] == kind) and \
+                (value is None or token[1] == value):
+            return token
+        return None
+
+    def take(self, kind=None, value=None, expected=None):
+        """Consumes the next token, raising ValueError if it is not kind"""
+        token = self.peek(kind, value)
+        if token is None:
+            found = self.peek()
+            raise ValueError('expected {} but found {}'.format(
+                expected or value or kind,
+                repr(found[1]) if found else 'end of query'))
+        self.pos += 1
+        return token[1]
+
+    def query(self):
+        """query: [or_expr] [order by attr [asc|desc]] [limit n]"""
+        query = Query(types=self.types)
+        if self.peek() is not None and not self.peek('keyword', 'order') \
+                and not self.peek('keyword', 'limit'):
+            query.where = self.or_expr()
+        if self.peek('keyword', 'order'):
+            self.take()
+            self.take('keyword', 'by')
+            query.order_by = self.take('word', expected='an attribute')
+            if self.peek('keyword', 'asc') or self.peek('keyword', 'desc'):
+                query.descending = self.take() == 'desc'
+        if self.peek('keyword', 'limit'):
+            self.take()
+            limit = self.take('word', expected='a limit')
+            if not limit.isdigit():
+                raise ValueError('limit must be a number, not ' + limit)
+            query.limit = int(limit)
+        if self.peek() is not None:
+            raise ValueError('unexpected ' + repr(self.peek()[1]))
+        return query
+
+    def or_expr(self):
+        """or_expr: and_expr (or and_expr)*"""
+        terms = [self.and_expr()]
+        while self.peek('keyword', 'or'):
+            self.take()
+            terms.append(self.and_expr())
+        return terms[0] if len(terms) == 1 else Or(terms)
+
+    def and_expr(self):
+        """and_expr: term (and term)*"""
+        terms = [self.term()]
+        while self.peek('keyword', 'and'):
+            self.take()
+            terms.append(self.term())
+        return terms[0] if len(terms) == 1 else And(terms)
+
+    def term(self):
+        """term: ( or_expr ) | attr op value | attr in ( value, ... )"""
+        if self.peek('punct', '('):
+            self.take()
+            expr = self.or_expr()
+            self.take('punct', ')')
+            return expr
+        attr = self.take('word', expected='an attribute')
+        if self.peek('keyword', 'in'):
+            self.take()
+            self.take('punct', '(')
+            values = [self.value(attr)]
+            while self.peek('punct', ','):
+                self.take()
+                values.append(self.value(attr))
+            self.take('punct', ')')
+            return In(attr, values, self.types)
+        op = '='
+        if self.peek('op'):
+            op = self.take()
+        return Compare(attr, op, self.value(attr), self.types)
+
+    def value(self, attr):
+        """value: word | quoted, cast with the type of attr"""
+        if self.peek('quoted'):
+            text = self.take()
+        else:
+            text = self.take('word', expected='a value')
+        try:
+            return _cast(attr, text, self.types)
+        except ValueError:
+            raise ValueError('invalid value {!r} for {}'.format(
+                text, attr)) from None
+
+
+def parse(text, types=None):
+    """Returns the Query of text, raising ValueError if it is invalid
+
+    Text that is not a valid query but reads as an attribute followed by
+    plain words, with no operator, keeps its legacy meaning of the
+    attribute equal to the words, e.g. 'name My House'.
+    """
+    types = types or {}
+    tokens = tokenize(text)
+    try:
+        return _Parser(tokens, types).query()
+    except ValueError:
+        if len(tokens) < 3 or tokens[0][0] != 'word' or \
+                any(kind in ('punct', 'op', 'quoted')
+                    for kind, _ in tokens):
+            raise
+    attr, value = text.split(None, 1)
+    try:
+        value = _cast(attr, ' '.join(value.split()), types)
+    except ValueError:
+        raise ValueError('invalid value {!r} for {}'.format(
+            value, attr)) from None
+    return Query(Compare(attr, '=', value, types), types=types)
+
+
+class Plan:
+    """How a query is run against one class of a storage"""
+
+    def __init__(self, storage, cls, query, access, detail=None):
+        """Instantiates a plan fetching candidates through access
+
+        access is 'index' (detail is (attr, values)), 'columns' (detail
+        maps attributes to (low, high) ranges) or 'scan'.
+        """
+        self.storage = storage
+        self.cls = cls
+        self.query = query
+        self.access = access
+        self.detail = detail
+
+    def run(self):
+        """Returns the objects matching the query, ordered and limited"""
+        query = self.query
+        where = query.where
+        if self.access == 'index':
+            attr, values = self.detail
+            found = {}
+            for value in values:
+                for obj in self.storage.find(self.cls, attr, value):
+                    found[id(obj)] = obj
+            candidates = list(found.values())
+        elif self.access == 'columns':
+            candidates = self.storage.filter(self.cls, **self.detail)
+        else:
+            candidates = self.storage.scan(
+                self.cls, where.test if where else lambda get: True)
+        if where is not None and self.access != 'scan':
+            candidates = [obj for obj in candidates if where.test(
+                lambda attr, obj=obj: getattr(obj, attr, None))]
+        if query.order_by is not None:
+            candidates = self.__order(candidates)
+        if query.limit is not None:
+            candidates = candidates[:query.limit]
+        return candidates
+
+    def __order(self, objs):
+        """Returns objs sorted on the order by attribute"""
+        attr = self.query.order_by
+        types = self.query.types
+
+        def key(obj):
+            """Sort key: objects lacking the attribute go last"""
+            try:
+                value = _cast(attr, _normalize(getattr(obj, attr, None)),
+                              types)
+            except (TypeError, ValueError):
+                value = None
+            return (value is None, value)
+        try:
+            return sorted(objs, key=key, reverse=self.query.descending)
+        except TypeError:
+            return sorted(objs, key=lambda obj: str(key(obj)[1]),
+                          reverse=self.query.descending)
+
+    def explain(self):
+        """Returns the lines describing the plan"""
+        if self.access == 'index':
+            attr, values = self.detail
+            access = 'index lookup on {}.{} for {}'.format(
+                self.cls, attr, ', '.join(repr(v) for v in values))
+        elif self.access == 'columns':
+            access = 'column range scan of {} on {}'.format(
+                self.cls, ', '.join(
+                    '{} in [{}, {}]'.format(
+                        attr, '-inf' if low is None else low,
+                        'inf' if high is None else high)
+                    for attr, (low, high) in self.detail.items()))
+        else:
+            access = 'full scan of {}, condition tested before ' \
+                'building objects'.format(self.cls)
+        lines = ['access: ' + access]
+        if self.query.where is not None:
+            lines.append('filter: ' + str(self.query.where))
+        if self.query.order_by is not None:
+            lines.append('order by: {} {}'.format(
+                self.query.order_by,
+                'desc' if self.query.descending else 'asc'))
+        if self.query.limit is not None:
+            lines.append('limit: {}'.format(self.query.limit))
+        return lines
+
+
+def plan(storage, cls, query):
+    """Returns the Plan for query over the objects of class name cls
+
+    Only the conditions every match must satisfy, the terms of a top
+    level and, can pick the access path.  An equality or in on an
+    indexed attribute without a type is preferred, then comparisons of
+    number values on attributes held in columns, then a full scan.
+    """
+    where = query.where
+    terms = where.terms if isinstance(where, And) else \
+        [where] if where is not None else []
+    indexed = getattr(storage, 'indexes', {}).get(cls, ())
+    columns = getattr(storage, 'columns', {}).get(cls, ())
+    for term in terms:
+        if not isinstance(term, (Compare, In)) or \
+                term.attr not in indexed or term.attr in query.types:
+            continue
+        if isinstance(term, In):
+            return Plan(storage, cls, query, 'index',
+                        (term.attr, term.values))
+        if term.op == '=':
+            return Plan(storage, cls, query, 'index',
+                        (term.attr, [term.value]))
+    ranges = {}
+    for term in terms:
+        if not isinstance(term, Compare) or term.attr not in columns or \
+                term.op == '!=' or isinstance(term.value, bool) or \
+                not isinstance(term.value, (int, float)):
+            continue
+        low, high = ranges.get(term.attr, (None, None))
+        if term.op in ('=', '>', '>='):
+            low = term.value if low is None else max(low, term.value)
+        if term.op in ('=', '<', '<='):
+            high = term.value if high is None else min(high, term.value)
+        ranges[term.attr] = (low, high)
+    if ranges:
+        return Plan(storage, cls, query, 'columns', ranges)
+    return Plan(storage, cls, query, 'scan')
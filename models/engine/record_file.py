@@ -0,0 +1,237 @@
+#!/usr/bin/python3
+"""This module defines a record file with an id to offset index
+
+The file starts with a header holding the magic, then the offset and
+size of the index.  Records follow, each a '<II' frame holding the byte
+sizes of its key and body, then both in UTF-8; the body is the compact
+JSON of the record, or empty for a deleted key; a record given as a str
+is taken as already encoded.  The index is the
+compact JSON of {key: [body offset, body size]} for every record before
+it.  Records appended after the index supersede its entries and are
+found by scanning from its end when the file is opened, so updating an
+object never rewrites the rest of the file.
+"""
+import io
+import json
+import mmap
+import os
+import struct
+import time
+from collections.abc import MutableMapping
+
+MAGIC = b'HBNBMAP1'
+HEADER = struct.Struct('<8sQQ')
+FRAME = struct.Struct('<II')
+_encoder = json.JSONEncoder(separators=(',', ':'))
+
+
+def encode_record(record):
+    """Returns the compact JSON text of a record, as is if already a str"""
+    if isinstance(record, str):
+        return record
+    return _encoder.encode(record)
+
+
+def _encode(key, record):
+    """Returns the key and body bytes of a record, body empty if deleted"""
+    if record is None:
+        return key.encode('utf-8'), b''
+    return key.encode('utf-8'), encode_record(record).encode('utf-8')
+
+
+def _parse(buf):
+    """Returns the index, appended record count and end of valid data
+
+    A torn record at the very end, left by a crash mid-append, is
+    ignored and falls past the returned end.
+    """
+    if len(buf) < HEADER.size:
+        raise ValueError('truncated record file header')
+    magic, offset, size = HEADER.unpack_from(buf)
+    if magic != MAGIC:
+        raise ValueError('not an indexed record file')
+    if offset + size > len(buf):
+        raise ValueError('truncated record file index')
+    index = json.loads(bytes(buf[offset:offset + size]))
+    pos = offset + size
+    tail = 0
+    while pos + FRAME.size <= len(buf):
+        key_size, body_size = FRAME.unpack_from(buf, pos)
+        body = pos + FRAME.size + key_size
+        if body + body_size > len(buf):
+            break
+        key = bytes(buf[pos + FRAME.size:body]).decode('utf-8')
+        if body_size:
+            index[key] = [body, body_size]
+        else:
+            index.pop(key, None)
+        tail += 1
+        pos = body + body_size
+    return index, tail, pos
+
+
+def dump(records, f):
+    """Writes the (key, record) pairs and their index to the binary file f
+
+    f must be seekable, the header is filled in once the index is known.
+    """
+    start = f.tell()
+    f.write(HEADER.pack(MAGIC, 0, 0))
+    offset = HEADER.size
+    index = {}
+    for key, record in records:
+        key, body = _encode(key, record)
+        f.write(FRAME.pack(len(key), len(body)))
+        f.write(key)
+        f.write(body)
+        offset += FRAME.size + len(key)
+        index[key.decode('utf-8')] = [offset, len(body)]
+        offset += len(body)
+    data = _encoder.encode(index).encode('utf-8')
+    f.write(data)
+    f.seek(start)
+    f.write(HEADER.pack(MAGIC, offset, len(data)))
+    f.seek(0, io.SEEK_END)
+
+
+def load(f):
+    """Yields the (key, record) pairs stored in the binary file f"""
+    try:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        f.seek(0)
+        buf = f.read()
+    index, _, _ = _parse(buf)
+    for key, (offset, size) in index.items():
+        yield key, json.loads(buf[offset:offset + size])
+
+
+class RecordFile:
+    """Random access to the records of a file written by dump()
+
+    The file is memory mapped, so reading one record only touches the
+    pages holding it, whatever the size of the file.
+    """
+
+    def __init__(self, path):
+        """Opens the record file at path and reads its index"""
+        self.path = path
+        self.__file = open(path, 'rb')
+        self.__map = mmap.mmap(self.__file.fileno(), 0,
+                               access=mmap.ACCESS_READ)
+        self.index, self.tail, self.end = _parse(self.__map)
+
+    def __len__(self):
+        """Returns the number of live records"""
+        return len(self.index)
+
+    def __contains__(self, key):
+        """Returns True if key has a live record"""
+        return key in self.index
+
+    def read(self, key):
+        """Returns the decoded record of key, raising KeyError if none"""
+        offset, size = self.index[key]
+        if offset + size > len(self.__map):
+            # appended since the file was mapped
+            self.__map.close()
+            self.__map = mmap.mmap(self.__file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        return json.loads(self.__map[offset:offset + size])
+
+    def append(self, changes, durability='none'):
+        """Appends (key, dict) changes to the file, None dicts are deletes
+
+        The index is patched in memory; the file's own index is only
+        rewritten by a new dump().  durability is 'none' or 'file'/'dir'
+        to fsync the file.  Returns the timings of the write like
+        atomic_write, or None if there was nothing to append.
+        """
+        frames = []
+        for key, val in changes:
+            key, body = _encode(key, val)
+            frames.append((key, body))
+        if not frames:
+            return None
+        start = time.perf_counter()
+        # applied to the index once the records are safely written
+        located = {}
+        with open(self.path, 'r+b') as f:
+            # drop a torn record so the new ones stay reachable
+            f.truncate(self.end)
+            f.seek(self.end)
+            pos = self.end
+            for key, body in frames:
+                f.write(FRAME.pack(len(key), len(body)))
+                f.write(key)
+                f.write(body)
+                pos += FRAME.size + len(key)
+                located[key.decode('utf-8')] = \
+                    [pos, len(body)] if body else None
+                pos += len(body)
+            f.flush()
+            written = time.perf_counter()
+            if durability != 'none':
+                os.fsync(f.fileno())
+        done = time.perf_counter()
+        for key, location in located.items():
+            if location is None:
+                self.index.pop(key, None)
+            else:
+                self.index[key] = location
+        size = pos - self.end
+        self.end = pos
+        self.tail += len(frames)
+        return {'write_s': written - start, 'fsync_s': done - written,
+                'rename_s': 0.0, 'bytes': size}
+
+    def close(self):
+        """Unmaps and closes the file"""
+        self.__map.close()
+        self.__file.close()
+
+
+class LazyRecords(MutableMapping):
+    """The records of some keys of a RecordFile, decoded on first access
+
+    Stands in for the dict of raw records FileStorage keeps per class in
+    lazy mode; records set directly are held as given.
+    """
+
+    def __init__(self, records):
+        """Instantiates an empty view over the RecordFile records"""
+        self.__records = records
+        self.__keys = set()
+        self.__decoded = {}
+
+    def add(self, key):
+        """Makes the stored record of key part of the view"""
+        self.__keys.add(key)
+        self.__decoded.pop(key, None)
+
+    def __getitem__(self, key):
+        """Returns the record of key, decoding it the first time"""
+        val = self.__decoded.get(key)
+        if val is None:
+            if key not in self.__keys:
+                raise KeyError(key)
+            val = self.__decoded[key] = self.__records.read(key)
+        return val
+
+    def __setitem__(self, key, val):
+        """Replaces the record of key"""
+        self.__keys.add(key)
+        self.__decoded[key] = val
+
+    def __delitem__(self, key):
+        """Drops key from the view"""
+        self.__keys.remove(key)
+        self.__decoded.pop(key, None)
+
+    def __iter__(self):
+        """Iterates over the keys in the view"""
+        return iter(self.__keys)
+
+    def __len__(self):
+        """Returns the number of keys in the view"""
+        return len(self.__keys)
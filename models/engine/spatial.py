@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+"""This module defines a grid index over latitude and longitude"""
+from math import asin, cos, floor, radians, sin, sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.195
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Returns the great-circle distance between two points in km"""
+    lat1, lon1, lat2, lon2 = map(radians, (lat1, lon1, lat2, lon2))
+    a = sin((lat2 - lat1) / 2) ** 2 + \
+        cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+def _own(obj, attr):
+    """Returns attr as set on obj itself, None if only the class has it"""
+    try:
+        return vars(obj).get(attr)
+    except TypeError:
+        pass
+    # compact variants have no __dict__: unset slots raise
+    try:
+        return object.__getattribute__(obj, attr)
+    except AttributeError:
+        return getattr(obj, '_extra', {}).get(attr)
+
+
+def _coordinates(obj, attrs):
+    """Returns the (lat, lon) of obj as floats, None if not valid
+
+    The class defaults of Place are 0.0, so an object without its own
+    location would otherwise be indexed at (0, 0).
+    """
+    try:
+        lat, lon = (float(_own(obj, attr)) for attr in attrs)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+class GridIndex:
+    """Buckets keys into cell_deg sized latitude/longitude cells
+
+    Adding, moving or removing a key only touches its own cell, so the
+    index is maintained incrementally.
+    """
+
+    def __init__(self, attrs=('latitude', 'longitude'), cell_deg=0.5):
+        """Instantiates an empty grid over the (lat, lon) attrs"""
+        self.attrs = tuple(attrs)
+        self.cell_deg = cell_deg
+        self.__rows = int(180 / cell_deg) + 1
+        self.__cols = int(360 / cell_deg)
+        self.__cells = {}
+        self.__points = {}
+
+    def __len__(self):
+        """Returns the number of indexed keys"""
+        return len(self.__points)
+
+    def add(self, key, obj):
+        """Indexes key at the location of obj, moving it if it moved"""
+        point = _coordinates(obj, self.attrs)
+        if point == self.__points.get(key):
+            return
+        self.remove(key)
+        if point is None:
+            return
+        self.__points[key] = point
+        self.__cells.setdefault(self.__cell(*point), set()).add(key)
+
+    def remove(self, key):
+        """Drops key from the index"""
+        point = self.__points.pop(key, None)
+        if point is None:
+            return
+        cell = self.__cell(*point)
+        keys = self.__cells[cell]
+        keys.discard(key)
+        if not keys:
+            del self.__cells[cell]
+
+    def clear(self):
+        """Drops every key from the index"""
+        self.__cells.clear()
+        self.__points.clear()
+
+    def within(self, lat, lon, radius_km):
+        """Returns (distance_km, key) pairs within radius_km, nearest first"""
+        row, col = self.__cell(lat, lon)
+        lat_span = int(radius_km / KM_PER_DEGREE / self.cell_deg) + 1
+        widest = cos(radians(min(90.0, abs(lat) + lat_span * self.cell_deg)))
+        if widest * KM_PER_DEGREE * 180 <= radius_km:
+            lon_span = self.__cols
+        else:
+            lon_span = int(radius_km / (KM_PER_DEGREE * widest) /
+                           self.cell_deg) + 1
+        found = []
+        for key in self.__scan(row, col, lat_span, lon_span):
+            dist = distance_km(lat, lon, *self.__points[key])
+            if dist <= radius_km:
+                found.append((dist, key))
+        found.sort()
+        return found
+
+    def nearest(self, lat, lon, k):
+        """Returns the k (distance_km, key) pairs nearest to a point"""
+        if k <= 0 or not self.__points:
+            return []
+        row, col = self.__cell(lat, lon)
+        wanted = min(k, len(self.__points))
+        candidates = set()
+        ring = 0
+        while len(candidates) < wanted:
+            candidates.update(self.__ring(row, col, ring))
+            ring += 1
+        # a closer point may sit in a cell outside the rings searched so
+        # far, so finish with a radius query out to the k-th candidate
+        radius = sorted(distance_km(lat, lon, *self.__points[key])
+                        for key in candidates)[wanted - 1]
+        return self.within(lat, lon, radius)[:k]
+
+    def __cell(self, lat, lon):
+        """Returns the (row, col) of the cell holding a point"""
+        return (int(floor((lat + 90) / self.cell_deg)),
+                int(floor((lon + 180) / self.cell_deg)) % self.__cols)
+
+    def __scan(self, row, col, lat_span, lon_span):
+        """Yields the keys of the cells within the spans of (row, col)"""
+        if 2 * lon_span + 1 >= self.__cols:
+            cols = range(self.__cols)
+        else:
+            cols = [(col + d) % self.__cols
+                    for d in range(-lon_span, lon_span + 1)]
+        for r in range(max(0, row - lat_span),
+                       min(self.__rows, row + lat_span + 1)):
+            for c in cols:
+                yield from self.__cells.get((r, c), ())
+
+    def __ring(self, row, col, ring):
+        """Returns the keys of the cells exactly ring cells from (row, col)"""
+        if ring > max(self.__rows, self.__cols):
+            return []
+        keys = []
+        cells = set()
+        for d in range(-ring, ring + 1):
+            for r, c in ((row - ring, col + d), (row + ring, col + d),
+                         (row + d, col - ring), (row + d, col + ring)):
+                if 0 <= r < self.__rows:
+                    cells.add((r, c % self.__cols))
+        for cell in cells:
+            keys.extend(self.__cells.get(cell, ()))
+        return keys
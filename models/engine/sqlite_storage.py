@@ -0,0 +1,438 @@
+#!/usr/bin/python3
+"""This module defines a class to manage SQLite storage for hbnb clone"""
+import json
+import sqlite3
+from contextlib import contextmanager
+from models.engine import bulk
+from models.engine.file_storage import FileStorage
+from models.engine.spatial import GridIndex, KM_PER_DEGREE
+
+
+def _model_classes():
+    """Returns the model classes keyed by class name"""
+    from models.base_model import BaseModel
+    from models.user import User
+    from models.place import Place
+    from models.state import State
+    from models.city import City
+    from models.amenity import Amenity
+    from models.review import Review
+
+    return {
+        'BaseModel': BaseModel, 'User': User, 'Place': Place,
+        'State': State, 'City': City, 'Amenity': Amenity,
+        'Review': Review
+    }
+
+
+def _declared(cls):
+    """Returns the declared attributes of a model class and defaults"""
+    defaults = {}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if name.startswith('_') or callable(value) or \
+                    isinstance(value, (classmethod, staticmethod, property)):
+                continue
+            defaults[name] = value
+    return defaults
+
+
+def _sql_type(value):
+    """Returns the SQLite column type for a default value"""
+    if isinstance(value, bool) or isinstance(value, int):
+        return 'INTEGER'
+    if isinstance(value, float):
+        return 'REAL'
+    return 'TEXT'
+
+
+class SQLiteStorage:
+    """This class manages storage of hbnb models in an SQLite database
+
+    Each model class has its own table with one column per declared
+    attribute; other attributes go to a JSON 'extra' column.  new() and
+    delete() queue row changes that save() writes and commits, so a save
+    costs the changed rows only.  Loaded objects are kept in an identity
+    map, and the attributes FileStorage indexes get SQL indexes.
+    """
+    indexes = FileStorage.indexes
+    columns = FileStorage.columns
+
+    def __init__(self, db_path='hbnb.db'):
+        """Instantiates a storage engine over the database at db_path"""
+        self.db_path = db_path
+        self.__conn = None
+        self.__models = {}
+        self.__columns = {}
+        self.__objects = {}
+        self.__pending = {}
+        self.__batch_depth = 0
+        self.__max_saves = None
+        self.__deferred = 0
+
+    def reload(self):
+        """Opens the database, creating missing tables and indexes"""
+        if self.__conn is not None:
+            self.__conn.close()
+        self.__conn = sqlite3.connect(self.db_path)
+        self.__conn.row_factory = sqlite3.Row
+        self.__objects.clear()
+        self.__pending.clear()
+        self.__models = _model_classes()
+        indexed = {}
+        for source in (self.indexes, self.columns):
+            for name, attrs in source.items():
+                indexed.setdefault(name, []).extend(attrs)
+        with self.__conn:
+            for name, cls in self.__models.items():
+                defaults = _declared(cls)
+                self.__columns[name] = defaults
+                columns = ''.join(', "{}" {}'.format(attr, _sql_type(value))
+                                  for attr, value in defaults.items())
+                self.__conn.execute(
+                    'CREATE TABLE IF NOT EXISTS "{}" (id TEXT PRIMARY KEY, '
+                    'created_at TEXT, updated_at TEXT{}, extra TEXT)'
+                    .format(name, columns))
+                for attr in indexed.get(name, ()):
+                    self.__conn.execute(
+                        'CREATE INDEX IF NOT EXISTS "{0}_{1}" '
+                        'ON "{0}" ("{1}")'.format(name, attr))
+
+    def all(self, cls=None):
+        """Returns a dictionary of models currently in storage
+
+        Every row of cls, or of every class, is loaded to build it.
+        """
+        names = [self.__name(cls)] if cls is not None else self.__models
+        result = {}
+        for name in names:
+            result.update(
+                (name + '.' + obj.id, obj)
+                for obj in self.__select(name, '', ()))
+        return result
+
+    def count(self, cls=None):
+        """Returns the number of objects in storage, optionally of cls"""
+        self.__flush_pending()
+        names = [self.__name(cls)] if cls is not None else self.__models
+        return sum(self.__conn.execute(
+            'SELECT COUNT(*) FROM "{}"'.format(name)).fetchone()[0]
+            for name in names)
+
+    def get(self, cls, id):
+        """Returns the object of class cls with the given id, or None"""
+        name = self.__name(cls)
+        obj = self.__objects.get(name + '.' + id)
+        if obj is not None:
+            return obj
+        found = self.__select(name, 'WHERE id = ?', (id,))
+        return found[0] if found else None
+
+    def iterate(self, cls=None):
+        """Yields the objects of class cls, or of every class, one by one
+
+        Rows are read from a cursor as they are consumed.
+        """
+        self.__flush_pending()
+        names = [self.__name(cls)] if cls is not None else self.__models
+        for name in names:
+            if name not in self.__models:
+                continue
+            for row in self.__conn.execute(
+                    'SELECT * FROM "{}"'.format(name)):
+                yield self.__object(name, row)
+
+    def page(self, cls, limit=None, after=None):
+        """Returns up to limit objects of class cls in id order
+
+        Takes the same arguments as FileStorage.page; the primary key
+        index serves the cursor.
+        """
+        name = self.__name(cls)
+        where = 'WHERE id > ? ' if after is not None else ''
+        params = [after] if after is not None else []
+        where += 'ORDER BY id LIMIT ?'
+        params.append(-1 if limit is None else limit)
+        return self.__select(name, where, params)
+
+    def new(self, obj):
+        """Queues obj to be inserted or updated on the next save"""
+        key = type(obj).__name__ + '.' + obj.id
+        self.__objects[key] = obj
+        self.__pending[key] = obj
+
+    def delete(self, obj=None):
+        """Queues obj to be deleted on the next save"""
+        if obj is None:
+            return
+        key = type(obj).__name__ + '.' + obj.id
+        self.__objects.pop(key, None)
+        self.__pending[key] = None
+
+    def save(self):
+        """Writes the queued row changes and commits them
+
+        Inside a batch() block the commit is deferred to its end, or
+        until its max_saves policy is reached.
+        """
+        self.__flush_pending()
+        if self.__batch_depth:
+            self.__deferred += 1
+            if self.__max_saves is None or \
+                    self.__deferred < self.__max_saves:
+                return
+        self.__deferred = 0
+        self.__conn.commit()
+
+    def flush(self):
+        """Commits saves deferred by an open batch() block"""
+        if self.__deferred:
+            self.__deferred = 0
+            self.__flush_pending()
+            self.__conn.commit()
+
+    def close(self):
+        """Commits deferred saves and closes the database"""
+        if self.__conn is None:
+            return
+        self.flush()
+        self.__conn.close()
+        self.__conn = None
+
+    @contextmanager
+    def batch(self, max_saves=None, max_delay=None):
+        """Groups every save() in the block into a single commit
+
+        max_saves optionally commits every max_saves saves within a
+        long block; max_delay is accepted for compatibility with
+        FileStorage.batch.
+        """
+        if not self.__batch_depth:
+            self.__max_saves = max_saves
+        self.__batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.__batch_depth -= 1
+            if not self.__batch_depth:
+                self.flush()
+
+    def convert(self, file_format):
+        """Storage file formats only apply to FileStorage"""
+        raise ValueError('convert is only supported by file storage')
+
+    def import_records(self, cls, records, types=None, chunk_size=1000):
+        """Stores an object of class cls for each record of an iterable
+
+        Takes the same arguments as FileStorage.import_records and is
+        all or nothing too: each chunk is written to the open
+        transaction inside a savepoint, which is rolled back if a record
+        is invalid or its id already stored, and committed once at the
+        end otherwise.
+        """
+        name = self.__name(cls)
+        model = self.__models[name]
+        prepare = bulk.preparer(model, types)
+        self.__flush_pending()
+        if not self.__conn.in_transaction:
+            self.__conn.execute('BEGIN')
+        self.__conn.execute('SAVEPOINT import_records')
+        added = set()
+        try:
+            for chunk in bulk.chunks(records, chunk_size):
+                vals = []
+                for record in chunk:
+                    try:
+                        vals.append(prepare(record))
+                    except ValueError as error:
+                        raise ValueError('record {}: {}'.format(
+                            len(added) + len(vals) + 1, error))
+                ids = json.dumps([val['id'] for val in vals])
+                stored = {row[0] for row in self.__conn.execute(
+                    'SELECT id FROM "{}" WHERE id IN (SELECT value FROM '
+                    'json_each(?))'.format(name), (ids,))}
+                for position, val in enumerate(vals, len(added) + 1):
+                    key = name + '.' + val['id']
+                    if val['id'] in stored or key in added:
+                        raise ValueError('record {}: id {} already '
+                                         'exists'.format(position, val['id']))
+                    added.add(key)
+                    self.new(model(**val))
+                self.__flush_pending()
+        except BaseException:
+            self.__pending.clear()
+            for key in added:
+                self.__objects.pop(key, None)
+            self.__conn.execute('ROLLBACK TO import_records')
+            self.__conn.execute('RELEASE import_records')
+            raise
+        self.__conn.execute('RELEASE import_records')
+        if added:
+            self.save()
+        return len(added)
+
+    def export_records(self, cls):
+        """Yields the record of each object of class cls"""
+        name = self.__name(cls)
+        if name not in self.__models:
+            return
+        self.__flush_pending()
+        for row in self.__conn.execute('SELECT * FROM "{}"'.format(name)):
+            yield self.__object(name, row).to_dict()
+
+    def import_file(self, cls, path, file_format=None, types=None,
+                    chunk_size=1000):
+        """Imports the objects of class cls from an NDJSON or CSV file"""
+        return bulk.import_file(self, cls, path, file_format, types,
+                                chunk_size)
+
+    def export_file(self, cls, path, file_format=None):
+        """Writes the objects of class cls to an NDJSON or CSV file"""
+        return bulk.export_file(self, cls, path, file_format)
+
+    def find(self, cls, attr, value):
+        """Returns the objects of class cls whose attr equals value
+
+        A list attribute matches when it holds value, as in FileStorage.
+        """
+        name = self.__name(cls)
+        column = self.__column(name, attr)
+        if isinstance(self.__columns.get(name, {}).get(attr), list):
+            return self.__select(
+                name, 'WHERE json_valid({0}) AND EXISTS (SELECT 1 FROM '
+                'json_each({0}) WHERE value = ?)'.format(column), (value,))
+        return self.__select(name, 'WHERE {} = ?'.format(column), (value,))
+
+    def filter(self, cls, bbox=None, **ranges):
+        """Returns the objects of class cls within the given ranges
+
+        Takes the same arguments as FileStorage.filter.
+        """
+        name = self.__name(cls)
+        if bbox is not None:
+            south, west, north, east = bbox
+            ranges['latitude'] = (south, north)
+            ranges['longitude'] = (west, east)
+        clauses = []
+        params = []
+        for attr, (low, high) in ranges.items():
+            column = 'CAST({} AS REAL)'.format(self.__column(name, attr))
+            clauses.append("typeof({}) IN ('integer', 'real', 'text')"
+                           .format(self.__column(name, attr)))
+            if low is not None:
+                clauses.append('{} >= ?'.format(column))
+                params.append(low)
+            if high is not None:
+                clauses.append('{} <= ?'.format(column))
+                params.append(high)
+        where = 'WHERE ' + ' AND '.join(clauses) if clauses else ''
+        return self.__select(name, where, params)
+
+    def scan(self, cls, predicate):
+        """Returns the objects of class cls that predicate accepts
+
+        predicate is called with a function returning the value of an
+        attribute; every row of cls is loaded to evaluate it.
+        """
+        return [obj for obj in self.all(cls).values()
+                if predicate(lambda attr: getattr(obj, attr, None))]
+
+    def within(self, cls, lat, lon, radius_km):
+        """Returns the objects of cls within radius_km of a point
+
+        Only the rows in the latitude band of the circle are loaded.
+        Objects are ordered nearest first.
+        """
+        span = radius_km / KM_PER_DEGREE
+        objs = self.filter(cls, latitude=(lat - span, lat + span))
+        grid, by_id = self.__grid(objs)
+        return [by_id[key] for _, key in grid.within(lat, lon, radius_km)]
+
+    def nearest(self, cls, lat, lon, k):
+        """Returns the k objects of cls nearest to a point, nearest first"""
+        grid, by_id = self.__grid(self.all(cls).values())
+        return [by_id[key] for _, key in grid.nearest(lat, lon, k)]
+
+    def __grid(self, objs):
+        """Returns a grid over objs and the objects keyed by id"""
+        grid = GridIndex()
+        by_id = {}
+        for obj in objs:
+            by_id[obj.id] = obj
+            grid.add(obj.id, obj)
+        return grid, by_id
+
+    def __name(self, cls):
+        """Returns the class name of cls, a class or a class name"""
+        return cls if isinstance(cls, str) else cls.__name__
+
+    def __column(self, name, attr):
+        """Returns the SQL expression reading attr in the table of name"""
+        if attr in ('id', 'created_at', 'updated_at') or \
+                attr in self.__columns.get(name, ()):
+            return '"{}"'.format(attr.replace('"', '""'))
+        return "json_extract(extra, '$.\"{}\"')".format(
+            attr.replace("'", "''").replace('"', ''))
+
+    def __select(self, name, where, params):
+        """Returns the objects of the rows of name matching where"""
+        if name not in self.__models:
+            return []
+        self.__flush_pending()
+        rows = self.__conn.execute(
+            'SELECT * FROM "{}" {}'.format(name, where), params)
+        return [self.__object(name, row) for row in rows]
+
+    def __object(self, name, row):
+        """Returns the object of a row, reusing a loaded instance"""
+        key = name + '.' + row['id']
+        obj = self.__objects.get(key)
+        if obj is not None:
+            return obj
+        defaults = self.__columns[name]
+        record = {'id': row['id'], 'created_at': row['created_at'],
+                  'updated_at': row['updated_at'], '__class__': name}
+        for attr, default in defaults.items():
+            value = row[attr]
+            if value is None:
+                continue
+            if isinstance(default, list):
+                value = json.loads(value)
+            record[attr] = value
+        if row['extra']:
+            record.update(json.loads(row['extra']))
+        obj = self.__models[name](**record)
+        self.__objects[key] = obj
+        return obj
+
+    def __flush_pending(self):
+        """Executes the queued row changes in the open transaction"""
+        if not self.__pending:
+            return
+        pending = list(self.__pending.items())
+        self.__pending.clear()
+        for key, obj in pending:
+            name, obj_id = key.split('.', 1)
+            if obj is None:
+                self.__conn.execute(
+                    'DELETE FROM "{}" WHERE id = ?'.format(name), (obj_id,))
+                continue
+            record = obj.to_dict()
+            record.pop('__class__', None)
+            defaults = self.__columns[name]
+            columns = ['id', 'created_at', 'updated_at']
+            values = [record.pop('id'), record.pop('created_at'),
+                      record.pop('updated_at')]
+            for attr in defaults:
+                if attr in record:
+                    value = record.pop(attr)
+                    if isinstance(value, (list, dict)):
+                        value = json.dumps(value)
+                    columns.append(attr)
+                    values.append(value)
+            columns.append('extra')
+            values.append(json.dumps(record) if record else None)
+            self.__conn.execute(
+                'INSERT OR REPLACE INTO "{}" ({}) VALUES ({})'.format(
+                    name, ', '.join('"{}"'.format(c) for c in columns),
+                    ', '.join('?' * len(columns))), values)
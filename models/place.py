@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """ Place Module for HBNB project """
 from models.base_model import BaseModel
+from models.relations import References, Relation
 
 
 class Place(BaseModel):
@@ -16,3 +17,5 @@ class Place(BaseModel):
     latitude = 0.0
     longitude = 0.0
     amenity_ids = []
+    reviews = Relation('Review', 'place_id', on_delete='cascade')
+    amenities = References('Amenity', 'amenity_ids')
@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+"""This module defines the relationships between the hbnb models
+
+Relationships are read-only properties, so they never reach __dict__,
+to_dict() or the storage file.  They are answered by storage.find(),
+which FileStorage serves from the reverse foreign key maps it keeps in
+its attribute indexes, so a lookup costs the size of its result.
+"""
+
+
+class Relation(property):
+    """The objects of another class referring to an instance by id
+
+    Declared on the referenced class, e.g. State.cities is
+    Relation('City', 'state_id').  on_delete says what deleting the
+    instance does to them: None leaves them, 'cascade' deletes them when
+    the delete asks for it, leaving them otherwise, and 'detach' removes
+    the reference.
+    """
+
+    def __init__(self, cls_name, attr, on_delete=None):
+        """Instantiates the relation of cls_name objects through attr"""
+        if on_delete not in (None, 'cascade', 'detach'):
+            raise ValueError('on_delete must be None, cascade or detach, '
+                             'not {!r}'.format(on_delete))
+        super().__init__(self.referrers, doc='{} objects whose {} is the '
+                         'id of this one'.format(cls_name, attr))
+        self.cls_name = cls_name
+        self.attr = attr
+        self.on_delete = on_delete
+
+    def referrers(self, obj):
+        """Returns the objects referring to obj"""
+        from models import storage
+        return storage.find(self.cls_name, self.attr, obj.id)
+
+    def detach(self, obj):
+        """Removes the references to obj from its referrers"""
+        from models import storage
+        for other in self.referrers(obj):
+            value = getattr(other, self.attr)
+            if isinstance(value, list):
+                setattr(other, self.attr,
+                        [item for item in value if item != obj.id])
+            else:
+                setattr(other, self.attr, '')
+            storage.new(other)
+
+
+class References(property):
+    """The objects of another class an instance lists the ids of
+
+    E.g. Place.amenities is References('Amenity', 'amenity_ids'); ids
+    of objects no longer stored are skipped.
+    """
+
+    def __init__(self, cls_name, attr):
+        """Instantiates the references to cls_name objects in attr"""
+        super().__init__(self.targets, doc='{} objects listed in {}'.format(
+            cls_name, attr))
+        self.cls_name = cls_name
+        self.attr = attr
+
+    def targets(self, obj):
+        """Returns the objects obj lists"""
+        from models import storage
+        found = []
+        for obj_id in getattr(obj, self.attr, None) or ():
+            other = storage.get(self.cls_name, obj_id)
+            if other is not None:
+                found.append(other)
+        return found
+
+
+def relations(cls):
+    """Returns the Relation properties declared on model class cls"""
+    found = {}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if isinstance(value, Relation):
+                found[name] = value
+    return list(found.values())
+
+
+def delete(obj, cascade=False):
+    """Deletes obj from storage, applying the on_delete of its relations
+
+    Cascades only run with cascade=True, and then all the way down.
+    """
+    from models import storage
+    for relation in relations(type(obj)):
+        if relation.on_delete == 'cascade':
+            if cascade:
+                for other in relation.referrers(obj):
+                    delete(other, cascade)
+        elif relation.on_delete == 'detach':
+            relation.detach(obj)
+    storage.delete(obj)
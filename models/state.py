@@ -1,8 +1,10 @@
 #!/usr/bin/python3
 """ State Module for HBNB project """
 from models.base_model import BaseModel
+from models.relations import Relation
 
 
 class State(BaseModel):
     """ State class """
     name = ""
+    cities = Relation('City', 'state_id', on_delete='cascade')
@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """This module defines a class User"""
 from models.base_model import BaseModel
+from models.relations import Relation
 
 
 class User(BaseModel):
@@ -9,3 +10,5 @@ class User(BaseModel):
     password = ''
     first_name = ''
     last_name = ''
+    places = Relation('Place', 'user_id', on_delete='cascade')
+    reviews = Relation('Review', 'user_id', on_delete='cascade')
@@ -1,7 +1,12 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import patch
 from io import StringIO
 from console import HBNBCommand
+from models import storage
+from models.engine import file_storage, metrics
+from models.engine.file_storage import FileStorage
 from models.base_model import BaseModel
 from models.user import User
 from models.place import Place
@@ -54,6 +59,27 @@ class TestHBNBCommand(unittest.TestCase):
             self.assertTrue("BaseModel" in output_str)
             self.assertTrue("User" in output_str)
 
+    def test_all_paged(self):
+        with patch('sys.stdout', new=StringIO()) as output:
+            self.console.onecmd("create Amenity")
+            self.console.onecmd("create Amenity")
+            ids = sorted(obj.id for obj in Amenity.all())
+            output.seek(0)
+            output.truncate()
+            self.console.onecmd("all Amenity limit 1 after {}".format(
+                ids[-2]))
+            self.assertEqual(output.getvalue(), "{}\n".format(
+                [str(storage.get(Amenity, ids[-1]))]))
+            output.seek(0)
+            output.truncate()
+            self.console.onecmd("all Amenity limit many")
+            self.assertEqual(output.getvalue().strip(), "** invalid limit **")
+            output.seek(0)
+            output.truncate()
+            self.console.onecmd("all limit 1")
+            self.assertEqual(output.getvalue().strip(),
+                             "** class name missing **")
+
     def test_count(self):
         with patch('sys.stdout', new=StringIO()) as output:
             self.console.onecmd("create BaseModel")
@@ -115,6 +141,117 @@ class TestHBNBCommand(unittest.TestCase):
             self.console.onecmd("search User email 'test@example.com'")
             self.assertEqual(output.getvalue().strip(), "")
 
+    def test_search_words(self):
+        with patch('sys.stdout', new=StringIO()) as output:
+            self.console.onecmd("create Place")
+            obj_id = output.getvalue().strip()
+            storage.get('Place', obj_id).name = 'My House'
+            for line in ('search Place name My House',
+                         'Place.search("name", "My House")',
+                         'Place.search("name = \'My House\'")'):
+                output.seek(0)
+                output.truncate()
+                self.console.onecmd(self.console.precmd(line))
+                self.assertTrue(obj_id in output.getvalue(), msg=line)
+            output.seek(0)
+            output.truncate()
+            self.console.onecmd(self.console.precmd(
+                'Place.explain("name", "My House")'))
+            self.assertTrue("name = 'My House'" in output.getvalue())
+
+    def test_near(self):
+        with patch('sys.stdout', new=StringIO()) as output:
+            self.console.onecmd("create Place")
+            obj_id = output.getvalue().strip()
+            self.console.onecmd("update Place {} latitude 89.9".format(obj_id))
+            self.console.onecmd("update Place {} longitude 0".format(obj_id))
+            output.seek(0)
+            output.truncate()
+            self.console.onecmd(self.console.precmd("Place.near(90, 0, 1)"))
+            self.assertTrue(obj_id in output.getvalue())
+            output.seek(0)
+            output.truncate()
+            self.console.onecmd("within Place 90 0 20")
+            self.assertTrue(obj_id in output.getvalue())
+            output.seek(0)
+            output.truncate()
+            self.console.onecmd("near Place north 0")
+            self.assertEqual(output.getvalue().strip(), "** invalid number **")
+
+    def test_search_query(self):
+        with patch('sys.stdout', new=StringIO()) as output:
+            self.console.onecmd("create Place")
+            obj_id = output.getvalue().strip()
+            self.console.onecmd(
+                "update Place {} price_by_night 120".format(obj_id))
+            output.seek(0)
+            output.truncate()
+            self.console.onecmd("search Place price_by_night > 100 "
+                                "order by price_by_night desc")
+            self.assertTrue(obj_id in output.getvalue())
+            output.seek(0)
+            output.truncate()
+            self.console.onecmd("explain Place price_by_night > 100")
+            self.assertTrue(output.getvalue().startswith(
+                "access: column range scan"))
+            output.seek(0)
+            output.truncate()
+            self.console.onecmd("search Place price_by_night > cheap")
+            self.assertEqual(output.getvalue().strip(),
+                             "** invalid value 'cheap' for price_by_night **")
+
+    def test_run_batch(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            scratch = FileStorage(os.path.join(tmp, 'file.json'))
+            output = StringIO()
+            with patch('console.storage', scratch), \
+                    patch('models.storage', scratch), \
+                    patch.object(file_storage, 'atomic_write',
+                                 wraps=file_storage.atomic_write) as write:
+                ops = self.console.run_batch(
+                    ["# setup", "create State", "", "create City",
+                     "create City", "count City", "quit", "create State"],
+                    commit_every=2, output=output)
+            self.assertEqual(ops, 5)
+            self.assertEqual(write.call_count, 2)
+            self.assertEqual(output.getvalue().split()[3], "2")
+            self.assertEqual(scratch.count(State), 1)
+
+    def test_import_export(self):
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch('sys.stdout', new=StringIO()) as output:
+            path = os.path.join(tmp, 'places.csv')
+            with open(path, 'w') as f:
+                f.write("name,price_by_night\nVilla,80\nHut,x\n")
+            self.console.onecmd("import Place {}".format(path))
+            self.assertEqual(output.getvalue().strip(),
+                             "** record 2: invalid value 'x' for "
+                             "price_by_night, nothing imported **")
+            output.seek(0)
+            output.truncate()
+            self.console.onecmd("export Place {} ndjson".format(path))
+            self.assertEqual(output.getvalue().strip(),
+                             str(Place.count()))
+            output.seek(0)
+            output.truncate()
+            self.console.onecmd("import Place")
+            self.assertEqual(output.getvalue().strip().split("\n")[0],
+                             "** file name missing **")
+
+    def test_stats_profile(self):
+        self.addCleanup(metrics.enable, False)
+        self.addCleanup(metrics.reset)
+        with patch('sys.stdout', new=StringIO()) as output:
+            self.console.onecmd("stats on")
+            self.console.onecmd("create State")
+            self.console.onecmd("stats")
+            self.assertTrue("storage.commit: count=1" in output.getvalue())
+            output.seek(0)
+            output.truncate()
+            self.console.onecmd("profile count State")
+            self.assertTrue("function calls" in output.getvalue())
+            self.assertTrue("do_count" in output.getvalue())
+
     def test_help(self):
         with patch('sys.stdout', new=StringIO()) as output:
             self.console.onecmd("help create")
@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """Unit tests for BaseModel"""
 import unittest
-from models.base_model import BaseModel
+from models.base_model import BaseModel, parse_time, format_time
 import datetime
 import json
 import os
@@ -87,6 +87,38 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(new_model.created_at, self.model.created_at)
         self.assertEqual(new_model.updated_at, self.model.updated_at)
 
+    def test_parse_time(self):
+        """Test parse_time reads stored and legacy timestamps"""
+        stamp = datetime.datetime(2023, 7, 12, 10, 59, 42, 319408)
+        self.assertEqual(parse_time('2023-07-12T10:59:42.319408'), stamp)
+        self.assertEqual(parse_time('2023-07-12T10:59:42'),
+                         stamp.replace(microsecond=0))
+        self.assertIs(parse_time(stamp), stamp)
+        with self.assertRaises(ValueError):
+            parse_time('12/07/2023')
+
+    def test_format_time(self):
+        """Test format_time always writes microseconds"""
+        stamp = datetime.datetime(2023, 7, 12, 10, 59, 42)
+        self.assertEqual(format_time(stamp), '2023-07-12T10:59:42.000000')
+        self.assertEqual(format_time(stamp.replace(microsecond=5)),
+                         '2023-07-12T10:59:42.000005')
+        self.assertEqual(parse_time(format_time(stamp)), stamp)
+
+    def test_changes(self):
+        """Test attribute changes are tracked until save"""
+        model = BaseModel(**self.model.to_dict())
+        self.assertEqual(model.changes(), set())
+        version = model._version
+        model.name = 'Holberton'
+        del model.name
+        model.number = 89
+        self.assertEqual(model.changes(), {'name', 'number'})
+        self.assertEqual(model._version, version + 3)
+        self.assertNotIn('_changed', model.to_dict())
+        model.save()
+        self.assertEqual(model.changes(), set())
+
 
 if __name__ == '__main__':
     unittest.main()
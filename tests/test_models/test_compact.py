@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""Unit tests for the compact model variants"""
+import os
+import tempfile
+import unittest
+from models.base_model import BaseModel
+from models.compact import compact_class
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.user import User
+
+
+class TestCompactModel(unittest.TestCase):
+    """Test cases for compact_class"""
+
+    def setUp(self):
+        """Set up a compact Place built from a plain one"""
+        self.plain = Place()
+        self.plain.name = 'Villa'
+        self.compact = compact_class(Place)(**self.plain.to_dict())
+
+    def test_identity(self):
+        """Test the variant keeps the model name and type"""
+        self.assertIs(compact_class(Place), type(self.compact))
+        self.assertIsInstance(self.compact, Place)
+        self.assertEqual(type(self.compact).__name__, 'Place')
+
+    def test_to_dict(self):
+        """Test to_dict matches the plain instance"""
+        self.assertEqual(self.compact.to_dict(), self.plain.to_dict())
+
+    def test_str(self):
+        """Test __str__ matches the plain instance"""
+        self.assertEqual(str(self.compact), str(self.plain))
+
+    def test_defaults(self):
+        """Test unset declared attributes read the class defaults"""
+        self.assertEqual(self.compact.number_rooms, 0)
+        self.assertNotIn('number_rooms', self.compact.to_dict())
+
+    def test_list_default_not_shared(self):
+        """Test list defaults are private to each instance"""
+        other = compact_class(Place)(**self.plain.to_dict())
+        self.compact.amenity_ids.append('wifi')
+        self.assertEqual(other.amenity_ids, [])
+        self.assertEqual(Place.amenity_ids, [])
+
+    def test_overflow(self):
+        """Test undeclared attributes are kept and serialized"""
+        self.compact.rating = '5'
+        self.assertEqual(self.compact.rating, '5')
+        self.assertEqual(self.compact.to_dict()['rating'], '5')
+        with self.assertRaises(AttributeError):
+            self.compact.missing
+
+    def test_no_instance_dict(self):
+        """Test the variant instances have no __dict__ at all"""
+        self.compact.rating = '5'
+        self.compact.to_dict()
+        self.assertFalse(hasattr(self.compact, '__dict__'))
+
+    def test_model_behaviour(self):
+        """Test the variant keeps the methods and relations of the model"""
+        self.assertIsInstance(self.compact, BaseModel)
+        self.assertIs(self.compact.__class__, Place)
+        self.assertEqual(self.compact.amenities, [])
+        self.compact.name = 'Hut'
+        self.assertEqual(self.compact.changes(), {'name'})
+
+    def test_storage_compact(self):
+        """Test FileStorage(compact_models=True) loads compact instances"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'file.json')
+            writer = FileStorage(path)
+            user = User()
+            writer.new(user)
+            writer.save()
+            storage = FileStorage(path, compact_models=True)
+            storage.reload()
+            obj = storage.get(User, user.id)
+        self.assertIs(type(obj), compact_class(User))
+        self.assertEqual(obj.to_dict(), user.to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
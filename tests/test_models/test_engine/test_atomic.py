@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+""" Module for testing atomic storage writes"""
+import json
+import os
+import tempfile
+import unittest
+from models.engine.atomic import atomic_write
+from models.engine.file_storage import FileStorage
+from models.user import User
+
+
+class test_atomicWrite(unittest.TestCase):
+    """ Class to test atomic_write """
+
+    def setUp(self):
+        """ Set up a scratch directory holding an old file """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'file.json')
+        with open(self.path, 'w') as f:
+            f.write('old')
+
+    def tearDown(self):
+        """ Remove the scratch directory """
+        self.tmp.cleanup()
+
+    def test_replaces(self):
+        """ The file is replaced at every durability level """
+        for durability in ('none', 'file', 'dir'):
+            timings = atomic_write(self.path, lambda f: f.write(durability),
+                                   durability)
+            with open(self.path) as f:
+                self.assertEqual(f.read(), durability)
+            self.assertEqual(timings['bytes'], len(durability))
+            self.assertFalse(os.path.exists(self.path + '.tmp'))
+
+    def test_failed_write_keeps_old_file(self):
+        """ A write that fails leaves the old file in place """
+        def fail(f):
+            f.write('partial')
+            raise RuntimeError('crash')
+        with self.assertRaises(RuntimeError):
+            atomic_write(self.path, fail)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), 'old')
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+
+    def test_unknown_durability(self):
+        """ Unknown durability levels are rejected """
+        with self.assertRaises(ValueError):
+            atomic_write(self.path, lambda f: None, 'always')
+        with self.assertRaises(ValueError):
+            FileStorage(self.path, durability='always')
+
+    def test_storage_save(self):
+        """ FileStorage.save writes atomically and records timings """
+        storage = FileStorage(self.path, durability='dir')
+        user = User()
+        storage.new(user)
+        storage.save()
+        with open(self.path) as f:
+            self.assertIn('User.' + user.id, json.load(f))
+        self.assertEqual(set(storage.last_write),
+                         {'write_s', 'fsync_s', 'rename_s', 'bytes'})
+
+    def test_journal_save(self):
+        """ Journal appends report the bytes they added """
+        storage = FileStorage(self.path, journal=True, durability='file')
+        storage.new(User())
+        storage.save()
+        size = os.path.getsize(self.path + '.journal')
+        self.assertEqual(storage.last_write['bytes'], size)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+""" Module for testing background writes in file storage"""
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from models.engine import file_storage
+from models.engine.file_storage import FileStorage
+from models.user import User
+
+
+class test_background(unittest.TestCase):
+    """ Class to test FileStorage with background=True """
+
+    def setUp(self):
+        """ Set up a background storage in a scratch directory """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'file.json')
+        self.storage = FileStorage(self.path, background=True)
+
+    def tearDown(self):
+        """ Stop the writer and remove the scratch directory """
+        self.storage.close()
+        self.tmp.cleanup()
+
+    def stored_keys(self):
+        """ Returns the keys in the storage file """
+        with open(self.path) as f:
+            return set(json.load(f))
+
+    def test_save_returns_before_write(self):
+        """ save returns while the writer thread is still writing """
+        release = threading.Event()
+        write = file_storage.atomic_write
+
+        def slow_write(*args):
+            release.wait(5)
+            return write(*args)
+        with patch.object(file_storage, 'atomic_write', slow_write):
+            user = User()
+            self.storage.new(user)
+            self.storage.save()
+            self.assertFalse(os.path.exists(self.path))
+            release.set()
+            self.storage.flush()
+        self.assertEqual(self.stored_keys(), {'User.' + user.id})
+
+    def test_close_writes_everything(self):
+        """ close waits for every requested write """
+        users = [User() for _ in range(20)]
+        for user in users:
+            self.storage.new(user)
+            self.storage.save()
+        self.storage.close()
+        self.assertEqual(self.stored_keys(),
+                         {'User.' + user.id for user in users})
+
+    def test_write_error_raised_on_flush(self):
+        """ Errors in the writer thread surface on flush """
+        def failing_write(*args):
+            raise OSError('disk full')
+        with patch.object(file_storage, 'atomic_write', failing_write):
+            self.storage.new(User())
+            self.storage.save()
+            with self.assertRaises(OSError):
+                self.storage.flush()
+
+    def test_restart_after_close(self):
+        """ Saving after close starts a new writer """
+        self.storage.close()
+        user = User()
+        self.storage.new(user)
+        self.storage.save()
+        self.storage.flush()
+        self.assertEqual(self.stored_keys(), {'User.' + user.id})
+
+
+if __name__ == '__main__':
+    unittest.main()
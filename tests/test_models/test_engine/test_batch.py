@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+""" Module for testing grouped saves in file storage"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from models.engine import file_storage
+from models.engine.file_storage import FileStorage
+from models.user import User
+
+
+class test_batch(unittest.TestCase):
+    """ Class to test FileStorage.batch """
+
+    def setUp(self):
+        """ Set up a storage in a scratch directory and count its writes """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'file.json')
+        self.storage = FileStorage(self.path)
+        writer = patch.object(file_storage, 'atomic_write',
+                              wraps=file_storage.atomic_write)
+        self.writes = writer.start()
+        self.addCleanup(writer.stop)
+
+    def tearDown(self):
+        """ Remove the scratch directory """
+        self.tmp.cleanup()
+
+    def save_users(self, count):
+        """ Creates and saves count users one by one """
+        for _ in range(count):
+            user = User()
+            self.storage.new(user)
+            self.storage.save()
+
+    def test_single_write(self):
+        """ Saves in a batch collapse into one write at its end """
+        with self.storage.batch():
+            self.save_users(10)
+            self.assertEqual(self.writes.call_count, 0)
+        self.assertEqual(self.writes.call_count, 1)
+        other = FileStorage(self.path)
+        other.reload()
+        self.assertEqual(other.count(User), 10)
+
+    def test_nested(self):
+        """ Nested batches write once, when the outermost one ends """
+        with self.storage.batch():
+            with self.storage.batch():
+                self.save_users(2)
+            self.assertEqual(self.writes.call_count, 0)
+        self.assertEqual(self.writes.call_count, 1)
+
+    def test_max_saves(self):
+        """ max_saves bounds how many saves a write is held back for """
+        with self.storage.batch(max_saves=4):
+            self.save_users(10)
+        self.assertEqual(self.writes.call_count, 3)
+
+    def test_max_delay(self):
+        """ max_delay bounds how long a write is held back """
+        with self.storage.batch(max_delay=0):
+            self.save_users(3)
+        self.assertEqual(self.writes.call_count, 3)
+
+    def test_error_still_writes(self):
+        """ Deferred saves are written when the block raises """
+        with self.assertRaises(RuntimeError):
+            with self.storage.batch():
+                self.save_users(2)
+                raise RuntimeError('stop')
+        self.assertEqual(self.writes.call_count, 1)
+
+    def test_no_saves_no_write(self):
+        """ A batch without saves writes nothing """
+        with self.storage.batch():
+            pass
+        self.storage.flush()
+        self.assertEqual(self.writes.call_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+""" Module for testing bulk import and export"""
+import json
+import os
+import tempfile
+import unittest
+import uuid
+from unittest.mock import patch
+from models.engine import file_storage
+from models.engine.file_storage import FileStorage
+from models.engine.sqlite_storage import SQLiteStorage
+from models.place import Place
+
+TYPES = {'price_by_night': int, 'latitude': float}
+
+
+class test_bulk(unittest.TestCase):
+    """ Class to test import_file and export_file of FileStorage """
+
+    def setUp(self):
+        """ Set up a storage in a scratch directory """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = FileStorage(self.path('file.json'))
+
+    def tearDown(self):
+        """ Remove the scratch directory """
+        self.tmp.cleanup()
+
+    def path(self, name):
+        """ Returns the path of name in the scratch directory """
+        return os.path.join(self.tmp.name, name)
+
+    def write(self, name, text):
+        """ Writes text to name and returns its path """
+        with open(self.path(name), 'w') as f:
+            f.write(text)
+        return self.path(name)
+
+    def test_import_ndjson(self):
+        """ Records are cast, completed and committed with one write """
+        place_id = str(uuid.uuid4())
+        path = self.write('places.ndjson', '\n'.join([
+            json.dumps({'id': place_id, 'price_by_night': '80',
+                        'amenity_ids': ['a1']}),
+            '',
+            json.dumps({'__class__': 'Place', 'name': 'Villa'})]))
+        with patch.object(file_storage, 'atomic_write',
+                          wraps=file_storage.atomic_write) as write:
+            count = self.storage.import_file(Place, path, types=TYPES)
+        self.assertEqual(count, 2)
+        self.assertEqual(write.call_count, 1)
+        place = self.storage.get(Place, place_id)
+        self.assertEqual(place.price_by_night, 80)
+        self.assertEqual(self.storage.find(Place, 'amenity_ids', 'a1'),
+                         [place])
+        other = FileStorage(self.path('file.json'))
+        other.reload()
+        self.assertEqual(other.count(Place), 2)
+
+    def test_invalid(self):
+        """ An invalid record stops the import and stores nothing """
+        path = self.write('places.ndjson', '\n'.join([
+            json.dumps({'name': 'Villa'}),
+            json.dumps({'id': 'not-a-uuid'}),
+            json.dumps({'name': 'Hut'})]))
+        with self.assertRaisesRegex(ValueError,
+                                    "record 2: invalid id 'not-a-uuid'"):
+            self.storage.import_file(Place, path, chunk_size=1)
+        self.assertEqual(self.storage.count(Place), 0)
+        self.assertEqual(self.storage.find(Place, 'name', 'Villa'), [])
+        self.assertFalse(os.path.exists(self.path('file.json')))
+        for record in ({'__class__': 'User'}, {'price_by_night': 'free'},
+                       {'reviews': '[]'}):
+            path = self.write('bad.ndjson', json.dumps(record))
+            with self.assertRaises(ValueError, msg=record):
+                self.storage.import_file(Place, path, types=TYPES)
+
+    def test_existing_ids(self):
+        """ Ids already stored, or repeated in the file, are rejected """
+        place = Place()
+        place.name = 'Villa'
+        self.storage.new(place)
+        self.storage.save()
+        for ids in ([str(uuid.uuid4()), place.id], [place.id[::-1]] * 2):
+            path = self.write('places.ndjson', '\n'.join(
+                json.dumps({'id': obj_id, 'name': 'Hut'}) for obj_id in ids))
+            with self.assertRaisesRegex(ValueError, 'record 2: id {} '
+                                        'already exists'.format(ids[1])):
+                self.storage.import_file(Place, path)
+            self.assertEqual(self.storage.count(Place), 1)
+        self.assertEqual(self.storage.get(Place, place.id).name, 'Villa')
+
+    def test_csv_round_trip(self):
+        """ An exported CSV file imports back to the same objects """
+        place = Place()
+        place.name = 'Villa, by the sea'
+        place.price_by_night = 80
+        place.amenity_ids = ['a1', 'a2']
+        self.storage.new(Place())
+        self.storage.new(place)
+        path = self.path('places.csv')
+        self.assertEqual(self.storage.export_file(Place, path), 2)
+        other = FileStorage(self.path('other.json'))
+        self.assertEqual(other.import_file(Place, path, types=TYPES), 2)
+        self.assertEqual(other.get(Place, place.id).to_dict(),
+                         place.to_dict())
+
+    def test_export_lazy(self):
+        """ Records not loaded yet are exported without building them """
+        for _ in range(3):
+            self.storage.new(Place())
+        self.storage.save()
+        lazy = FileStorage(self.path('file.json'), lazy=True)
+        lazy.reload()
+        path = self.path('places.ndjson')
+        self.assertEqual(lazy.export_file(Place, path), 3)
+        self.assertEqual(lazy._FileStorage__linked, 0)
+        with open(path) as f:
+            self.assertEqual(len(f.readlines()), 3)
+
+    def test_sqlite(self):
+        """ SQLiteStorage imports and exports the same files """
+        place = Place()
+        place.amenity_ids = ['a1']
+        self.storage.new(place)
+        path = self.path('places.ndjson')
+        self.storage.export_file(Place, path)
+        database = SQLiteStorage(self.path('hbnb.db'))
+        database.reload()
+        self.addCleanup(database.close)
+        self.assertEqual(database.import_file(Place, path), 1)
+        self.assertEqual(database.find(Place, 'amenity_ids', 'a1')[0].id,
+                         place.id)
+        other = Place()
+        self.storage.new(other)
+        self.storage.export_file(Place, path)
+        with self.assertRaisesRegex(ValueError, 'already exists'):
+            database.import_file(Place, path)
+        self.assertEqual(database.count(Place), 1)
+        self.assertIsNone(database.get(Place, other.id))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+""" Module for testing the storage file formats"""
+import io
+import json
+import os
+import tempfile
+import unittest
+from models.engine.codecs import CODECS, detect, get_codec
+from models.engine.file_storage import FileStorage
+from models.user import User
+
+
+class test_codecs(unittest.TestCase):
+    """ Class to test every codec """
+
+    records = [
+        ('User.1', {'id': '1', 'email': 'ama@hbnb.io', '__class__': 'User'}),
+        ('Place.2', {'id': '2', 'latitude': 5.6, 'amenity_ids': ['x'],
+                     'name': 'Café', '__class__': 'Place'})
+    ]
+
+    def test_round_trip(self):
+        """ Every codec loads back what it dumped and is detected """
+        for name, codec in CODECS.items():
+            f = io.BytesIO()
+            codec.dump(iter(self.records), f)
+            f.seek(0)
+            found = detect(f)
+            if codec.magic is not None:
+                self.assertIs(found, codec)
+            self.assertEqual([(k, v) for k, v in found.load(f)],
+                             self.records, name)
+
+    def test_json_matches_json_dump(self):
+        """ The json codec writes what json.dump used to """
+        f = io.BytesIO()
+        get_codec('json').dump(iter(self.records), f)
+        self.assertEqual(f.getvalue().decode('utf-8'),
+                         json.dumps(dict(self.records)))
+
+    def test_unknown_format(self):
+        """ Unknown formats are rejected """
+        with self.assertRaises(ValueError):
+            get_codec('xml')
+
+    def test_truncated_records(self):
+        """ A truncated records file is an error """
+        f = io.BytesIO()
+        get_codec('records').dump(iter(self.records), f)
+        f = io.BytesIO(f.getvalue()[:-3])
+        with self.assertRaises(ValueError):
+            list(get_codec('records').load(f))
+
+
+class test_convert(unittest.TestCase):
+    """ Class to test FileStorage.convert """
+
+    def test_convert_and_reload(self):
+        """ A converted file reloads in its new format """
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'file.json')
+            storage = FileStorage(path)
+            user = User()
+            storage.new(user)
+            storage.save()
+            storage.convert('records')
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(8), b'HBNBREC1')
+            other = FileStorage(path)
+            other.reload()
+            self.assertEqual(other.get(User, user.id).to_dict(),
+                             user.to_dict())
+            with self.assertRaises(ValueError):
+                storage.convert('xml')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+""" Module for testing the columnar store"""
+import unittest
+from models.engine.columns import ColumnStore
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+
+class test_columnStore(unittest.TestCase):
+    """ Class to test ColumnStore with stdlib arrays """
+
+    def setUp(self):
+        """ Set up a store holding three places """
+        self.store = ColumnStore(('price_by_night', 'max_guest'),
+                                 use_numpy=False)
+        for key, price, guests in (('Place.1', 50, 2), ('Place.2', 120, 4),
+                                   ('Place.3', '80', 6)):
+            place = Place()
+            place.price_by_night = price
+            place.max_guest = guests
+            self.store.add(key, place)
+
+    def test_select(self):
+        """ Keys within every range are returned """
+        keys = self.store.select(price_by_night=(60, 130), max_guest=(5, None))
+        self.assertEqual(keys, ['Place.3'])
+        self.assertEqual(len(self.store.select()), 3)
+
+    def test_remove_reuses_row(self):
+        """ Removed keys are dropped and their row reused """
+        self.store.remove('Place.1')
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(self.store.select(price_by_night=(None, 60)), [])
+        place = Place()
+        place.price_by_night = 10
+        self.store.add('Place.4', place)
+        self.assertEqual(self.store.select(price_by_night=(None, 60)),
+                         ['Place.4'])
+
+    def test_not_a_number(self):
+        """ Values that are not numbers match no range """
+        place = Place()
+        place.price_by_night = 'cheap'
+        self.store.add('Place.2', place)
+        self.assertEqual(self.store.select(price_by_night=(None, None)),
+                         ['Place.1', 'Place.3'])
+
+
+class test_filter(unittest.TestCase):
+    """ Class to test FileStorage.filter """
+
+    def setUp(self):
+        """ Set up a storage holding two places """
+        self.storage = FileStorage('test_columns.json')
+        self.accra = Place()
+        self.accra.latitude = 5.6
+        self.accra.longitude = -0.19
+        self.accra.price_by_night = 90
+        self.london = Place()
+        self.london.latitude = 51.5
+        self.london.longitude = -0.12
+        self.london.price_by_night = 200
+        self.storage.new(self.accra)
+        self.storage.new(self.london)
+
+    def test_filter_range(self):
+        """ Range filters return matching instances """
+        found = self.storage.filter(Place, price_by_night=(None, 100))
+        self.assertEqual(found, [self.accra])
+
+    def test_filter_bbox(self):
+        """ bbox bounds latitude and longitude """
+        found = self.storage.filter('Place', bbox=(50, -1, 52, 1))
+        self.assertEqual(found, [self.london])
+
+    def test_filter_after_update_and_delete(self):
+        """ Columns follow new() and delete() """
+        self.london.price_by_night = '80'
+        self.storage.new(self.london)
+        found = self.storage.filter(Place, price_by_night=(None, 100))
+        self.assertEqual(len(found), 2)
+        self.storage.delete(self.accra)
+        found = self.storage.filter(Place, price_by_night=(None, 100))
+        self.assertEqual(found, [self.london])
+
+    def test_filter_without_columns(self):
+        """ Classes without columns are filtered object by object """
+        self.assertEqual(self.storage.filter('User', age=(1, 2)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
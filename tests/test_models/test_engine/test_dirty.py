@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+""" Module for testing the encoded record cache of file storage"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from models.engine.file_storage import FileStorage
+from models.user import User
+
+
+class test_dirty(unittest.TestCase):
+    """ Class to test that snapshots only encode changed objects """
+
+    def setUp(self):
+        """ Save three users in a scratch storage """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'file.json')
+        self.storage = FileStorage(self.path, cache_records=True)
+        self.users = [User(), User(), User()]
+        for user in self.users:
+            self.storage.new(user)
+        self.storage.save()
+
+    def tearDown(self):
+        """ Remove the scratch directory """
+        self.tmp.cleanup()
+
+    def encoded(self):
+        """ Saves and returns how many objects to_dict was called on """
+        with patch.object(User, 'to_dict', autospec=True,
+                          side_effect=User.to_dict) as to_dict:
+            self.storage.save()
+        return to_dict.call_count
+
+    def reloaded(self, user):
+        """ Returns user as read back from the file """
+        other = FileStorage(self.path)
+        other.reload()
+        return other.get(User, user.id)
+
+    def test_clean_save(self):
+        """ Saving unchanged objects encodes none of them """
+        self.assertEqual(self.encoded(), 0)
+
+    def test_changed_attribute(self):
+        """ Only the object with a changed attribute is encoded again """
+        self.users[1].first_name = 'Ama'
+        self.assertEqual(self.encoded(), 1)
+        self.assertEqual(self.reloaded(self.users[1]).first_name, 'Ama')
+
+    def test_new_refreshes(self):
+        """ new() re-encodes objects changed in place """
+        self.users[0].tags = []
+        self.storage.save()
+        self.users[0].tags.append('x')
+        self.storage.new(self.users[0])
+        self.storage.save()
+        self.assertEqual(self.reloaded(self.users[0]).tags, ['x'])
+
+    def test_changed_in_place(self):
+        """ Lists changed in place are encoded again without new() """
+        self.users[0].tags = []
+        self.storage.save()
+        self.users[0].tags.append('x')
+        self.assertEqual(self.encoded(), 1)
+        self.assertEqual(self.reloaded(self.users[0]).tags, ['x'])
+        self.assertEqual(self.encoded(), 0)
+
+    def test_shared_objects(self):
+        """ A save by another storage does not hide a change """
+        other = FileStorage(os.path.join(self.tmp.name, 'other.json'),
+                            cache_records=True)
+        other.new(self.users[2])
+        self.users[2].first_name = 'Kofi'
+        other.save()
+        self.storage.save()
+        self.assertEqual(self.reloaded(self.users[2]).first_name, 'Kofi')
+
+    def test_uncached_formats(self):
+        """ Formats that are not JSON encode every object """
+        self.storage.convert('pickle')
+        self.assertEqual(self.encoded(), 3)
+
+    def test_off_by_default(self):
+        """ Without cache_records every object is encoded again """
+        self.storage = FileStorage(self.path)
+        self.storage.reload()
+        self.storage.save()
+        self.assertEqual(self.encoded(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -102,6 +102,27 @@ class test_fileStorage(unittest.TestCase):
             temp = key
         self.assertEqual(temp, 'BaseModel' + '.' + _id)
 
+    def test_all_cls(self):
+        """ all(cls) returns only the objects of that class """
+        from models.user import User
+        new = BaseModel()
+        user = User()
+        self.assertEqual(list(storage.all(User).values()), [user])
+        self.assertEqual(list(storage.all('BaseModel').values()), [new])
+        self.assertEqual(len(storage.all()), 2)
+
+    def test_count(self):
+        """ count tracks objects per class through new and delete """
+        from models.user import User
+        BaseModel()
+        user = User()
+        self.assertEqual(storage.count(), 2)
+        self.assertEqual(storage.count(User), 1)
+        storage.delete(user)
+        self.assertEqual(storage.count('User'), 0)
+        self.assertEqual(User.count(), 0)
+        self.assertEqual(BaseModel.count(), 1)
+
     def test_storage_var_created(self):
         """ FileStorage object storage created """
         from models.engine.file_storage import FileStorage
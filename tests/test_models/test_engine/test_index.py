@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+""" Module for testing secondary indexes"""
+import unittest
+from models.engine.file_storage import FileStorage
+from models.engine.index import AttributeIndex
+from models.city import City
+from models.place import Place
+
+
+class test_attributeIndex(unittest.TestCase):
+    """ Class to test AttributeIndex """
+
+    def test_add_lookup(self):
+        """ Keys are found under the value they were added with """
+        index = AttributeIndex('city_id')
+        index.add('Place.1', 'a')
+        index.add('Place.2', 'a')
+        index.add('Place.3', 'b')
+        self.assertEqual(index.lookup('a'), {'Place.1', 'Place.2'})
+        self.assertEqual(len(index), 3)
+
+    def test_readd_moves_key(self):
+        """ Adding a key again moves it to its new value """
+        index = AttributeIndex('city_id')
+        index.add('Place.1', 'a')
+        index.add('Place.1', 'b')
+        self.assertEqual(index.lookup('a'), set())
+        self.assertEqual(index.lookup('b'), {'Place.1'})
+
+    def test_remove(self):
+        """ Removed keys are no longer found """
+        index = AttributeIndex('city_id')
+        index.add('Place.1', 'a')
+        index.remove('Place.1')
+        index.remove('Place.2')
+        self.assertEqual(index.lookup('a'), set())
+
+    def test_list_values(self):
+        """ List values index the key under each item """
+        index = AttributeIndex('amenity_ids')
+        index.add('Place.1', ['x', 'y'])
+        self.assertEqual(index.lookup('y'), {'Place.1'})
+        index.add('Place.1', ['x'])
+        self.assertEqual(index.lookup('y'), set())
+
+    def test_unhashable_values(self):
+        """ A list with an unhashable item leaves nothing indexed """
+        index = AttributeIndex('amenity_ids')
+        index.add('Place.1', ['x', ['y'], 'z'])
+        self.assertEqual(index.lookup('x'), set())
+        self.assertEqual(len(index), 0)
+        index.add('Place.1', ['x'])
+        self.assertEqual(index.lookup('x'), {'Place.1'})
+
+
+class test_find(unittest.TestCase):
+    """ Class to test FileStorage.find """
+
+    def setUp(self):
+        """ Set up a storage holding two places """
+        self.storage = FileStorage('test_index.json')
+        self.first = Place()
+        self.first.city_id = 'accra'
+        self.second = Place()
+        self.second.city_id = 'kumasi'
+        self.storage.new(self.first)
+        self.storage.new(self.second)
+
+    def test_find_indexed(self):
+        """ Indexed attributes are looked up by value """
+        found = self.storage.find('Place', 'city_id', 'accra')
+        self.assertEqual(found, [self.first])
+
+    def test_find_after_update(self):
+        """ Updated objects move in the index on new() """
+        self.second.city_id = 'accra'
+        self.storage.new(self.second)
+        found = self.storage.find(Place, 'city_id', 'accra')
+        self.assertEqual(len(found), 2)
+
+    def test_find_before_new(self):
+        """ Changes are only indexed once the object is stored again """
+        self.second.city_id = 'accra'
+        self.first.city_id = 'tamale'
+        self.assertEqual(self.storage.find(Place, 'city_id', 'accra'), [])
+        self.storage.new(self.second)
+        self.assertEqual(self.storage.find(Place, 'city_id', 'accra'),
+                         [self.second])
+
+    def test_find_after_delete(self):
+        """ Deleted objects are no longer found """
+        self.storage.delete(self.first)
+        self.assertEqual(self.storage.find('Place', 'city_id', 'accra'), [])
+
+    def test_find_unindexed(self):
+        """ Attributes without an index fall back to a scan """
+        self.first.name = 'Villa'
+        found = self.storage.find('Place', 'name', 'Villa')
+        self.assertEqual(found, [self.first])
+        self.assertEqual(self.storage.find(City, 'name', 'Villa'), [])
+
+    def test_find_after_direct_delete(self):
+        """ Objects removed straight from all() are not returned """
+        del self.storage.all()['Place.' + self.first.id]
+        self.assertEqual(self.storage.find('Place', 'city_id', 'accra'), [])
+
+    def test_find_after_direct_swap(self):
+        """ Objects swapped straight in all() are seen at the same count """
+        other = Place()
+        other.city_id = 'accra'
+        del self.storage.all()['Place.' + self.first.id]
+        self.storage.all()['Place.' + other.id] = other
+        self.assertEqual(self.storage.find('Place', 'city_id', 'accra'),
+                         [other])
+        self.assertEqual(list(self.storage.all(Place).values()),
+                         [self.second, other])
+
+
+if __name__ == '__main__':
+    unittest.main()
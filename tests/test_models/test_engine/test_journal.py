@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+""" Module for testing the journaled file storage"""
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from models.engine.file_storage import FileStorage
+from models.engine.journal import Journal
+from models.user import User
+
+
+class test_journal(unittest.TestCase):
+    """ Class to test FileStorage in journal mode """
+
+    def setUp(self):
+        """ Set up a journaled storage in a scratch directory """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'file.json')
+        self.storage = FileStorage(self.path, journal=True)
+
+    def tearDown(self):
+        """ Remove the scratch directory """
+        self.tmp.cleanup()
+
+    def test_save_appends_changes_only(self):
+        """ Each save appends the objects changed since the last one """
+        first = User()
+        self.storage.new(first)
+        self.storage.save()
+        second = User()
+        self.storage.new(second)
+        self.storage.save()
+        self.assertFalse(os.path.exists(self.path))
+        with open(self.path + '.journal') as f:
+            keys = [json.loads(line)['key'] for line in f]
+        self.assertEqual(keys, ['User.' + first.id, 'User.' + second.id])
+
+    def test_reload_replays_journal(self):
+        """ Updates and deletes in the journal are replayed on reload """
+        kept = User()
+        gone = User()
+        self.storage.new(kept)
+        self.storage.new(gone)
+        self.storage.save()
+        kept.email = 'a@b.c'
+        self.storage.new(kept)
+        self.storage.delete(gone)
+        self.storage.save()
+        other = FileStorage(self.path, journal=True)
+        other.reload()
+        self.assertEqual(list(other.all()), ['User.' + kept.id])
+        self.assertEqual(other.all()['User.' + kept.id].email, 'a@b.c')
+
+    def test_torn_tail(self):
+        """ A torn final line is cut off so later appends survive """
+        first = User()
+        self.storage.new(first)
+        self.storage.save()
+        with open(self.path + '.journal', 'a') as f:
+            f.write('{"op": "set", "key": "User.torn", "ob')
+        storage = FileStorage(self.path, journal=True)
+        storage.reload()
+        second = User()
+        storage.new(second)
+        storage.save()
+        other = FileStorage(self.path, journal=True)
+        other.reload()
+        self.assertEqual(sorted(other.all()),
+                         sorted(['User.' + first.id, 'User.' + second.id]))
+
+    def test_failed_append(self):
+        """ Changes of a failed append are written by the next save """
+        users = [User(), User(), User(), User()]
+        self.storage.new(users[0])
+        self.storage.save()
+        self.storage.new(users[1])
+        with patch.object(Journal, 'append', side_effect=OSError(28, 'full')):
+            with self.assertRaises(OSError):
+                self.storage.save()
+        self.storage.new(users[2])
+        self.storage.save()
+        with open(self.path + '.journal', 'a') as f:
+            # what an append failing halfway leaves behind
+            f.write('{"op": "set", "key": "User.torn", "ob')
+        self.storage.new(users[3])
+        self.storage.save()
+        other = FileStorage(self.path, journal=True)
+        other.reload()
+        self.assertEqual(sorted(other.all()),
+                         sorted('User.' + user.id for user in users))
+
+    def test_direct_edit(self):
+        """ Objects swapped straight in all() reach the file """
+        first = User()
+        second = User()
+        self.storage.new(first)
+        self.storage.save()
+        objects = self.storage.all()
+        del objects['User.' + first.id]
+        objects['User.' + second.id] = second
+        self.storage.save()
+        other = FileStorage(self.path, journal=True)
+        other.reload()
+        self.assertEqual(list(other.all()), ['User.' + second.id])
+
+    def test_compact(self):
+        """ compact folds the journal into the snapshot """
+        obj = User()
+        self.storage.new(obj)
+        self.storage.save()
+        self.storage.compact()
+        self.assertFalse(os.path.exists(self.path + '.journal'))
+        with open(self.path) as f:
+            self.assertIn('User.' + obj.id, json.load(f))
+
+    def test_auto_compact(self):
+        """ The journal is compacted once it outgrows the threshold """
+        self.storage.compact_threshold = 2
+        obj = User()
+        for _ in range(3):
+            self.storage.new(obj)
+            self.storage.save()
+        self.assertTrue(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path + '.journal'))
+
+
+if __name__ == '__main__':
+    unittest.main()
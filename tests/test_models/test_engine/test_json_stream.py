@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+""" Module for testing the streaming JSON decoder"""
+import io
+import json
+import unittest
+from models.engine.json_stream import iter_items
+
+
+class test_iterItems(unittest.TestCase):
+    """ Class to test iter_items """
+
+    def decode(self, text, chunk_size=4):
+        """ Decodes text with a small chunk size to force refills """
+        f = io.BytesIO(text.encode('utf-8'))
+        return list(iter_items(f, chunk_size))
+
+    def test_matches_json_load(self):
+        """ Members come out as json.load would decode them """
+        data = {
+            'User.1': {'id': '1', 'email': 'café@x.gh'},
+            'Place.2': {'id': '2', 'price_by_night': 12345,
+                        'latitude': -0.25, 'amenity_ids': ['a', 'b']}
+        }
+        self.assertEqual(self.decode(json.dumps(data)), list(data.items()))
+
+    def test_whitespace(self):
+        """ Whitespace between tokens is skipped """
+        text = ' {\n "a" : 1 ,\n "b":\t2 }\n'
+        self.assertEqual(self.decode(text), [('a', 1), ('b', 2)])
+
+    def test_empty_object(self):
+        """ An empty object yields nothing """
+        self.assertEqual(self.decode('{}'), [])
+
+    def test_empty_file(self):
+        """ An empty file is an error like with json.load """
+        with self.assertRaises(ValueError):
+            self.decode('')
+
+    def test_truncated(self):
+        """ A truncated file is an error """
+        with self.assertRaises(ValueError):
+            self.decode('{"a": {"id": ')
+
+
+if __name__ == '__main__':
+    unittest.main()
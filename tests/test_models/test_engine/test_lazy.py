@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+""" Module for testing lazy loading in file storage"""
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.user import User
+
+
+class test_lazy(unittest.TestCase):
+    """ Class to test FileStorage with lazy=True """
+
+    def setUp(self):
+        """ Write a file with two users and a place, then lazily load it """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'file.json')
+        writer = FileStorage(self.path)
+        self.users = [User(), User()]
+        self.place = Place()
+        self.place.city_id = 'accra'
+        for obj in self.users + [self.place]:
+            writer.new(obj)
+        writer.save()
+        self.storage = FileStorage(self.path, lazy=True)
+        self.storage.reload()
+
+    def tearDown(self):
+        """ Remove the scratch directory """
+        self.tmp.cleanup()
+
+    def built(self):
+        """ Returns the number of instances built so far """
+        return self.storage._FileStorage__linked
+
+    def test_count_builds_nothing(self):
+        """ Counting works on the raw records """
+        self.assertEqual(self.storage.count(), 3)
+        self.assertEqual(self.storage.count(User), 2)
+        self.assertEqual(self.built(), 0)
+
+    def test_get_builds_one(self):
+        """ get builds only the requested object """
+        obj = self.storage.get('User', self.users[0].id)
+        self.assertIsInstance(obj, User)
+        self.assertEqual(obj.created_at, self.users[0].created_at)
+        self.assertEqual(self.built(), 1)
+        self.assertIs(self.storage.get(User, self.users[0].id), obj)
+        self.assertIsNone(self.storage.get(User, 'missing'))
+
+    def test_all_cls_builds_class(self):
+        """ all(cls) builds only that class """
+        self.assertEqual(len(self.storage.all(User)), 2)
+        self.assertEqual(self.built(), 2)
+        self.assertEqual(len(self.storage.all()), 3)
+        self.assertEqual(self.storage.count(), 3)
+
+    def test_find(self):
+        """ find builds the class and uses its index """
+        found = self.storage.find(Place, 'city_id', 'accra')
+        self.assertEqual([obj.id for obj in found], [self.place.id])
+
+    def test_build_during_snapshot(self):
+        """ A snapshot taken while records are built keeps all of them """
+        build = self.storage._FileStorage__build
+        writers = []
+
+        def build_and_snapshot(val):
+            """ Starts a snapshot from another thread mid build """
+            if not writers:
+                writer = threading.Thread(target=self.storage.compact)
+                writers.append(writer)
+                writer.start()
+                writer.join(0.2)
+            return build(val)
+        with patch.object(self.storage, '_FileStorage__build',
+                          build_and_snapshot):
+            self.storage.all(User)
+        writers[0].join()
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)), 3)
+
+    def test_save_keeps_unbuilt_records(self):
+        """ save writes raw records back without building them """
+        obj = self.storage.get(User, self.users[0].id)
+        self.storage.delete(obj)
+        self.storage.save()
+        self.assertEqual(self.built(), 0)
+        with open(self.path) as f:
+            keys = set(json.load(f))
+        self.assertEqual(keys, {'User.' + self.users[1].id,
+                                'Place.' + self.place.id})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+""" Module for testing the storage metrics"""
+import os
+import tempfile
+import unittest
+from models.base_model import parse_time
+from models.engine import metrics
+from models.engine.file_storage import FileStorage
+from models.user import User
+
+
+class test_histogram(unittest.TestCase):
+    """ Class to test metrics.Histogram """
+
+    def test_summary(self):
+        """ Percentiles are bounded by their power of two bucket """
+        histogram = metrics.Histogram()
+        for us in [10] * 90 + [1000] * 10:
+            histogram.add(us / 1e6)
+        summary = histogram.summary()
+        self.assertEqual(summary['count'], 100)
+        self.assertEqual(summary['p50_us'], 16.0)
+        self.assertEqual(summary['p99_us'], 1000.0)
+        self.assertEqual(summary['min_us'], 10.0)
+        self.assertEqual(metrics.Histogram().summary(), {'count': 0})
+
+
+class test_metrics(unittest.TestCase):
+    """ Class to test the metrics collected from storage """
+
+    def setUp(self):
+        """ Set up a storage in a scratch directory and clear metrics """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'file.json')
+        self.storage = FileStorage(self.path, cache_records=True)
+        metrics.reset()
+        self.addCleanup(metrics.enable, False)
+        self.addCleanup(metrics.reset)
+
+    def tearDown(self):
+        """ Remove the scratch directory """
+        self.tmp.cleanup()
+
+    def test_disabled(self):
+        """ Nothing is collected while metrics are off """
+        self.storage.new(User())
+        self.storage.save()
+        stats = metrics.snapshot()
+        self.assertFalse(stats['enabled'])
+        self.assertEqual(stats['counters'], {})
+        self.assertEqual(stats['histograms'], {})
+
+    def test_storage(self):
+        """ Storage operations feed their counters and histograms """
+        users = [User(), User()]
+        metrics.enable()
+        for user in users:
+            self.storage.new(user)
+        self.storage.save()
+        written = self.storage.last_write['bytes']
+        self.storage.delete(users[0])
+        with self.storage.batch():
+            self.storage.save()
+        self.storage.reload()
+        stats = metrics.snapshot()
+        counters = stats['counters']
+        histograms = stats['histograms']
+        self.assertEqual(histograms['storage.new']['count'], 2)
+        self.assertEqual(histograms['storage.delete']['count'], 1)
+        self.assertEqual(histograms['storage.commit']['count'], 2)
+        self.assertEqual(counters['storage.saves_deferred'], 1)
+        self.assertEqual(counters['storage.writes'], 2)
+        self.assertEqual(counters['storage.bytes_written'],
+                         written + os.path.getsize(self.path))
+        self.assertEqual(counters['storage.records_encoded'], 2)
+        self.assertEqual(counters['storage.records_cached'], 1)
+        self.assertEqual(counters['storage.objects_loaded'], 1)
+        self.assertIn('storage.reload', histograms)
+        self.assertIn('storage.serialize', histograms)
+
+    def test_nothing_pending(self):
+        """ A save with nothing to append keeps the last write """
+        for name, options in (('journal.json', {'journal': True}),
+                              ('indexed.json', {'file_format': 'indexed'})):
+            storage = FileStorage(os.path.join(self.tmp.name, name),
+                                  **options)
+            storage.new(User())
+            storage.save()
+            storage.save()
+            metrics.enable()
+            storage.save()
+            metrics.enable(False)
+            self.assertIsNotNone(storage.last_write, msg=options)
+
+    def test_parse_time(self):
+        """ Timestamps left to strptime are counted """
+        metrics.enable()
+        parse_time('2023-07-12T10:59:42.319408')
+        parse_time('2023-7-12T10:59:42.319408')
+        stats = metrics.snapshot()
+        self.assertEqual(stats['histograms']['model.parse_time']['count'],
+                         2)
+        self.assertEqual(stats['counters']['model.strptime'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+""" Module for testing paged and streamed listing of storage"""
+import os
+import tempfile
+import unittest
+from models.engine.file_storage import FileStorage
+from models.engine.sqlite_storage import SQLiteStorage
+from models.place import Place
+from models.user import User
+
+
+class test_paging(unittest.TestCase):
+    """ Class to test page and iterate of FileStorage """
+
+    def setUp(self):
+        """ Store five places and a user """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'file.json')
+        self.storage = FileStorage(self.path)
+        self.places = [Place() for _ in range(5)]
+        for place in self.places:
+            self.storage.new(place)
+        self.storage.new(User())
+        self.ids = sorted(place.id for place in self.places)
+
+    def tearDown(self):
+        """ Remove the scratch directory """
+        self.tmp.cleanup()
+
+    def walk(self, storage, limit):
+        """ Returns the ids of every page of Place, following the cursor """
+        pages = []
+        after = None
+        while True:
+            page = [obj.id for obj in storage.page(Place, limit, after)]
+            if not page:
+                return pages
+            pages.append(page)
+            after = page[-1]
+
+    def test_pages(self):
+        """ Pages follow each other in id order """
+        self.assertEqual(self.walk(self.storage, 2),
+                         [self.ids[:2], self.ids[2:4], self.ids[4:]])
+        self.assertEqual(len(self.storage.page(Place)), 5)
+
+    def test_changes(self):
+        """ Pages see objects added or deleted since the last one """
+        self.assertEqual(len(self.storage.page(Place, 10)), 5)
+        self.storage.delete(self.storage.get(Place, self.ids[0]))
+        added = Place()
+        self.storage.new(added)
+        ids = sorted(self.ids[1:] + [added.id])
+        self.assertEqual([obj.id for obj in self.storage.page(Place, 10)],
+                         ids)
+        self.storage.delete(self.storage.get(Place, ids[1]))
+        self.assertEqual(
+            [obj.id for obj in self.storage.page(Place, 1, ids[1])],
+            [ids[2]])
+
+    def test_lazy(self):
+        """ Only the objects of a page or of the stream read are built """
+        self.storage.save()
+        lazy = FileStorage(self.path, lazy=True)
+        lazy.reload()
+        self.assertEqual([obj.id for obj in lazy.page(Place, 2)],
+                         self.ids[:2])
+        self.assertEqual(lazy._FileStorage__linked, 2)
+        lazy = FileStorage(self.path, lazy=True)
+        lazy.reload()
+        stream = lazy.iterate(Place)
+        next(stream)
+        self.assertEqual(lazy._FileStorage__linked, 1)
+        self.assertEqual(len(list(stream)), 4)
+        self.assertEqual(len(list(lazy.iterate())), 6)
+
+    def test_sqlite(self):
+        """ SQLiteStorage pages with the same cursor """
+        database = SQLiteStorage(os.path.join(self.tmp.name, 'hbnb.db'))
+        database.reload()
+        self.addCleanup(database.close)
+        for place in self.places:
+            database.new(place)
+        database.save()
+        self.assertEqual(self.walk(database, 2),
+                         [self.ids[:2], self.ids[2:4], self.ids[4:]])
+        self.assertEqual(len(list(database.iterate(Place))), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
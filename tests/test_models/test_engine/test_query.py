@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+""" Module for testing the search query language and planner"""
+import os
+import tempfile
+import unittest
+from models.engine import query
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+TYPES = {'price_by_night': int, 'latitude': float}
+
+
+class test_parse(unittest.TestCase):
+    """ Class to test query parsing """
+
+    def test_precedence(self):
+        """ and binds tighter than or, parentheses override it """
+        parsed = query.parse('a = 1 or b = 2 and c = 3')
+        self.assertEqual(str(parsed.where),
+                         "(a = '1' or (b = '2' and c = '3'))")
+        parsed = query.parse('(a = 1 OR b = 2) AND c = 3')
+        self.assertEqual(str(parsed.where),
+                         "((a = '1' or b = '2') and c = '3')")
+
+    def test_clauses(self):
+        """ order by and limit follow the condition """
+        parsed = query.parse('name "My Place" order by price_by_night '
+                             'desc limit 5', TYPES)
+        self.assertEqual(str(parsed.where), "name = 'My Place'")
+        self.assertEqual(parsed.order_by, 'price_by_night')
+        self.assertTrue(parsed.descending)
+        self.assertEqual(parsed.limit, 5)
+
+    def test_types(self):
+        """ Values are cast with the types table """
+        parsed = query.parse('price_by_night in (80, "90")', TYPES)
+        self.assertEqual(parsed.where.values, [80, 90])
+        with self.assertRaises(ValueError):
+            query.parse('price_by_night > cheap', TYPES)
+
+    def test_errors(self):
+        """ Malformed queries raise ValueError """
+        for text in ('a =', 'a = 1 and', '(a = 1', 'a = 1 limit x',
+                     'a = 1 b', 'a ! 1'):
+            with self.assertRaises(ValueError, msg=text):
+                query.parse(text)
+
+    def test_test(self):
+        """ Stored values are cast before being compared """
+        where = query.parse('price_by_night > 100', TYPES).where
+        self.assertTrue(where.test({'price_by_night': '150'}.get))
+        self.assertFalse(where.test({'price_by_night': '90'}.get))
+        self.assertFalse(where.test({'price_by_night': 'n/a'}.get))
+        self.assertFalse(where.test({}.get))
+
+
+class test_plan(unittest.TestCase):
+    """ Class to test the planner against a file storage """
+
+    def setUp(self):
+        """ Store places with a city and a price """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = FileStorage(os.path.join(self.tmp.name, 'file.json'))
+        self.places = []
+        for city, price in (('c1', '80'), ('c1', '150'), ('c2', '300')):
+            place = Place()
+            place.city_id = city
+            place.price_by_night = price
+            self.storage.new(place)
+            self.places.append(place)
+
+    def tearDown(self):
+        """ Remove the scratch directory """
+        self.tmp.cleanup()
+
+    def run_query(self, text):
+        """ Returns the plan of text and the objects it finds """
+        plan = query.plan(self.storage, 'Place', query.parse(text, TYPES))
+        return plan, plan.run()
+
+    def test_index(self):
+        """ Equality on an indexed attribute uses the index """
+        plan, found = self.run_query('city_id = c1 and price_by_night > 100')
+        self.assertEqual(plan.access, 'index')
+        self.assertEqual(found, [self.places[1]])
+
+    def test_list_attribute(self):
+        """ A list attribute matches the values it holds on every path """
+        self.places[0].amenity_ids = ['a1', 'a2']
+        self.storage.new(self.places[0])
+        for text in ('amenity_ids = a2', 'amenity_ids in (a3, a1)',
+                     'amenity_ids = a1 or city_id = none'):
+            _, found = self.run_query(text)
+            self.assertEqual(found, [self.places[0]], msg=text)
+        _, found = self.run_query('amenity_ids != a1')
+        self.assertCountEqual(found, self.places[1:])
+
+    def test_columns(self):
+        """ Numeric comparisons on column attributes use the columns """
+        plan, found = self.run_query('price_by_night > 80 and '
+                                     'price_by_night <= 300')
+        self.assertEqual(plan.access, 'columns')
+        self.assertEqual(plan.detail, {'price_by_night': (80, 300)})
+        self.assertCountEqual(found, self.places[1:])
+
+    def test_scan(self):
+        """ A disjunction falls back to a scan """
+        plan, found = self.run_query('city_id = c2 or price_by_night = 80')
+        self.assertEqual(plan.access, 'scan')
+        self.assertCountEqual(found, [self.places[0], self.places[2]])
+        self.assertTrue(plan.explain()[0].startswith('access: full scan'))
+
+    def test_order_limit(self):
+        """ Results are ordered numerically then limited """
+        _, found = self.run_query('city_id in (c1, c2) '
+                                  'order by price_by_night desc limit 2')
+        self.assertEqual(found, [self.places[2], self.places[1]])
+
+    def test_lazy_scan_builds_matches(self):
+        """ A scan of lazily loaded records only builds the matches """
+        self.storage.save()
+        lazy = FileStorage(self.storage._FileStorage__file_path, lazy=True)
+        lazy.reload()
+        plan = query.plan(lazy, 'Place',
+                          query.parse('price_by_night != 80', TYPES))
+        self.assertEqual(len(plan.run()), 2)
+        self.assertEqual(lazy._FileStorage__linked, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
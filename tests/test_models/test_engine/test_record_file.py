@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+""" Module for testing the indexed record file"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from models.engine import file_storage, record_file
+from models.engine.file_storage import FileStorage
+from models.engine.record_file import RecordFile
+from models.user import User
+
+
+class test_record_file(unittest.TestCase):
+    """ Class to test RecordFile """
+
+    def setUp(self):
+        """ Write a record file with two records """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'file.json')
+        with open(self.path, 'wb') as f:
+            record_file.dump(iter([('User.1', {'id': '1'}),
+                                   ('User.2', {'id': '2', 'name': 'Ama'})]),
+                             f)
+
+    def tearDown(self):
+        """ Remove the scratch directory """
+        self.tmp.cleanup()
+
+    def open(self):
+        """ Returns the file opened as a RecordFile """
+        records = RecordFile(self.path)
+        self.addCleanup(records.close)
+        return records
+
+    def test_read(self):
+        """ Records are read by key """
+        records = self.open()
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records.read('User.2'), {'id': '2', 'name': 'Ama'})
+        with self.assertRaises(KeyError):
+            records.read('User.3')
+
+    def test_append(self):
+        """ Appended records supersede the indexed ones after reopening """
+        records = self.open()
+        timings = records.append([('User.1', {'id': '1', 'v': 2}),
+                                  ('User.2', None),
+                                  ('User.3', {'id': '3'})])
+        self.assertGreater(timings['bytes'], 0)
+        self.assertEqual(records.read('User.1'), {'id': '1', 'v': 2})
+        self.assertNotIn('User.2', records)
+        other = self.open()
+        self.assertEqual(sorted(other.index), ['User.1', 'User.3'])
+        self.assertEqual(other.read('User.1'), {'id': '1', 'v': 2})
+        self.assertEqual(other.tail, 3)
+
+    def test_torn_append(self):
+        """ A torn appended record is ignored and overwritten """
+        self.open().append([('User.3', {'id': '3'})])
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 2)
+        records = self.open()
+        self.assertNotIn('User.3', records)
+        records.append([('User.4', {'id': '4'})])
+        self.assertEqual(self.open().read('User.4'), {'id': '4'})
+
+    def test_failed_append(self):
+        """ The index is unchanged by an append that fails """
+        records = self.open()
+        with patch.object(record_file.os, 'fsync',
+                          side_effect=OSError(5, 'io')):
+            with self.assertRaises(OSError):
+                records.append([('User.2', None), ('User.3', {'id': '3'})],
+                               'file')
+        self.assertEqual(sorted(records.index), ['User.1', 'User.2'])
+        self.assertEqual(records.read('User.2'), {'id': '2', 'name': 'Ama'})
+        records.append([('User.3', {'id': '3'})])
+        self.assertEqual(records.read('User.3'), {'id': '3'})
+
+    def test_not_record_file(self):
+        """ Other files are rejected """
+        with open(self.path, 'wb') as f:
+            f.write(b'{}')
+        with self.assertRaises(ValueError):
+            RecordFile(self.path)
+
+
+class test_indexed_storage(unittest.TestCase):
+    """ Class to test FileStorage in the indexed format """
+
+    def setUp(self):
+        """ Save three users in the indexed format """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'file.json')
+        writer = FileStorage(self.path, file_format='indexed')
+        self.users = [User(), User(), User()]
+        for user in self.users:
+            writer.new(user)
+        writer.save()
+
+    def tearDown(self):
+        """ Remove the scratch directory """
+        self.tmp.cleanup()
+
+    def storage(self, **kwargs):
+        """ Returns a storage reloaded from the file """
+        storage = FileStorage(self.path, file_format='indexed', **kwargs)
+        storage.reload()
+        return storage
+
+    def test_lazy_get_reads_one(self):
+        """ get decodes only the requested record """
+        storage = self.storage(lazy=True)
+        with patch.object(RecordFile, 'read',
+                          autospec=True, side_effect=RecordFile.read) as read:
+            user = storage.get(User, self.users[1].id)
+            self.assertEqual(read.call_count, 1)
+        self.assertEqual(user.to_dict(), self.users[1].to_dict())
+        self.assertEqual(storage.count(User), 3)
+
+    def test_update_appends(self):
+        """ Saving an update appends it instead of rewriting the file """
+        storage = self.storage(lazy=True)
+        user = storage.get(User, self.users[0].id)
+        user.first_name = 'Kofi'
+        storage.delete(storage.get(User, self.users[2].id))
+        with patch.object(file_storage, 'atomic_write') as write:
+            storage.new(user)
+            storage.save()
+            self.assertEqual(write.call_count, 0)
+        other = self.storage()
+        self.assertEqual(other.count(User), 2)
+        self.assertEqual(other.get(User, user.id).first_name, 'Kofi')
+
+    def test_failed_save_retried(self):
+        """ Changes of a failed append are written by the next save """
+        storage = self.storage()
+        user = storage.get(User, self.users[0].id)
+        user.first_name = 'Kofi'
+        storage.new(user)
+        with patch.object(RecordFile, 'append',
+                          side_effect=OSError(28, 'full')):
+            with self.assertRaises(OSError):
+                storage.save()
+        storage.save()
+        self.assertEqual(self.storage().get(User, user.id).first_name,
+                         'Kofi')
+
+    def test_compacts(self):
+        """ The file is rewritten once appends outnumber live records """
+        storage = self.storage(compact_threshold=2)
+        user = storage.get(User, self.users[0].id)
+        for count in range(1, 5):
+            storage.new(user)
+            storage.save()
+            records = RecordFile(self.path)
+            self.addCleanup(records.close)
+            self.assertEqual(records.tail, count % 4)
+            self.assertEqual(len(records), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
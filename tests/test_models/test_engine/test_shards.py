@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+""" Module for testing sharded file storage"""
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from models.engine import file_storage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.user import User
+
+
+class test_shards(unittest.TestCase):
+    """ Class to test FileStorage with shards """
+
+    def setUp(self):
+        """ Set up a scratch directory """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'file.json')
+
+    def tearDown(self):
+        """ Remove the scratch directory """
+        self.tmp.cleanup()
+
+    def files(self):
+        """ Returns the names of the files in the scratch directory """
+        return sorted(os.listdir(self.tmp.name))
+
+    def fill(self, storage):
+        """ Saves two users and a place in storage """
+        objs = [User(), User(), Place()]
+        for obj in objs:
+            storage.new(obj)
+        storage.save()
+        return objs
+
+    def test_class_shards(self):
+        """ Each class is saved to its own file """
+        objs = self.fill(FileStorage(self.path, shards='class'))
+        self.assertEqual(self.files(),
+                         ['file.json.shard.Place', 'file.json.shard.User'])
+        other = FileStorage(self.path, shards='class', reload_workers=2)
+        other.reload()
+        self.assertEqual(other.count(User), 2)
+        self.assertEqual(other.get(Place, objs[2].id).to_dict(),
+                         objs[2].to_dict())
+
+    def test_import_with_shards(self):
+        """ Importing models over shard files loads them without hanging """
+        self.fill(FileStorage(self.path, shards='class'))
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))))
+        env = dict(os.environ, PYTHONPATH=root, HBNB_RELOAD_WORKERS='2')
+        # pretend to have several CPUs, as the pool is skipped on one
+        result = subprocess.run(
+            [sys.executable, '-c', 'import os\nos.cpu_count = lambda: 4\n'
+             'import models\nmodels.storage.reload()\n'
+             'print(models.storage.count())'],
+            cwd=self.tmp.name, env=env, capture_output=True, text=True,
+            timeout=60)
+        self.assertEqual(result.stdout.strip(), '3', msg=result.stderr)
+
+    def test_failed_write_retried(self):
+        """ A shard whose write failed is written by the next save """
+        storage = FileStorage(self.path, shards='class')
+        objs = self.fill(storage)
+        user = User()
+        storage.new(user)
+        with patch.object(file_storage, 'atomic_write',
+                          side_effect=OSError(28, 'full')):
+            with self.assertRaises(OSError):
+                storage.save()
+        storage.new(objs[2])
+        storage.save()
+        other = FileStorage(self.path, shards='class')
+        other.reload()
+        self.assertEqual(other.count(User), 3)
+
+    def test_dirty_only(self):
+        """ Only the shards of changed objects are rewritten """
+        storage = FileStorage(self.path, shards='class')
+        objs = self.fill(storage)
+        with patch.object(file_storage, 'atomic_write',
+                          wraps=file_storage.atomic_write) as write:
+            storage.delete(objs[0])
+            storage.save()
+            self.assertEqual([c.args[0] for c in write.call_args_list],
+                             [self.path + '.shard.User'])
+            storage.save()
+            self.assertEqual(write.call_count, 1)
+        other = FileStorage(self.path, shards='class')
+        other.reload()
+        self.assertEqual(other.count(), 2)
+
+    def test_hash_shards(self):
+        """ Keys are hashed into the given number of files """
+        storage = FileStorage(self.path, shards=2)
+        for _ in range(20):
+            storage.new(User())
+        storage.save()
+        self.assertEqual(self.files(),
+                         ['file.json.shard.0', 'file.json.shard.1'])
+        other = FileStorage(self.path, shards=2)
+        other.reload()
+        self.assertEqual(other.count(User), 20)
+
+    def test_layout_change(self):
+        """ Files of another layout are loaded then replaced on save """
+        objs = self.fill(FileStorage(self.path))
+        storage = FileStorage(self.path, shards=3)
+        storage.reload()
+        self.assertEqual(storage.count(), 3)
+        storage.save()
+        self.assertNotIn('file.json', self.files())
+        storage = FileStorage(self.path)
+        storage.reload()
+        self.assertEqual(storage.get(User, objs[0].id).to_dict(),
+                         objs[0].to_dict())
+        storage.save()
+        self.assertEqual(self.files(), ['file.json'])
+
+    def test_invalid(self):
+        """ Unknown shard layouts are rejected """
+        with self.assertRaises(ValueError):
+            FileStorage(self.path, shards=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
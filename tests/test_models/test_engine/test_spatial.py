@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+""" Module for testing the spatial grid index"""
+import unittest
+from models.compact import compact_class
+from models.engine.file_storage import FileStorage
+from models.engine.spatial import GridIndex, distance_km
+from models.place import Place
+
+
+def place(lat, lon):
+    """ Returns a Place at the given location """
+    obj = Place()
+    obj.latitude = lat
+    obj.longitude = lon
+    return obj
+
+
+class test_gridIndex(unittest.TestCase):
+    """ Class to test GridIndex """
+
+    def setUp(self):
+        """ Set up a grid over a few cities """
+        self.grid = GridIndex(cell_deg=1.0)
+        self.cities = {
+            'accra': (5.60, -0.19), 'kumasi': (6.69, -1.62),
+            'lome': (6.13, 1.22), 'london': (51.51, -0.13),
+            'suva': (-18.14, 178.44), 'apia': (-13.83, -171.76)
+        }
+        for key, (lat, lon) in self.cities.items():
+            self.grid.add(key, place(lat, lon))
+
+    def test_distance(self):
+        """ Great-circle distance between Accra and London """
+        self.assertAlmostEqual(distance_km(5.60, -0.19, 51.51, -0.13),
+                               5105, delta=5)
+
+    def test_within(self):
+        """ Points within the radius are returned nearest first """
+        keys = [key for _, key in self.grid.within(5.60, -0.19, 300)]
+        self.assertEqual(keys, ['accra', 'lome', 'kumasi'])
+
+    def test_nearest(self):
+        """ The k nearest points are returned nearest first """
+        keys = [key for _, key in self.grid.nearest(5.0, 0.0, 2)]
+        self.assertEqual(keys, ['accra', 'lome'])
+        self.assertEqual(len(self.grid.nearest(0, 0, 100)), 6)
+
+    def test_nearest_across_antimeridian(self):
+        """ Searches wrap around longitude 180 """
+        keys = [key for _, key in self.grid.nearest(-15.0, -179.0, 2)]
+        self.assertEqual(keys, ['suva', 'apia'])
+
+    def test_move_and_remove(self):
+        """ Moving and removing keys updates their cells """
+        self.grid.add('lome', place(51.0, 0.0))
+        keys = [key for _, key in self.grid.within(51.51, -0.13, 100)]
+        self.assertEqual(keys, ['london', 'lome'])
+        self.grid.remove('lome')
+        self.assertEqual(len(self.grid), 5)
+
+    def test_unset_location(self):
+        """ Objects without their own location are not indexed at 0, 0 """
+        self.grid.add('unset', Place())
+        self.grid.add('compact', compact_class(Place)(id='c'))
+        self.grid.add('equator', place(0, 0))
+        self.assertEqual(len(self.grid), 7)
+        self.assertEqual([key for _, key in self.grid.within(0, 0, 1)],
+                         ['equator'])
+
+    def test_invalid_location(self):
+        """ Objects without a valid location are not indexed """
+        self.grid.add('nowhere', place('north', 0))
+        self.grid.add('london', place(100, 0))
+        self.assertEqual(len(self.grid), 5)
+
+
+class test_storageSpatial(unittest.TestCase):
+    """ Class to test FileStorage.within and nearest """
+
+    def test_nearest_and_within(self):
+        """ Storage returns instances ordered by distance """
+        storage = FileStorage('test_spatial.json')
+        accra = place(5.60, -0.19)
+        london = place(51.51, -0.13)
+        storage.new(accra)
+        storage.new(london)
+        self.assertEqual(storage.nearest(Place, 50, 0, 2), [london, accra])
+        self.assertEqual(storage.within('Place', 5.5, 0, 50), [accra])
+        london.latitude = '5.7'
+        storage.new(london)
+        self.assertEqual(storage.within('Place', 5.5, 0, 50),
+                         [accra, london])
+
+
+if __name__ == '__main__':
+    unittest.main()
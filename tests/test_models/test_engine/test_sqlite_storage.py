@@ -0,0 +1,172 @@
+#!/usr/bin/python3
+""" Module for testing the sqlite storage engine"""
+import os
+import sqlite3
+import tempfile
+import unittest
+from models.engine.sqlite_storage import SQLiteStorage
+from models.place import Place
+from models.user import User
+
+
+class test_sqlite_storage(unittest.TestCase):
+    """ Class to test SQLiteStorage """
+
+    def setUp(self):
+        """ Set up a storage over a scratch database """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'hbnb.db')
+        self.storage = SQLiteStorage(self.path)
+        self.storage.reload()
+
+    def tearDown(self):
+        """ Close the storage and remove the scratch directory """
+        self.storage.close()
+        self.tmp.cleanup()
+
+    def reopen(self):
+        """ Returns a second storage over the same database """
+        other = SQLiteStorage(self.path)
+        other.reload()
+        self.addCleanup(other.close)
+        return other
+
+    def place(self, **kwargs):
+        """ Creates and queues a place with the given attributes """
+        place = Place()
+        for attr, value in kwargs.items():
+            setattr(place, attr, value)
+        self.storage.new(place)
+        return place
+
+    def test_save_reload(self):
+        """ Saved objects come back with their attributes and types """
+        place = self.place(name='Loft', max_guest=3, latitude=1.5,
+                           amenity_ids=['a', 'b'], pool=True)
+        self.storage.save()
+        loaded = self.reopen().get(Place, place.id)
+        self.assertIsNot(loaded, place)
+        self.assertEqual(loaded.to_dict(), place.to_dict())
+
+    def test_unsaved(self):
+        """ Objects are only committed by save """
+        self.place()
+        self.assertEqual(self.reopen().count(), 0)
+        self.storage.save()
+        self.assertEqual(self.reopen().count(), 1)
+
+    def test_table_per_class(self):
+        """ Each class is stored in its own table """
+        self.place()
+        self.storage.new(User())
+        self.storage.save()
+        with sqlite3.connect(self.path) as conn:
+            for name in ('Place', 'User'):
+                count = conn.execute(
+                    'SELECT COUNT(*) FROM "{}"'.format(name)).fetchone()
+                self.assertEqual(count[0], 1)
+
+    def test_row_update(self):
+        """ Saving a changed object updates its row in place """
+        place = self.place(name='Old')
+        self.storage.save()
+        place.name = 'New'
+        self.storage.new(place)
+        self.storage.save()
+        other = self.reopen()
+        self.assertEqual(other.count(Place), 1)
+        self.assertEqual(other.get(Place, place.id).name, 'New')
+
+    def test_delete(self):
+        """ Deleted objects are removed from their table """
+        place = self.place()
+        self.storage.save()
+        self.storage.delete(place)
+        self.assertIsNone(self.storage.get(Place, place.id))
+        self.storage.save()
+        self.assertEqual(self.reopen().count(Place), 0)
+
+    def test_all(self):
+        """ all returns objects keyed like FileStorage """
+        place = self.place()
+        user = User()
+        self.storage.new(user)
+        self.assertEqual(set(self.storage.all()),
+                         {'Place.' + place.id, 'User.' + user.id})
+        self.assertEqual(list(self.storage.all(User)), ['User.' + user.id])
+
+    def test_identity(self):
+        """ Loading the same row twice returns the same object """
+        place = self.place()
+        self.storage.save()
+        other = self.reopen()
+        self.assertIs(other.get(Place, place.id),
+                      other.all(Place)['Place.' + place.id])
+
+    def test_find(self):
+        """ find matches declared and extra attributes """
+        first = self.place(city_id='c1', pool=True)
+        self.place(city_id='c2')
+        self.storage.save()
+        other = self.reopen()
+        self.assertEqual([p.id for p in other.find(Place, 'city_id', 'c1')],
+                         [first.id])
+        self.assertEqual([p.id for p in other.find(Place, 'pool', True)],
+                         [first.id])
+
+    def test_find_in_list(self):
+        """ find matches list attributes holding the value """
+        first = self.place(amenity_ids=['a1', 'a2'])
+        self.place(amenity_ids=['a2'])
+        self.storage.save()
+        other = self.reopen()
+        self.assertEqual(
+            [p.id for p in other.find(Place, 'amenity_ids', 'a1')],
+            [first.id])
+        self.assertEqual(len(other.find(Place, 'amenity_ids', 'a2')), 2)
+
+    def test_indexes(self):
+        """ The attributes FileStorage indexes get SQL indexes """
+        with sqlite3.connect(self.path) as conn:
+            plan = conn.execute('EXPLAIN QUERY PLAN SELECT * FROM Place '
+                                'WHERE city_id = ?', ('c1',)).fetchall()
+        self.assertIn('Place_city_id', str(plan))
+
+    def test_filter(self):
+        """ filter selects numeric ranges in SQL """
+        cheap = self.place(price_by_night=50)
+        self.place(price_by_night=500)
+        self.assertEqual(
+            [p.id for p in self.storage.filter(Place,
+                                               price_by_night=(None, 100))],
+            [cheap.id])
+
+    def test_within_nearest(self):
+        """ Spatial queries order results nearest first """
+        far = self.place(latitude=10.0, longitude=10.0)
+        near = self.place(latitude=0.1, longitude=0.1)
+        self.assertEqual(self.storage.within(Place, 0, 0, 50), [near])
+        self.assertEqual(self.storage.nearest(Place, 0, 0, 2), [near, far])
+
+    def test_unset_location(self):
+        """ Places without a location are not found at 0, 0 """
+        self.place(name='Nowhere')
+        near = self.place(latitude=0.1, longitude=0.1)
+        self.storage.save()
+        other = self.reopen()
+        self.assertEqual(self.storage.nearest(Place, 0, 0, 2), [near])
+        self.assertEqual([obj.id for obj in other.nearest(Place, 0, 0, 2)],
+                         [near.id])
+
+    def test_batch(self):
+        """ Saves in a batch are committed when it ends """
+        with self.storage.batch():
+            self.place()
+            self.storage.save()
+            self.assertEqual(self.reopen().count(), 0)
+        self.assertEqual(self.reopen().count(), 1)
+
+    def test_convert(self):
+        """ convert is not supported """
+        with self.assertRaises(ValueError):
+            self.storage.convert('json')
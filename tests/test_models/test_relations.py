@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+"""Unit tests for the relationships between models"""
+import os
+import tempfile
+import unittest
+from io import StringIO
+from unittest.mock import patch
+from console import HBNBCommand
+from models.amenity import Amenity
+from models.city import City
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+
+
+class TestRelations(unittest.TestCase):
+    """Test cases for the relation properties and delete rules"""
+
+    def setUp(self):
+        """Store a state with a city, a place, a review and amenities"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = FileStorage(os.path.join(self.tmp.name, 'file.json'))
+        patcher = patch('models.storage', self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.state = State()
+        self.city = City()
+        self.city.state_id = self.state.id
+        self.user = User()
+        self.wifi = Amenity()
+        self.pool = Amenity()
+        self.place = Place()
+        self.place.city_id = self.city.id
+        self.place.user_id = self.user.id
+        self.place.amenity_ids = [self.wifi.id, self.pool.id]
+        self.review = Review()
+        self.review.place_id = self.place.id
+        self.review.user_id = self.user.id
+        for obj in (self.state, self.city, self.user, self.wifi, self.pool,
+                    self.place, self.review):
+            self.storage.new(obj)
+
+    def tearDown(self):
+        """Remove the scratch directory"""
+        self.tmp.cleanup()
+
+    def test_joins(self):
+        """Test each relation returns the referring objects"""
+        self.assertEqual(self.state.cities, [self.city])
+        self.assertEqual(self.city.places, [self.place])
+        self.assertEqual(self.place.reviews, [self.review])
+        self.assertEqual(self.user.places, [self.place])
+        self.assertEqual(self.user.reviews, [self.review])
+        self.assertEqual(self.wifi.places, [self.place])
+        self.assertEqual(self.place.amenities, [self.wifi, self.pool])
+
+    def test_not_serialized(self):
+        """Test relations stay out of to_dict and cannot be set"""
+        self.assertNotIn('cities', self.state.to_dict())
+        with self.assertRaises(AttributeError):
+            self.state.cities = []
+
+    def test_update(self):
+        """Test relations follow a changed foreign key once stored"""
+        other = City()
+        self.storage.new(other)
+        self.place.city_id = other.id
+        self.storage.new(self.place)
+        self.assertEqual(self.city.places, [])
+        self.assertEqual(other.places, [self.place])
+
+    def test_cascade(self):
+        """Test deleting a state deletes its cities and what they hold"""
+        self.state.delete(cascade=True)
+        self.assertEqual(self.storage.count(), 3)
+        self.assertIsNone(self.storage.get(Review, self.review.id))
+        self.assertEqual(self.user.places, [])
+
+    def test_no_cascade(self):
+        """Test deleting without cascade leaves the referring objects"""
+        self.state.delete()
+        self.assertIsNone(self.storage.get(State, self.state.id))
+        self.assertEqual(self.storage.count(), 6)
+        self.assertEqual(self.user.places, [self.place])
+
+    def test_destroy_command(self):
+        """Test destroy only cascades when asked to"""
+        console = HBNBCommand()
+        with patch('console.storage', self.storage), \
+                patch('sys.stdout', new=StringIO()) as output:
+            console.onecmd('destroy City {} all'.format(self.city.id))
+            self.assertEqual(output.getvalue(), '** unknown option all **\n')
+            console.onecmd('destroy User {}'.format(self.user.id))
+            self.assertEqual(self.storage.count(), 6)
+            console.onecmd('destroy City {} cascade'.format(self.city.id))
+        self.assertEqual(self.storage.count(), 3)
+
+    def test_detach(self):
+        """Test deleting an amenity removes its id from places"""
+        self.wifi.delete()
+        self.assertEqual(self.place.amenity_ids, [self.pool.id])
+        self.assertEqual(self.place.amenities, [self.pool])
+        self.assertEqual(self.pool.places, [self.place])
+        self.assertEqual(self.wifi.places, [])
+
+    def test_missing_reference(self):
+        """Test references to unstored objects are skipped"""
+        self.storage.delete(self.pool)
+        self.assertEqual(self.place.amenities, [self.wifi])
+
+
+if __name__ == '__main__':
+    unittest.main()